@@ -1,4 +1,15 @@
-from .base_agent import BaseAgent
-from .coordinator_agent import CoordinatorAgent
+import importlib
 
-__all__ = ["BaseAgent", "CoordinatorAgent"]
\ No newline at end of file
+# Resolved on first access so importing a light submodule (agents.context,
+# agents.batch) does not pull in LangChain and the OpenAI client
+_EXPORTS = {
+    "BaseAgent": "agents.base_agent",
+    "CoordinatorAgent": "agents.coordinator_agent",
+}
+
+__all__ = ["BaseAgent", "CoordinatorAgent"]
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_EXPORTS[name]), name)
@@ -7,11 +7,30 @@ from datetime import datetime
 from langchain_openai import ChatOpenAI
 from langchain.agents import AgentExecutor, create_openai_functions_agent
 from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain.memory import ConversationBufferMemory
+from langchain_core.messages import SystemMessage, HumanMessage
 from config.settings import settings
+from config.prompts import get_prompt_hash
+from agents.scheduler import agent_scheduler
+from agents.llm_cache import LLMResponseCache
+from telemetry import LLMTelemetry, start_span
+from telemetry.metrics import AGENT_SECONDS
+from tools.results import ToolResult, invoke_structured
+from tools.tool_inputs import resolve_tool_calls
 
 logger = logging.getLogger(__name__)
 
+# react: LLM-driven function-calling loop
+# direct: predictable tools run concurrently, then one summarization call
+# structured: predictable tools only, no LLM call
+EXECUTION_MODES = ("react", "direct", "structured")
+
+def format_tool_outputs(tool_outputs: Dict[str, Any]) -> str:
+    """Compact text of tool outputs, each labelled with its tool name"""
+    return "\n".join(
+        output.render() if isinstance(output, ToolResult) else f"[{name}]\n{output}"
+        for name, output in tool_outputs.items()
+    )
+
 class AgentStatus(str, Enum):
     IDLE = "idle"
     RUNNING = "running"
@@ -25,6 +44,7 @@ class AgentState:
     agent_name: str
     status: AgentStatus = AgentStatus.IDLE
     error_count: int = 0
+    active_runs: int = 0
     last_error: Optional[str] = None
     execution_history: List[Dict] = field(default_factory=list)
     data_collected: Dict[str, Any] = field(default_factory=dict)
@@ -32,7 +52,12 @@ class AgentState:
     end_time: Optional[datetime] = None
 
 class BaseAgent:
-    """Advanced agent with comprehensive error recovery"""
+    """Advanced agent with comprehensive error recovery
+    
+    Agents are stateless workers: nothing from one execution leaks into the
+    next, so a single instance can serve many overlapping assessments.
+    AgentState only aggregates health statistics.
+    """
     
     def __init__(
         self,
@@ -42,7 +67,8 @@ class BaseAgent:
         tools: List[Any],
         system_prompt: str,
         max_errors: int = 3,
-        timeout: int = None
+        timeout: int = None,
+        execution_mode: str = None
     ):
         self.name = name
         self.role = role
@@ -51,6 +77,14 @@ class BaseAgent:
         self.system_prompt = system_prompt
         self.max_errors = max_errors
         self.timeout = timeout or settings.AGENT_TIMEOUT
+        self.execution_mode = (
+            execution_mode
+            or settings.AGENT_EXECUTION_MODES.get(name)
+            or settings.AGENT_EXECUTION_MODE
+        )
+        if self.execution_mode not in EXECUTION_MODES:
+            logger.warning(f"Unknown execution mode {self.execution_mode!r} for {name}, using react")
+            self.execution_mode = "react"
         
         self.state = AgentState(agent_name=name)
         
@@ -58,12 +92,9 @@ class BaseAgent:
             model_name=settings.LLM_MODEL,
             temperature=settings.LLM_TEMPERATURE,
             max_tokens=settings.LLM_MAX_TOKENS,
-            api_key=settings.OPENAI_API_KEY
-        )
-        
-        self.memory = ConversationBufferMemory(
-            memory_key="chat_history",
-            return_messages=True
+            api_key=settings.OPENAI_API_KEY,
+            cache=LLMResponseCache(get_prompt_hash(system_prompt)) if settings.LLM_CACHE_ENABLED else None,
+            callbacks=[LLMTelemetry(name)]
         )
         
         self.executor = None
@@ -88,7 +119,6 @@ class BaseAgent:
             self.executor = AgentExecutor(
                 agent=agent,
                 tools=self.tools,
-                memory=self.memory,
                 verbose=settings.DEBUG,
                 handle_parsing_errors=True,
                 max_iterations=15
@@ -107,23 +137,16 @@ class BaseAgent:
         self,
         task: str,
         context: Dict[str, Any] = None,
-        company_info: Dict[str, Any] = None
+        company_info: Dict[str, Any] = None,
+        tool_data: Dict[str, Any] = None
     ) -> Dict[str, Any]:
-        """Execute task with comprehensive error handling"""
+        """Execute task with comprehensive error handling
         
-        if self.state.error_count >= self.max_errors:
-            return {
-                "status": "failed",
-                "error": f"Max errors ({self.max_errors}) exceeded",
-                "agent": self.name,
-                "error_count": self.state.error_count
-            }
+        tool_data holds ToolResults already fetched for this company,
+        keyed by tool name.
+        """
         
-        try:
-            self.state.status = AgentStatus.RUNNING
-            self.state.start_time = datetime.now()
-            
-            enhanced_task = f"""
+        enhanced_task = f"""
 {task}
 
 ANTI-HALLUCINATION RULES:
@@ -140,63 +163,161 @@ Company Context:
 Additional Context:
 {context or {}}
 """
-            
-            try:
-                result = await asyncio.wait_for(
-                    self._run_executor(enhanced_task),
-                    timeout=self.timeout
-                )
-                
-                self.state.status = AgentStatus.COMPLETED
-                self.state.error_count = 0
-                self.state.end_time = datetime.now()
-                self.state.execution_history.append({
-                    "timestamp": datetime.now().isoformat(),
-                    "status": "success",
-                    "task_summary": task[:100],
-                    "duration": (self.state.end_time - self.state.start_time).total_seconds()
-                })
-                
-                return {
-                    "status": "success",
-                    "agent": self.name,
-                    "result": result,
-                    "timestamp": datetime.now().isoformat(),
-                    "duration_seconds": (self.state.end_time - self.state.start_time).total_seconds()
-                }
-                
-            except asyncio.TimeoutError:
-                raise Exception(f"Task timeout after {self.timeout}s")
         
-        except Exception as e:
-            logger.error(f"Agent {self.name} error: {e}")
-            self.state.status = AgentStatus.ERROR
-            self.state.error_count += 1
-            self.state.last_error = str(e)
-            self.state.end_time = datetime.now()
-            
-            if self.state.error_count < self.max_errors:
-                logger.info(f"Recovering {self.name} (attempt {self.state.error_count}/{self.max_errors})")
-                self.state.status = AgentStatus.RECOVERING
-                await asyncio.sleep(settings.AGENT_RETRY_DELAY ** self.state.error_count)
+        self.state.active_runs += 1
+        self.state.status = AgentStatus.RUNNING
+        span = start_span("agent.execute", {"agent.name": self.name, "agent.mode": self.execution_mode})
+        status, error = "error", "cancelled"
+        try:
+            for attempt in range(1, self.max_errors + 1):
+                start_time = datetime.now()
+                try:
+                    try:
+                        run = await agent_scheduler.run(
+                            self.name,
+                            lambda: self._run(enhanced_task, context, company_info, tool_data),
+                            timeout=self.timeout
+                        )
+                    except asyncio.TimeoutError:
+                        raise Exception(f"Task timeout after {self.timeout}s")
+                    
+                    end_time = datetime.now()
+                    duration = (end_time - start_time).total_seconds()
+                    self.state.error_count = 0
+                    self.state.start_time = start_time
+                    self.state.end_time = end_time
+                    self.state.execution_history.append({
+                        "timestamp": end_time.isoformat(),
+                        "status": "success",
+                        "task_summary": task[:100],
+                        "duration": duration
+                    })
+                    
+                    response = {
+                        "status": "success",
+                        "agent": self.name,
+                        "result": run["output"],
+                        "mode": run["mode"],
+                        "timestamp": end_time.isoformat(),
+                        "duration_seconds": duration
+                    }
+                    if "tool_outputs" in run:
+                        response["tool_outputs"] = {
+                            name: output.to_dict() if isinstance(output, ToolResult) else output
+                            for name, output in run["tool_outputs"].items()
+                        }
+                    status = "success"
+                    span.set("agent.attempts", attempt)
+                    span.set("agent.run_mode", run["mode"])
+                    return response
                 
-                self._initialize()
-                return await self.execute(task, context, company_info)
-            
-            return {
-                "status": "error",
-                "agent": self.name,
-                "error": str(e),
-                "error_count": self.state.error_count,
-                "timestamp": datetime.now().isoformat()
-            }
+                except Exception as e:
+                    error = e
+                    logger.error(f"Agent {self.name} error: {e}")
+                    self.state.error_count += 1
+                    self.state.last_error = str(e)
+                    self.state.end_time = datetime.now()
+                    
+                    if attempt < self.max_errors:
+                        logger.info(f"Recovering {self.name} (attempt {attempt}/{self.max_errors})")
+                        self.state.status = AgentStatus.RECOVERING
+                        await asyncio.sleep(settings.AGENT_RETRY_DELAY ** attempt)
+                        continue
+                    
+                    return {
+                        "status": "error",
+                        "agent": self.name,
+                        "error": str(e),
+                        "error_count": attempt,
+                        "timestamp": datetime.now().isoformat()
+                    }
+        finally:
+            AGENT_SECONDS.labels(self.name, status).observe(
+                span.end(None if status == "success" else error)
+            )
+            self.state.active_runs -= 1
+            if self.state.active_runs == 0:
+                self.state.status = (
+                    AgentStatus.ERROR if self.state.error_count else AgentStatus.COMPLETED
+                )
+    
+    async def _run(
+        self,
+        task: str,
+        context: Optional[Dict[str, Any]],
+        company_info: Optional[Dict[str, Any]],
+        tool_data: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Run one attempt in the agent's execution mode, falling back to ReAct"""
+        if self.execution_mode != "react":
+            run = await self._run_direct(task, context, company_info or {}, tool_data or {})
+            if run is not None:
+                return run
+            logger.info(f"{self.name}: no usable tool data in {self.execution_mode} mode, falling back to react")
+        
+        if tool_data:
+            task = f"""{task}
+Pre-fetched Tool Data (already retrieved for this company; cite the tool name
+and only call these tools again if you need different arguments):
+{format_tool_outputs(tool_data)}
+"""
+        run = {"mode": "react", "output": await self._run_executor(task)}
+        if tool_data:
+            run["tool_outputs"] = tool_data
+        return run
+    
+    async def _run_direct(
+        self,
+        task: str,
+        context: Optional[Dict[str, Any]],
+        company_info: Dict[str, Any],
+        tool_data: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """Call every predictable tool concurrently, then summarize at most once
+        
+        Tools already in tool_data are not called again. Returns None when
+        no tool produced data: none was predictable, or every call raised or
+        came back as an error/unavailable ToolResult.
+        """
+        tools = {tool.name: tool for tool in self.tools}
+        calls = {
+            name: arguments
+            for name, arguments in resolve_tool_calls(self.tools, company_info, context).items()
+            if name not in tool_data
+        }
+        
+        outputs = await asyncio.gather(
+            *(invoke_structured(tools[name], arguments) for name, arguments in calls.items()),
+            return_exceptions=True
+        )
+        tool_outputs = {name: output for name, output in tool_data.items() if name in tools}
+        for name, output in zip(calls, outputs):
+            if isinstance(output, Exception):
+                logger.warning(f"{self.name}: tool {name} failed: {output}")
+            else:
+                tool_outputs[name] = output
+        if not any(not isinstance(o, ToolResult) or o.ok for o in tool_outputs.values()):
+            if tool_outputs:
+                logger.warning(f"{self.name}: all {len(tool_outputs)} tools returned no data")
+            return None
+        
+        data = format_tool_outputs(tool_outputs)
+        if self.execution_mode == "structured":
+            return {"mode": "structured", "output": data, "tool_outputs": tool_outputs}
+        
+        response = await self.llm.ainvoke([
+            SystemMessage(content=self.system_prompt),
+            HumanMessage(content=f"{task}\nTOOL OUTPUTS:\n{data}\n\nWrite the assessment using only the tool outputs above.")
+        ])
+        return {"mode": "direct", "output": response.content, "tool_outputs": tool_outputs}
     
     async def _run_executor(self, task: str) -> str:
-        """Run executor in thread pool"""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None,
-            lambda: self.executor.invoke({"input": task})["output"]
+        """Run executor natively async, or on the dedicated agent pool"""
+        if settings.AGENT_NATIVE_ASYNC and hasattr(self.executor, "ainvoke"):
+            result = await self.executor.ainvoke({"input": task, "chat_history": []})
+            return result["output"]
+        return await agent_scheduler.run_in_thread(
+            lambda: self.executor.invoke({"input": task, "chat_history": []})["output"]
         )
     
     def get_state(self) -> AgentState:
@@ -206,6 +327,5 @@ Additional Context:
     def reset(self):
         """Reset agent"""
         self.state = AgentState(agent_name=self.name)
-        self.memory.clear()
         self._initialize()
         logger.info(f"Reset: {self.name}")
\ No newline at end of file
@@ -0,0 +1,120 @@
+import asyncio
+import csv
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Any, List, Set, Iterable, AsyncIterator, Optional
+
+from config.settings import settings
+from knowledge_graph.graph_builder import GraphWriteBuffer
+from tools.shared_lookups import LookupScope, activate_scope
+
+logger = logging.getLogger(__name__)
+
+def company_key(company: Dict[str, Any]) -> str:
+    """Stable identity of a batch row, used for checkpoint/resume"""
+    return "|".join([
+        (company.get("company_name") or "").strip().lower(),
+        (company.get("ticker") or "").strip().upper(),
+        (company.get("country") or "US").strip().upper()
+    ])
+
+def load_companies_csv(path: str) -> List[Dict[str, Any]]:
+    """Read a portfolio CSV (company_name, ticker, country, domain, sectors)
+
+    sectors is semicolon-separated; a `name` column is accepted in place of
+    company_name.
+    """
+    companies = []
+    with open(path, newline="", encoding="utf-8") as fh:
+        for row in csv.DictReader(fh):
+            name = (row.get("company_name") or row.get("name") or "").strip()
+            if not name:
+                continue
+            sectors = [s.strip() for s in (row.get("sectors") or "").split(";") if s.strip()]
+            companies.append({
+                "company_name": name,
+                "ticker": (row.get("ticker") or "").strip() or None,
+                "country": (row.get("country") or "").strip() or "US",
+                "domain": (row.get("domain") or "").strip() or None,
+                "sectors": sectors or ["Technology"]
+            })
+    return companies
+
+def load_checkpoint(path: str) -> Set[str]:
+    """Keys of companies already assessed successfully in a JSONL output file"""
+    done = set()
+    if not Path(path).exists():
+        return done
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A crash mid-write leaves at most one torn line
+                continue
+            if record.get("status") == "success" and record.get("batch_key"):
+                done.add(record["batch_key"])
+    return done
+
+class BatchRunner:
+    """Runs a portfolio of assessments with bounded parallelism
+
+    Entity-independent lookups (GDP, inflation, governance, sector M&A) are
+    shared across the whole batch through a LookupScope.
+    """
+
+    def __init__(self, coordinator, concurrency: int = None):
+        self.coordinator = coordinator
+        self.concurrency = concurrency or settings.BATCH_CONCURRENCY
+        self.scope = LookupScope()
+
+    async def run(
+        self,
+        companies: Iterable[Dict[str, Any]],
+        skip: Optional[Set[str]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield one result record per company, in completion order"""
+        skip = skip or set()
+        pending: asyncio.Queue = asyncio.Queue()
+        queued = 0
+        for company in companies:
+            if company_key(company) in skip:
+                continue
+            pending.put_nowait(company)
+            queued += 1
+
+        if skip:
+            logger.info(f"Batch resume: skipping {len(skip)} completed, {queued} remaining")
+        if not queued:
+            return
+
+        graph_buffer = GraphWriteBuffer(self.coordinator.graph_builder)
+        results: asyncio.Queue = asyncio.Queue()
+        workers = [
+            asyncio.create_task(self._worker(pending, results, graph_buffer))
+            for _ in range(min(self.concurrency, queued))
+        ]
+        try:
+            for _ in range(queued):
+                yield await results.get()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            try:
+                await graph_buffer.flush()
+            except Exception as e:
+                logger.warning(f"Batch graph write failed: {e}")
+            logger.info(f"Batch shared lookups: {self.scope.get_stats()}")
+
+    async def _worker(self, pending: asyncio.Queue, results: asyncio.Queue, graph_buffer: GraphWriteBuffer):
+        activate_scope(self.scope)
+        while not pending.empty():
+            company = pending.get_nowait()
+            try:
+                result = await self.coordinator.run_assessment(**company, graph_buffer=graph_buffer)
+            except Exception as e:
+                logger.error(f"Batch assessment failed for {company['company_name']}: {e}")
+                result = {"status": "error", "error": str(e)}
+            results.put_nowait({"batch_key": company_key(company), "input": company, **result})
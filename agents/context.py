@@ -0,0 +1,114 @@
+import logging
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Any, Optional, Callable, Awaitable, Union
+
+from telemetry.metrics import ASSESSMENTS, ASSESSMENT_SECONDS, PHASE_SECONDS
+from telemetry.tracing import ActiveSpan, start_span
+
+logger = logging.getLogger(__name__)
+
+EventCallback = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+# (phase number, name, progress % when the phase starts)
+PHASES = [
+    (1, "identification", 5),
+    (2, "agents", 15),
+    (3, "knowledge_graph", 80),
+    (4, "aggregation", 90),
+    (5, "report", 95),
+]
+
+def new_assessment_id() -> str:
+    """Unique assessment id; the timestamp prefix keeps ids sortable"""
+    return f"ASSESS_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+
+@dataclass
+class AssessmentContext:
+    """Per-assessment state, so overlapping assessments never share mutable data"""
+    company_info: Dict[str, Any]
+    assessment_id: str = field(default_factory=new_assessment_id)
+    status: str = "running"
+    phase: Optional[str] = None
+    progress: int = 0
+    agents_total: int = 0
+    agents_completed: int = 0
+    company_context: Dict[str, Any] = field(default_factory=dict)
+    # agent -> tool name -> output, resolved before the agents start
+    tool_data: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    # tool name -> {arguments, output} fetched (not reused) during this run
+    fetched_tools: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    results: Dict[str, Any] = field(default_factory=dict)
+    scores: Dict[str, Any] = field(default_factory=dict)
+    started_at: datetime = field(default_factory=datetime.now)
+    completed_at: Optional[datetime] = None
+    on_event: Optional[EventCallback] = None
+    # Set by batch runs so graph writes are grouped across assessments
+    graph_buffer: Optional[Any] = None
+    # Root span of the run and the span of the phase in progress
+    span: Optional[ActiveSpan] = field(default=None, repr=False)
+    phase_span: Optional[ActiveSpan] = field(default=None, repr=False)
+
+    @property
+    def company_name(self) -> str:
+        return self.company_info["name"]
+
+    async def emit(self, event: str, **data):
+        """Notify the caller's progress listener; listener errors never fail the run"""
+        if self.on_event is None:
+            return
+        payload = {
+            "assessment_id": self.assessment_id,
+            "phase": self.phase,
+            "progress": self.progress,
+            "timestamp": datetime.now().isoformat(),
+            **data
+        }
+        try:
+            await self.on_event(event, payload)
+        except Exception as e:
+            logger.warning(f"Progress listener failed for {self.assessment_id}: {e}")
+
+    def start_trace(self):
+        """Open the assessment span; phase, agent and tool spans nest under it"""
+        self.span = start_span("assessment", {
+            "assessment.id": self.assessment_id,
+            "company.name": self.company_name,
+            "company.country": self.company_info.get("country"),
+        })
+
+    def _end_phase(self, error: Optional[Union[BaseException, str]] = None):
+        if self.phase_span is not None:
+            PHASE_SECONDS.labels(self.phase).observe(self.phase_span.end(error))
+            self.phase_span = None
+
+    def end_trace(self, error: Optional[Union[BaseException, str]] = None):
+        """Close the open phase and assessment spans (idempotent)"""
+        self._end_phase(error)
+        if self.span is not None:
+            self.span.set("assessment.status", self.status)
+            ASSESSMENT_SECONDS.observe(self.span.end(error))
+            ASSESSMENTS.labels(self.status).inc()
+            self.span = None
+
+    async def enter_phase(self, number: int):
+        self._end_phase()
+        _, self.phase, self.progress = PHASES[number - 1]
+        if self.span is not None:
+            self.phase_span = start_span(f"phase.{self.phase}", {"phase.number": number})
+        await self.emit("phase", number=number)
+
+    async def agent_completed(self, agent_name: str, result: Dict[str, Any]):
+        self.agents_completed += 1
+        start, end = PHASES[1][2], PHASES[2][2]
+        if self.agents_total:
+            self.progress = start + (end - start) * self.agents_completed // self.agents_total
+        await self.emit(
+            "agent_completed",
+            agent=agent_name,
+            status=result.get("status", "unknown"),
+            agents_completed=self.agents_completed,
+            agents_total=self.agents_total,
+            result=result
+        )
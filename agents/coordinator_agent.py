@@ -1,174 +1,293 @@
 import asyncio
+import json
 import logging
+import threading
 from typing import Dict, List, Any, Optional
 from datetime import datetime
-from agents.financial_agent import create_financial_agent
-from agents.compliance_agent import create_compliance_agent
-from agents.reputation_agent import create_reputation_agent
-from agents.operational_agent import create_operational_agent
-from agents.strategic_agent import create_strategic_agent
-from agents.cyber_agent import create_cyber_agent
-from agents.esg_agent import create_esg_agent
-from knowledge_graph.graph_builder import GraphBuilder
+from agents.scheduler import agent_scheduler
+from agents.batch import company_key
+from agents.context import AssessmentContext, EventCallback
+from agents.incremental import is_fresh, inputs_fingerprint, reusable_result
+from config.settings import settings
+from datastores.edgar import get_edgar_store
+from datastores.gleif import get_lei_registry
+from scoring import risk_scorer, format_scores
+from telemetry.profiler import finish_profile, start_profile
+from knowledge_graph.graph_builder import GraphBuilder, GraphWriteBuffer, assessment_row
 from tools.comprehensive_tools import (
     search_opencorporates,
     get_lei_identifier,
     run_complete_assessment
 )
+from tools.results import ToolResult, invoke_structured
+from tools.tool_inputs import resolve_tool_calls
 
 logger = logging.getLogger(__name__)
 
 class CoordinatorAgent:
-    """Master orchestrator for multi-agent assessment"""
+    """Master orchestrator for multi-agent assessment
     
-    def __init__(self):
-        self.agents = {}
+    The coordinator holds no per-assessment state: each run gets its own
+    AssessmentContext and the agents are stateless workers shared by all
+    concurrent assessments.
+    
+    With a snapshot_store, each run records its tool inputs and agent
+    results so later incremental runs only refresh what went stale.
+    
+    Agents (and the LangChain/OpenAI stack behind them) are built on first
+    use or by warm_up(), so constructing a coordinator is cheap.
+    """
+    
+    def __init__(self, snapshot_store=None):
+        self._agents: Dict[str, Any] = {}
+        self._agents_ready = False
+        self._agents_lock = threading.Lock()
+        self.snapshot_store = snapshot_store
         self.graph_builder = GraphBuilder()
-        self.assessment_id = None
-        self.company_info = {}
         self.status = "initialized"
-        self.all_results = {}
-        
-        self._initialize_agents()
+        self.active_assessments: Dict[str, AssessmentContext] = {}
+    
+    @property
+    def agents(self) -> Dict[str, Any]:
+        """The specialized agents, built on first access"""
+        if not self._agents_ready:
+            with self._agents_lock:
+                if not self._agents_ready:
+                    self._initialize_agents()
+                    self._agents_ready = True
+        return self._agents
     
     def _initialize_agents(self):
         """Initialize all 7 specialized agents"""
+        from agents.financial_agent import create_financial_agent
+        from agents.compliance_agent import create_compliance_agent
+        from agents.reputation_agent import create_reputation_agent
+        from agents.operational_agent import create_operational_agent
+        from agents.strategic_agent import create_strategic_agent
+        from agents.cyber_agent import create_cyber_agent
+        from agents.esg_agent import create_esg_agent
+        
         try:
             logger.info("Initializing specialized agents...")
             
-            self.agents["financial"] = create_financial_agent()
-            self.agents["compliance"] = create_compliance_agent()
-            self.agents["reputation"] = create_reputation_agent()
-            self.agents["operational"] = create_operational_agent()
-            self.agents["strategic"] = create_strategic_agent()
-            self.agents["cyber"] = create_cyber_agent()
-            self.agents["esg"] = create_esg_agent()
+            self._agents = {
+                "financial": create_financial_agent(),
+                "compliance": create_compliance_agent(),
+                "reputation": create_reputation_agent(),
+                "operational": create_operational_agent(),
+                "strategic": create_strategic_agent(),
+                "cyber": create_cyber_agent(),
+                "esg": create_esg_agent(),
+            }
             
-            logger.info(f"✓ Initialized {len(self.agents)} agents")
+            logger.info(f"✓ Initialized {len(self._agents)} agents")
             
         except Exception as e:
             logger.error(f"✗ Agent initialization failed: {e}")
             self.status = "initialization_failed"
             raise
     
+    async def _ensure_agents(self):
+        # building takes about a second of imports and client setup: keep it off the event loop
+        if not self._agents_ready:
+            await asyncio.to_thread(lambda: self.agents)
+    
+    async def warm_up(self):
+        """Build the agents and prepare the Neo4j schema ahead of the first assessment"""
+        await self._ensure_agents()
+        try:
+            await self.graph_builder.ensure_schema()
+        except Exception as e:
+            logger.warning(f"Neo4j schema setup failed: {e}")
+    
     async def run_assessment(
         self,
         company_name: str,
         ticker: Optional[str] = None,
         country: str = "US",
         domain: Optional[str] = None,
-        sectors: Optional[List[str]] = None
+        sectors: Optional[List[str]] = None,
+        assessment_id: Optional[str] = None,
+        on_event: Optional[EventCallback] = None,
+        graph_buffer: Optional[GraphWriteBuffer] = None,
+        incremental: bool = False,
+        profile: bool = False
     ) -> Dict[str, Any]:
-        """Execute complete enterprise risk assessment"""
+        """Execute complete enterprise risk assessment
+        
+        incremental reuses tool outputs still fresh under DATA_FRESHNESS and
+        re-runs only the agents whose inputs changed since the last run.
+        profile (or PROFILE_ASSESSMENTS) samples stacks for the whole run and
+        stores the profile in PROFILE_DIR under the assessment id.
+        """
         
-        self.assessment_id = f"ASSESS_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        self.company_info = {
+        ctx = AssessmentContext(company_info={
             "name": company_name,
             "ticker": ticker,
             "country": country,
             "domain": domain,
             "sectors": sectors or ["Technology"]
-        }
+        }, on_event=on_event, graph_buffer=graph_buffer)
+        if assessment_id:
+            ctx.assessment_id = assessment_id
+        self.active_assessments[ctx.assessment_id] = ctx
+        ctx.start_trace()
+        profiler = start_profile(ctx.assessment_id) if profile or settings.PROFILE_ASSESSMENTS else None
         
-        logger.info(f"Starting assessment {self.assessment_id} for {company_name}")
+        logger.info(f"Starting assessment {ctx.assessment_id} for {company_name}")
         
         try:
+            await self._ensure_agents()
+            
             # PHASE 1: Company Identification & Contextualization
             logger.info("=" * 80)
             logger.info("PHASE 1: Company Identification & Contextualization")
             logger.info("=" * 80)
+            await ctx.enter_phase(1)
             
-            company_context = await self._identify_company()
-            
-            # Create Neo4j company node
-            try:
-                await self.graph_builder.create_company_node(self.company_info)
-            except Exception as e:
-                logger.warning(f"Graph node creation failed: {e}")
+            ctx.company_context = await self._identify_company(ctx)
             
             # PHASE 2: Parallel Multi-Agent Execution
             logger.info("\n" + "=" * 80)
             logger.info("PHASE 2: Parallel Multi-Agent Data Collection")
             logger.info("=" * 80)
+            await ctx.enter_phase(2)
             
-            tasks = self._create_agent_tasks()
-            results = await self._execute_parallel_agents(tasks, company_context)
+            key = company_key({"company_name": company_name, "ticker": ticker, "country": country})
+            tool_snapshots, agent_snapshots = {}, {}
+            if incremental:
+                tool_snapshots, agent_snapshots = await self._load_snapshots(key)
+            if settings.AGENT_PREFETCH or incremental:
+                ctx.tool_data = await self._prefetch_tool_data(ctx, tool_snapshots)
             
-            self.all_results = results
+            tasks = self._create_agent_tasks(ctx)
+            fingerprints = {name: inputs_fingerprint(ctx.tool_data.get(name, {})) for name in tasks}
+            reused = {}
+            if incremental:
+                for name in tasks:
+                    result = reusable_result(agent_snapshots.get(name), fingerprints[name], name in ctx.tool_data)
+                    if result is not None:
+                        result["tool_outputs"] = {t: o.to_dict() for t, o in ctx.tool_data.get(name, {}).items()}
+                        reused[name] = result
+                logger.info(f"Incremental: reusing {len(reused)}/{len(tasks)} agent results")
+            
+            results = await self._execute_parallel_agents(
+                ctx,
+                {name: task for name, task in tasks.items() if name not in reused},
+                reused
+            )
+            ctx.results = results
+            await self._save_snapshots(key, ctx, results, fingerprints)
             
             # PHASE 3: Knowledge Graph Construction
             logger.info("\n" + "=" * 80)
             logger.info("PHASE 3: Building Neo4j Knowledge Graph")
             logger.info("=" * 80)
+            await ctx.enter_phase(3)
             
-            await self._build_knowledge_graph(results)
+            ctx.scores = risk_scorer.score(self._collect_tool_outputs(results))
+            await self._build_knowledge_graph(ctx, results)
             
             # PHASE 4: Risk Aggregation & Analysis
             logger.info("\n" + "=" * 80)
             logger.info("PHASE 4: Risk Aggregation & Cross-Validation")
             logger.info("=" * 80)
+            await ctx.enter_phase(4)
             
-            aggregated_risks = await self._aggregate_risks(results)
+            aggregated_risks = await self._aggregate_risks(ctx, results)
             
             # PHASE 5: Report Generation
             logger.info("\n" + "=" * 80)
             logger.info("PHASE 5: Generating Comprehensive Report")
             logger.info("=" * 80)
+            await ctx.enter_phase(5)
             
-            report = await self._generate_final_report(results, aggregated_risks)
+            report = await self._generate_final_report(ctx, results, aggregated_risks)
             
-            self.status = "completed"
+            ctx.status = "completed"
+            ctx.progress = 100
             
             logger.info("\n" + "=" * 80)
             logger.info("Assessment Completed Successfully")
             logger.info("=" * 80)
             
-            return {
-                "assessment_id": self.assessment_id,
+            assessment = {
+                "assessment_id": ctx.assessment_id,
                 "status": "success",
-                "company_info": self.company_info,
+                "company_info": ctx.company_info,
                 "agent_results": results,
                 "aggregated_risks": aggregated_risks,
                 "report": report,
                 "timestamp": datetime.now().isoformat()
             }
+            if incremental:
+                assessment["incremental"] = {
+                    "tools_fetched": len(ctx.fetched_tools),
+                    "agents_reused": sorted(reused),
+                    "agents_run": sorted(set(results) - set(reused))
+                }
+            return assessment
             
         except Exception as e:
             logger.error(f"Assessment failed: {e}")
-            self.status = "failed"
+            ctx.status = "failed"
+            ctx.end_trace(e)
+            await ctx.emit("failed", error=str(e))
             return {
-                "assessment_id": self.assessment_id,
+                "assessment_id": ctx.assessment_id,
                 "status": "error",
                 "error": str(e),
                 "timestamp": datetime.now().isoformat()
             }
+        
+        finally:
+            ctx.completed_at = datetime.now()
+            ctx.end_trace()
+            self.active_assessments.pop(ctx.assessment_id, None)
+            if profiler is not None:
+                try:
+                    await asyncio.to_thread(finish_profile, profiler)
+                except OSError as e:
+                    logger.warning(f"Could not store profile for {ctx.assessment_id}: {e}")
     
-    async def _identify_company(self) -> Dict[str, Any]:
+    async def _identify_company(self, ctx: AssessmentContext) -> Dict[str, Any]:
         """Identify company and gather context"""
-        logger.info(f"Identifying company: {self.company_info['name']}")
+        company_info = ctx.company_info
+        logger.info(f"Identifying company: {company_info['name']}")
         
         context = {
             "verified": False,
             "lei": None,
             "cik": None,
-            "locations": [self.company_info.get("country", "US")],
-            "jurisdictions": [self.company_info.get("country", "US")]
+            "locations": [company_info.get("country", "US")],
+            "jurisdictions": [company_info.get("country", "US")]
         }
         
         try:
-            # Verify company existence
-            logger.info("  • Searching OpenCorporates...")
-            oc_result = await search_opencorporates(
-                self.company_info["name"],
-                self.company_info.get("country")
-            )
-            logger.info(f"    Result: {oc_result[:80]}...")
-            context["verified"] = True
+            # Local ticker index; get_sec_filings and friends receive it as cik
+            context["cik"] = (await get_edgar_store()).cik_for(company_info.get("ticker"))
             
-            # Get LEI
-            logger.info("  • Fetching LEI identifier...")
-            lei_result = await get_lei_identifier(self.company_info["name"])
-            logger.info(f"    Result: {lei_result[:80]}...")
+            # A local golden-copy match is registry verification on its own
+            registry = await get_lei_registry()
+            records = registry.resolve(company_info["name"], company_info.get("country"))
+            if records:
+                logger.info(f"  • Local GLEIF match: {records[0]['name']} ({records[0]['lei']})")
+                context["verified"] = True
+                context["lei"] = records[0]["lei"]
+            else:
+                logger.info("  • Searching OpenCorporates and GLEIF...")
+                oc_result, lei_result = await asyncio.gather(
+                    invoke_structured(search_opencorporates, {
+                        "company_name": company_info["name"],
+                        "jurisdiction": company_info.get("country")
+                    }),
+                    invoke_structured(get_lei_identifier, {"company_name": company_info["name"]})
+                )
+                logger.info(f"    OpenCorporates: {oc_result.render()[:80]}...")
+                logger.info(f"    GLEIF: {lei_result.render()[:80]}...")
+                context["verified"] = oc_result.ok or lei_result.ok
+                if lei_result.ok:
+                    context["lei"] = lei_result.items[0]["lei"]
             
         except Exception as e:
             logger.warning(f"Company identification error: {e}")
@@ -176,13 +295,105 @@ class CoordinatorAgent:
         logger.info(f"  ✓ Company identification complete")
         return context
     
-    def _create_agent_tasks(self) -> Dict[str, str]:
+    async def _prefetch_tool_data(
+        self,
+        ctx: AssessmentContext,
+        snapshots: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Run every agent's predictable tool calls in one concurrent wave
+        
+        Identical calls shared by several agents run once. Calls that fail
+        or miss AGENT_PREFETCH_TIMEOUT are left for the agents to make.
+        A snapshot with the same arguments that is still fresh is used
+        instead of calling the tool.
+        """
+        snapshots = snapshots or {}
+        calls: Dict[tuple, asyncio.Future] = {}
+        outputs: Dict[tuple, ToolResult] = {}
+        plan: Dict[str, Dict[str, tuple]] = {}
+        for agent_name, agent in self.agents.items():
+            tools = {tool.name: tool for tool in getattr(agent, "tools", [])}
+            resolved = resolve_tool_calls(tools.values(), ctx.company_info, ctx.company_context)
+            for tool_name, arguments in resolved.items():
+                key = (tool_name, json.dumps(arguments, sort_keys=True))
+                if key not in calls and key not in outputs:
+                    snapshot = snapshots.get(tool_name)
+                    if snapshot and snapshot["arguments"] == key[1] and is_fresh(tool_name, snapshot["fetched_at"]):
+                        outputs[key] = ToolResult(**snapshot["output"])
+                    else:
+                        calls[key] = asyncio.ensure_future(invoke_structured(tools[tool_name], arguments))
+                plan.setdefault(agent_name, {})[tool_name] = key
+        
+        if not plan:
+            return {}
+        
+        reused = len(outputs)
+        if calls:
+            logger.info(f"Prefetching {len(calls)} tool calls for {len(plan)} agents...")
+            done, pending = await asyncio.wait(calls.values(), timeout=settings.AGENT_PREFETCH_TIMEOUT)
+            for future in pending:
+                future.cancel()
+            
+            for key, future in calls.items():
+                if future in done and future.exception() is None:
+                    output = future.result()
+                    outputs[key] = output
+                    if output.ok:
+                        ctx.fetched_tools[key[0]] = {"arguments": key[1], "output": output.to_dict()}
+                elif future in done:
+                    logger.debug(f"  Prefetch {key[0]} failed: {future.exception()}")
+        
+        tool_data = {}
+        for agent_name, tool_keys in plan.items():
+            for tool_name, key in tool_keys.items():
+                if key in outputs:
+                    tool_data.setdefault(agent_name, {})[tool_name] = outputs[key]
+        
+        logger.info(f"  ✓ Prefetched {len(outputs) - reused}/{len(calls)} tool calls, {reused} fresh snapshots reused")
+        return tool_data
+    
+    async def _load_snapshots(self, key: str):
+        """Last stored tool outputs and agent results for a company"""
+        if self.snapshot_store is None:
+            logger.warning("Incremental run without a snapshot store, running in full")
+            return {}, {}
+        try:
+            return (
+                await self.snapshot_store.get_tool_snapshots(key),
+                await self.snapshot_store.get_agent_snapshots(key)
+            )
+        except Exception as e:
+            logger.warning(f"Could not load snapshots for {key}: {e}")
+            return {}, {}
+    
+    async def _save_snapshots(
+        self,
+        key: str,
+        ctx: AssessmentContext,
+        results: Dict[str, Any],
+        fingerprints: Dict[str, str]
+    ):
+        """Record freshly fetched tool outputs and newly run agent results"""
+        if self.snapshot_store is None:
+            return
+        agents = {
+            name: {"inputs": fingerprints[name], "result": result}
+            for name, result in results.items()
+            if result.get("status") == "success" and not result.get("reused")
+        }
+        try:
+            await self.snapshot_store.save_tool_snapshots(key, ctx.fetched_tools)
+            await self.snapshot_store.save_agent_snapshots(key, agents)
+        except Exception as e:
+            logger.warning(f"Could not save snapshots for {key}: {e}")
+    
+    def _create_agent_tasks(self, ctx: AssessmentContext) -> Dict[str, str]:
         """Create specific tasks for each agent"""
-        company = self.company_info["name"]
-        ticker = self.company_info.get("ticker", "N/A")
-        country = self.company_info["country"]
-        domain = self.company_info.get("domain", "N/A")
-        sectors = ", ".join(self.company_info.get("sectors", ["Technology"]))
+        company = ctx.company_info["name"]
+        ticker = ctx.company_info.get("ticker", "N/A")
+        country = ctx.company_info["country"]
+        domain = ctx.company_info.get("domain", "N/A")
+        sectors = ", ".join(ctx.company_info.get("sectors", ["Technology"]))
         
         return {
             "financial": f"""
@@ -295,90 +506,123 @@ Tasks:
     
     async def _execute_parallel_agents(
         self,
+        ctx: AssessmentContext,
         tasks: Dict[str, str],
-        context: Dict[str, Any]
+        reused: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
-        """Execute all agents in parallel"""
+        """Execute all agents in parallel; reused results count as completed"""
         
+        reused = reused or {}
         logger.info(f"Launching {len(tasks)} agents in parallel...")
+        ctx.agents_total = len(tasks) + len(reused)
+        for agent_name, result in reused.items():
+            logger.info(f"  ↺ {agent_name}: inputs unchanged, reusing previous result")
+            await ctx.agent_completed(agent_name, result)
         
-        execution_tasks = []
-        agent_names = []
-        
-        for agent_name, task in tasks.items():
-            agent_names.append(agent_name)
-            logger.info(f"  ► Starting {agent_name} agent...")
-            execution_tasks.append(
-                self.agents[agent_name].execute(
+        async def run_agent(agent_name: str, task: str) -> Dict[str, Any]:
+            try:
+                result = await self.agents[agent_name].execute(
                     task=task,
-                    context=context,
-                    company_info=self.company_info
+                    context=ctx.company_context,
+                    company_info=ctx.company_info,
+                    tool_data=ctx.tool_data.get(agent_name)
                 )
-            )
-        
-        # Run all agents concurrently
-        results = await asyncio.gather(*execution_tasks, return_exceptions=True)
-        
-        # Organize results
-        organized = {}
-        for agent_name, result in zip(agent_names, results):
-            if isinstance(result, Exception):
-                logger.error(f"  ✗ {agent_name}: ERROR - {str(result)[:100]}")
-                organized[agent_name] = {
-                    "status": "error",
-                    "error": str(result)
-                }
-            else:
                 status = result.get("status", "unknown")
                 logger.info(f"  ✓ {agent_name}: {status.upper()}")
-                organized[agent_name] = result
+            except Exception as e:
+                logger.error(f"  ✗ {agent_name}: ERROR - {str(e)[:100]}")
+                result = {
+                    "status": "error",
+                    "error": str(e)
+                }
+            await ctx.agent_completed(agent_name, result)
+            return result
+        
+        for agent_name in tasks:
+            logger.info(f"  ► Starting {agent_name} agent...")
+        
+        # Run all agents concurrently
+        results = await asyncio.gather(*[
+            run_agent(agent_name, task) for agent_name, task in tasks.items()
+        ])
+        organized = {**reused, **dict(zip(tasks.keys(), results))}
         
         success_count = sum(1 for r in organized.values() if r.get("status") == "success")
         logger.info(f"\nParallel execution complete: {success_count}/{len(organized)} successful")
         
         return organized
     
-    async def _build_knowledge_graph(self, results: Dict[str, Any]):
-        """Build Neo4j knowledge graph"""
-        logger.info("Creating risk nodes in graph...")
+    async def _build_knowledge_graph(self, ctx: AssessmentContext, results: Dict[str, Any]):
+        """Build Neo4j knowledge graph with a single bulk write"""
+        logger.info("Writing company and risk nodes to graph...")
         
-        for agent_name, result in results.items():
-            if result.get("status") == "success":
-                try:
-                    await self.graph_builder.create_risk_node(
-                        company_name=self.company_info["name"],
-                        risk_type=agent_name.replace("_agent", ""),
-                        risk_data={
-                            "description": result.get("result", "")[:500],
-                            "score": 5.5,
-                            "confidence": "HIGH"
-                        }
-                    )
-                    logger.info(f"  ✓ Created {agent_name} risk node")
-                except Exception as e:
-                    logger.warning(f"  ⚠ Could not create {agent_name} node: {e}")
+        categories = ctx.scores.get("categories", {})
+        risks = [
+            {
+                "type": agent_name.replace("_agent", ""),
+                "description": result.get("result", "")[:500],
+                "score": categories.get(agent_name, {}).get("score"),
+                "confidence": categories.get(agent_name, {}).get("confidence", "LOW")
+            }
+            for agent_name, result in results.items()
+            if result.get("status") == "success"
+        ]
+        identifiers = {key: ctx.company_context.get(key) for key in ("lei", "cik")}
+        row = assessment_row({**ctx.company_info, **identifiers}, risks, ctx.assessment_id)
+        
+        try:
+            if ctx.graph_buffer is not None:
+                await ctx.graph_buffer.add(row)
+                logger.info(f"  ✓ Queued {len(risks)} risk nodes for batch write")
+            else:
+                await self.graph_builder.write_assessments([row])
+                logger.info(f"  ✓ Created {len(risks)} risk nodes")
+        except Exception as e:
+            logger.warning(f"  ⚠ Could not write knowledge graph: {e}")
     
-    async def _aggregate_risks(self, results: Dict[str, Any]) -> Dict[str, Any]:
+    @staticmethod
+    def _collect_tool_outputs(results: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Structured tool outputs from all agents, keyed by tool name"""
+        outputs = {}
+        for result in results.values():
+            outputs.update(result.get("tool_outputs") or {})
+        return outputs
+    
+    async def _aggregate_risks(self, ctx: AssessmentContext, results: Dict[str, Any]) -> Dict[str, Any]:
         """Aggregate and validate risks across all agents"""
         logger.info("Aggregating risk findings...")
         
+        scores = ctx.scores
+        tool_outputs = self._collect_tool_outputs(results)
         aggregated = {
             "total_risks_identified": 0,
             "critical_risks": [],
             "high_risks": [],
             "medium_risks": [],
             "low_risks": [],
+            "scores": scores,
             "data_quality": {
-                "complete_coverage": 85,
-                "sources_consulted": 45,
-                "confidence_level": "HIGH"
+                "complete_coverage": round(scores["overall"]["coverage"] * 100),
+                "sources_consulted": sum(
+                    1 for o in tool_outputs.values() if o.get("status") == "ok" and o.get("source")
+                ),
+                "confidence_level": scores["overall"]["confidence"]
             }
         }
         
-        # Parse results and aggregate
-        for agent_name, result in results.items():
-            if result.get("status") == "success":
-                aggregated["total_risks_identified"] += 1
+        # Bucket individual risk factors by severity
+        for feature in scores["features"]:
+            if feature["risk"] >= 8.5:
+                aggregated["critical_risks"].append(feature)
+            elif feature["risk"] >= 7:
+                aggregated["high_risks"].append(feature)
+            elif feature["risk"] >= 4.5:
+                aggregated["medium_risks"].append(feature)
+            else:
+                aggregated["low_risks"].append(feature)
+        aggregated["total_risks_identified"] = (
+            len(aggregated["critical_risks"]) + len(aggregated["high_risks"]) + len(aggregated["medium_risks"])
+        )
         
         logger.info(f"  ✓ Aggregated {len(results)} agent findings")
         
@@ -386,20 +630,22 @@ Tasks:
     
     async def _generate_final_report(
         self,
+        ctx: AssessmentContext,
         results: Dict[str, Any],
         aggregated: Dict[str, Any]
     ) -> str:
         """Generate comprehensive final report"""
+        company_info = ctx.company_info
         
         report_lines = [
             "=" * 100,
             "COMPREHENSIVE ENTERPRISE RISK ASSESSMENT REPORT",
             "=" * 100,
-            f"Company: {self.company_info['name']}",
-            f"Ticker: {self.company_info.get('ticker', 'Private')}",
-            f"Country: {self.company_info['country']}",
-            f"Sectors: {', '.join(self.company_info.get('sectors', ['Technology']))}",
-            f"Assessment ID: {self.assessment_id}",
+            f"Company: {company_info['name']}",
+            f"Ticker: {company_info.get('ticker', 'Private')}",
+            f"Country: {company_info['country']}",
+            f"Sectors: {', '.join(company_info.get('sectors', ['Technology']))}",
+            f"Assessment ID: {ctx.assessment_id}",
             f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
             "=" * 100,
             ""
@@ -444,17 +690,7 @@ Tasks:
             "RISK SUMMARY",
             "=" * 100,
             "",
-            "Risk Scores by Category:",
-            "  Financial:       6.5/10 (MODERATE)",
-            "  Compliance:      4.2/10 (LOW)",
-            "  Reputation:      5.1/10 (MODERATE)",
-            "  Operational:     6.8/10 (MODERATE-HIGH)",
-            "  Cybersecurity:   6.2/10 (MODERATE)",
-            "  Strategic:       5.5/10 (MODERATE)",
-            "  ESG:             4.8/10 (LOW-MODERATE)",
-            "",
-            "OVERALL ENTERPRISE RISK SCORE: 5.5/10 (MODERATE)",
-            "CONFIDENCE LEVEL: HIGH (87%)",
+            *format_scores(ctx.scores),
             "",
             "=" * 100
         ])
@@ -466,10 +702,13 @@ Tasks:
         health = {
             "timestamp": datetime.now().isoformat(),
             "coordinator_status": self.status,
-            "agents": {}
+            "active_assessments": len(self.active_assessments),
+            "agents": {},
+            "scheduler": agent_scheduler.get_stats()
         }
         
-        for agent_name, agent in self.agents.items():
+        # not built yet (no warm-up or assessment so far) reports no agents
+        for agent_name, agent in self._agents.items():
             state = agent.get_state()
             health["agents"][agent_name] = {
                 "status": state.status.value,
@@ -0,0 +1,46 @@
+import hashlib
+import json
+import logging
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+from config.settings import settings
+from tools.results import ToolResult
+
+logger = logging.getLogger(__name__)
+
+def max_age(tool_name: str) -> int:
+    """Seconds a tool's output stays fresh under DATA_FRESHNESS"""
+    return settings.DATA_FRESHNESS.get(tool_name, settings.DATA_FRESHNESS_DEFAULT)
+
+def age_seconds(timestamp: str, now: Optional[datetime] = None) -> float:
+    return ((now or datetime.now()) - datetime.fromisoformat(timestamp)).total_seconds()
+
+def is_fresh(tool_name: str, fetched_at: str, now: Optional[datetime] = None) -> bool:
+    return age_seconds(fetched_at, now) < max_age(tool_name)
+
+def inputs_fingerprint(tool_data: Dict[str, Any]) -> str:
+    """Content hash of an agent's tool inputs; equal inputs, equal fingerprint"""
+    canonical = {
+        name: output.to_dict() if isinstance(output, ToolResult) else output
+        for name, output in tool_data.items()
+    }
+    return hashlib.sha256(json.dumps(canonical, sort_keys=True, default=str).encode()).hexdigest()[:32]
+
+def reusable_result(
+    snapshot: Optional[Dict[str, Any]],
+    fingerprint: str,
+    has_inputs: bool
+) -> Optional[Dict[str, Any]]:
+    """The stored agent result if its inputs are unchanged, else None
+
+    An agent without predictable inputs has nothing to compare, so its
+    result is only reused within DATA_FRESHNESS_DEFAULT.
+    """
+    if snapshot is None or snapshot["result"].get("status") != "success":
+        return None
+    if snapshot["inputs"] != fingerprint:
+        return None
+    if not has_inputs and age_seconds(snapshot["completed_at"]) >= settings.DATA_FRESHNESS_DEFAULT:
+        return None
+    return {**snapshot["result"], "reused": True, "reused_from": snapshot["completed_at"]}
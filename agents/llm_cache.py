@@ -0,0 +1,263 @@
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from langchain_core.caches import BaseCache, RETURN_VAL_TYPE
+from langchain_core.load import dumps, loads
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+from config.settings import settings
+from tools.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class LLMCacheStats:
+    """LLM response cache counters"""
+    l1_hits: int = 0
+    store_hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    errors: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.l1_hits + self.store_hits + self.misses
+        return (self.l1_hits + self.store_hits) / lookups if lookups else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["hit_ratio"] = round(self.hit_ratio, 4)
+        return data
+
+class SQLiteLLMStore:
+    """Disk tier: one row per response, TTL on read, LRU eviction past max_entries"""
+
+    def __init__(self, path: str, ttl: int, max_entries: int):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache (accessed_at)")
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                conn.commit()
+                return None
+            conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            conn.commit()
+            return row[0]
+
+    def set(self, key: str, value: str):
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now + self.ttl, now)
+            )
+            conn.execute("DELETE FROM llm_cache WHERE expires_at < ?", (now,))
+            conn.execute(
+                """DELETE FROM llm_cache WHERE key IN (
+                    SELECT key FROM llm_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )""",
+                (self.max_entries,)
+            )
+            conn.commit()
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM llm_cache")
+            conn.commit()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+class RedisLLMStore:
+    """Redis tier: entries expire after ttl; size is bounded by Redis' maxmemory policy"""
+
+    PREFIX = "llm_cache:"
+
+    def __init__(self, url: str, ttl: int):
+        self.ttl = ttl
+        self.client = redis.Redis.from_url(
+            url,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT
+        )
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.client.get(self.PREFIX + key)
+        return value.decode() if value is not None else None
+
+    def set(self, key: str, value: str):
+        self.client.setex(self.PREFIX + key, self.ttl, value)
+
+    def clear(self):
+        for key in self.client.scan_iter(f"{self.PREFIX}*"):
+            self.client.delete(key)
+
+    def close(self):
+        self.client.close()
+
+class LLMCache:
+    """Exact-match LLM response cache: in-process LRU in front of disk or Redis"""
+
+    def __init__(self):
+        self.enabled = settings.LLM_CACHE_ENABLED
+        self.l1 = LRUCache(settings.LLM_CACHE_L1_ENTRIES, settings.LLM_CACHE_TTL)
+        self.stats = LLMCacheStats()
+        self._store = None
+
+    @property
+    def store(self):
+        """Persistent tier, created on first use"""
+        if self._store is None:
+            if settings.LLM_CACHE_BACKEND == "redis" and redis is not None:
+                self._store = RedisLLMStore(settings.REDIS_URL, settings.LLM_CACHE_TTL)
+            else:
+                if settings.LLM_CACHE_BACKEND == "redis":
+                    logger.warning("redis not available, LLM cache falls back to sqlite")
+                self._store = SQLiteLLMStore(
+                    settings.LLM_CACHE_PATH,
+                    settings.LLM_CACHE_TTL,
+                    settings.LLM_CACHE_MAX_ENTRIES
+                )
+        return self._store
+
+    @staticmethod
+    def make_key(namespace: str, prompt: str, llm_string: str) -> str:
+        """Hash of everything that determines a response
+
+        llm_string carries the model, temperature and bound tool schemas;
+        prompt is the serialized message list, history included.
+        """
+        digest = hashlib.sha256()
+        for part in (namespace, llm_string, prompt):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get_l1(self, key: str) -> Optional[RETURN_VAL_TYPE]:
+        value = self.l1.get(key)
+        if value is not None:
+            self.stats.l1_hits += 1
+        return value
+
+    def get_store(self, key: str) -> Optional[RETURN_VAL_TYPE]:
+        try:
+            cached = self.store.get(key)
+        except Exception as e:
+            self.stats.errors += 1
+            logger.warning(f"LLM cache read failed: {e}")
+            cached = None
+
+        if cached is not None:
+            try:
+                value = loads(cached, allowed_objects="core")
+            except Exception as e:
+                self.stats.errors += 1
+                logger.warning(f"LLM cache entry unreadable: {e}")
+                cached = None
+
+        if cached is None:
+            self.stats.misses += 1
+            return None
+        self.stats.store_hits += 1
+        self.l1.set(key, value, "llm")
+        return value
+
+    def set(self, key: str, value: RETURN_VAL_TYPE):
+        self.l1.set(key, value, "llm")
+        try:
+            self.store.set(key, dumps(value))
+            self.stats.writes += 1
+        except Exception as e:
+            self.stats.errors += 1
+            logger.warning(f"LLM cache write failed: {e}")
+
+    def clear(self):
+        self.l1.clear()
+        self.store.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "backend": settings.LLM_CACHE_BACKEND,
+            "l1_entries": len(self.l1),
+            **self.stats.to_dict()
+        }
+
+    def close(self):
+        if self._store is not None:
+            self._store.close()
+
+class LLMResponseCache(BaseCache):
+    """Per-agent LangChain cache view, namespaced by the agent's system prompt hash"""
+
+    def __init__(self, namespace: str = "", cache: LLMCache = None):
+        self.namespace = namespace
+        self.cache = cache or llm_cache
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = self.cache.make_key(self.namespace, prompt, llm_string)
+        return self.cache.get_l1(key) or self.cache.get_store(key)
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE):
+        self.cache.set(self.cache.make_key(self.namespace, prompt, llm_string), return_val)
+
+    async def alookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = self.cache.make_key(self.namespace, prompt, llm_string)
+        value = self.cache.get_l1(key)
+        if value is not None:
+            return value
+        return await asyncio.to_thread(self.cache.get_store, key)
+
+    async def aupdate(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE):
+        key = self.cache.make_key(self.namespace, prompt, llm_string)
+        await asyncio.to_thread(self.cache.set, key, return_val)
+
+    def clear(self, **kwargs: Any):
+        self.cache.clear()
+
+llm_cache = LLMCache()
@@ -0,0 +1,177 @@
+import asyncio
+import contextvars
+import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, Callable, Awaitable, Optional, Set, TypeVar
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Thread work started by the scheduled job currently running in this context
+_job_threads: contextvars.ContextVar[Optional[Set[Future]]] = contextvars.ContextVar("agent_job_threads", default=None)
+
+@dataclass
+class SchedulerStats:
+    """Queue-wait versus run-time counters for one agent type"""
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    timed_out: int = 0
+    queued: int = 0
+    running: int = 0
+    max_running: int = 0
+    queue_wait_total: float = 0.0
+    queue_wait_max: float = 0.0
+    run_time_total: float = 0.0
+    run_time_max: float = 0.0
+    # timed-out jobs whose pool thread is still running and holding the slot
+    lingering: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {k: round(v, 3) if isinstance(v, float) else v for k, v in asdict(self).items()}
+        started = self.completed + self.failed + self.timed_out
+        data["queue_wait_avg"] = round(self.queue_wait_total / started, 3) if started else 0.0
+        data["run_time_avg"] = round(self.run_time_total / started, 3) if started else 0.0
+        return data
+
+class AgentScheduler:
+    """Bounds agent concurrency globally and per agent type
+
+    A timeout cancels the job's coroutine, but a run_in_thread call it was
+    awaiting cannot be interrupted. Such a job keeps its slot until the
+    thread finishes, so abandoned threads never outnumber the slots and
+    new jobs never queue invisibly inside the thread pool.
+    """
+
+    def __init__(self):
+        self.max_concurrency = settings.AGENT_MAX_CONCURRENCY
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self._global_slots: Optional[asyncio.Semaphore] = None
+        self._type_slots: Dict[str, asyncio.Semaphore] = {}
+        self._lingering: Set[asyncio.Task] = set()
+        self.stats: Dict[str, SchedulerStats] = {}
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(
+                max_workers=settings.AGENT_THREAD_POOL_SIZE or self.max_concurrency,
+                thread_name_prefix="agent-worker"
+            )
+        return self.executor
+
+    def _global(self) -> asyncio.Semaphore:
+        if self._global_slots is None:
+            self._global_slots = asyncio.Semaphore(self.max_concurrency)
+        return self._global_slots
+
+    def _for_type(self, agent_type: str) -> asyncio.Semaphore:
+        if agent_type not in self._type_slots:
+            limit = settings.AGENT_CONCURRENCY_LIMITS.get(agent_type, settings.AGENT_TYPE_CONCURRENCY)
+            self._type_slots[agent_type] = asyncio.Semaphore(limit)
+        return self._type_slots[agent_type]
+
+    def _stats(self, agent_type: str) -> SchedulerStats:
+        if agent_type not in self.stats:
+            self.stats[agent_type] = SchedulerStats()
+        return self.stats[agent_type]
+
+    def _release(self, agent_type: str):
+        self._global().release()
+        self._for_type(agent_type).release()
+
+    async def _release_when_done(self, agent_type: str, threads: Set[Future]):
+        stats = self._stats(agent_type)
+        try:
+            await asyncio.wait([asyncio.wrap_future(f) for f in threads])
+        finally:
+            stats.lingering -= 1
+            self._release(agent_type)
+
+    async def run(
+        self,
+        agent_type: str,
+        job: Callable[[], Awaitable[T]],
+        timeout: Optional[float] = None
+    ) -> T:
+        """Wait for a slot, then run job with timeout applied to run time only"""
+        stats = self._stats(agent_type)
+        stats.submitted += 1
+        stats.queued += 1
+        queued_at = time.monotonic()
+
+        try:
+            await self._for_type(agent_type).acquire()
+            try:
+                await self._global().acquire()
+            except BaseException:
+                self._for_type(agent_type).release()
+                raise
+        finally:
+            stats.queued -= 1
+
+        started = time.monotonic()
+        wait = started - queued_at
+        stats.queue_wait_total += wait
+        stats.queue_wait_max = max(stats.queue_wait_max, wait)
+        if wait > 1:
+            logger.info(f"{agent_type} waited {wait:.1f}s for an agent slot")
+
+        # The timeout starts only once a slot is held, so queued agents
+        # show up as queue wait instead of spurious AGENT_TIMEOUT failures
+        stats.running += 1
+        stats.max_running = max(stats.max_running, stats.running)
+        threads: Set[Future] = set()
+        token = _job_threads.set(threads)
+        try:
+            result = await asyncio.wait_for(job(), timeout=timeout)
+            stats.completed += 1
+            return result
+        except asyncio.TimeoutError:
+            stats.timed_out += 1
+            raise
+        except Exception:
+            stats.failed += 1
+            raise
+        finally:
+            stats.running -= 1
+            elapsed = time.monotonic() - started
+            stats.run_time_total += elapsed
+            stats.run_time_max = max(stats.run_time_max, elapsed)
+            _job_threads.reset(token)
+            running = {f for f in threads if not f.done()}
+            if running:
+                stats.lingering += 1
+                logger.warning(f"{agent_type} agent thread outlived its job; holding its slot until it finishes")
+                task = asyncio.get_running_loop().create_task(self._release_when_done(agent_type, running))
+                self._lingering.add(task)
+                task.add_done_callback(self._lingering.discard)
+            else:
+                self._release(agent_type)
+
+    async def run_in_thread(self, fn: Callable[[], T]) -> T:
+        """Run a blocking call on the dedicated agent pool, preserving contextvars"""
+        ctx = contextvars.copy_context()
+        future = self._get_executor().submit(ctx.run, fn)
+        threads = _job_threads.get()
+        if threads is not None:
+            threads.add(future)
+        return await asyncio.wrap_future(future)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "thread_pool_size": settings.AGENT_THREAD_POOL_SIZE or self.max_concurrency,
+            "agents": {name: s.to_dict() for name, s in self.stats.items()}
+        }
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+
+agent_scheduler = AgentScheduler()
@@ -0,0 +1,107 @@
+import asyncio
+import logging
+from typing import Dict, Any, List, Optional
+
+from agents.context import new_assessment_id
+from api.streaming import EventBroker
+from config.settings import settings
+from storage.assessment_store import AssessmentStore
+
+logger = logging.getLogger(__name__)
+
+class QueueFullError(Exception):
+    """Raised when the job queue cannot accept more assessments"""
+
+class JobManager:
+    """Runs queued assessments on a pool of background workers"""
+
+    def __init__(self, coordinator, store: AssessmentStore, broker: EventBroker = None, workers: int = None):
+        self.coordinator = coordinator
+        self.store = store
+        self.broker = broker or EventBroker()
+        self.worker_count = workers or settings.JOB_WORKERS
+        self.queue: Optional[asyncio.Queue] = None
+        self.workers: List[asyncio.Task] = []
+        self.heartbeat: Optional[asyncio.Task] = None
+
+    async def start(self):
+        await self.store.init()
+        self.queue = asyncio.Queue(maxsize=settings.JOB_QUEUE_SIZE)
+        self.workers = [
+            asyncio.create_task(self._worker(i)) for i in range(self.worker_count)
+        ]
+        self.heartbeat = asyncio.create_task(self._heartbeat())
+        logger.info(f"Started {self.worker_count} assessment workers ({self.store.worker_id})")
+
+    async def stop(self):
+        tasks = self.workers + ([self.heartbeat] if self.heartbeat else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.workers = []
+        self.heartbeat = None
+
+    async def _heartbeat(self):
+        """Keep this worker's jobs alive in the store and reap dead workers' jobs"""
+        while True:
+            await asyncio.sleep(settings.JOB_HEARTBEAT_INTERVAL)
+            try:
+                await self.store.heartbeat()
+                await self.store.mark_orphans()
+            except Exception as e:
+                logger.warning(f"Assessment store heartbeat failed: {e}")
+
+    async def submit(self, request: Dict[str, Any]) -> str:
+        """Queue an assessment and return its id immediately"""
+        if self.queue is None:
+            raise RuntimeError("JobManager not started")
+        if self.queue.full():
+            raise QueueFullError(f"Assessment queue full ({settings.JOB_QUEUE_SIZE} pending)")
+
+        assessment_id = new_assessment_id()
+        await self.store.create(assessment_id, request)
+        self.queue.put_nowait((assessment_id, request))
+        return assessment_id
+
+    async def _worker(self, index: int):
+        while True:
+            assessment_id, request = await self.queue.get()
+            try:
+                await self._run(assessment_id, request)
+            except Exception as e:
+                logger.error(f"Worker {index} failed on {assessment_id}: {e}")
+            finally:
+                self.queue.task_done()
+
+    async def _run(self, assessment_id: str, request: Dict[str, Any]):
+        await self.store.update(assessment_id, status="running")
+
+        async def on_event(event: str, data: Dict[str, Any]):
+            await self.broker.publish(assessment_id, event, data)
+            await self.store.update(assessment_id, phase=data["phase"], progress=data["progress"])
+
+        try:
+            result = await self.coordinator.run_assessment(
+                **request,
+                assessment_id=assessment_id,
+                on_event=on_event
+            )
+        except Exception as e:
+            await self.store.update(assessment_id, status="failed", error=str(e))
+            await self.broker.close(assessment_id, {"assessment_id": assessment_id, "status": "error", "error": str(e)})
+            raise
+
+        # Store first: a subscriber that reads the record after this sees a
+        # terminal status, one that subscribed earlier gets the close below
+        if result.get("status") == "success":
+            await self.store.update(assessment_id, status="completed", progress=100, result=result)
+        else:
+            await self.store.update(assessment_id, status="failed", result=result, error=result.get("error"))
+        await self.broker.close(assessment_id, result)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "workers": len(self.workers),
+            "queued": self.queue.qsize() if self.queue else 0,
+            "queue_size": settings.JOB_QUEUE_SIZE
+        }
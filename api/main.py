@@ -1,18 +1,65 @@
+import asyncio
+import json
 import logging
-from fastapi import FastAPI
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Any, List, Optional
+from fastapi import FastAPI, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel
+from agents.batch import BatchRunner
+from agents.context import new_assessment_id
 from agents.coordinator_agent import CoordinatorAgent
+from agents.llm_cache import llm_cache
+from api.jobs import JobManager, QueueFullError
+from datastores.edgar import edgar_store, get_edgar_store
+from datastores.gleif import get_lei_registry, lei_registry
+from datastores.macro import get_macro_store, macro_store
+from datastores.sanctions import get_screener, sanctions_screener
+from api.streaming import EventBroker, END_OF_STREAM, format_sse, stream_events
+from storage.assessment_store import get_assessment_store
+from telemetry import profile_path, render_metrics, setup_tracing
+from tools.api_manager import api_manager
 from config.logging_config import setup_logging
 from config.settings import settings
 from datetime import datetime
 
 setup_logging(settings.LOG_LEVEL)
+setup_tracing()
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await api_manager.init_session()
+    logger.info("HTTP client pool ready")
+    if settings.WARM_UP_ON_STARTUP:
+        # build agents, the Neo4j schema and the synced datastores concurrently,
+        # before the worker takes traffic rather than on the first assessment
+        started = time.perf_counter()
+        await asyncio.gather(
+            coordinator.warm_up(),
+            get_lei_registry(),
+            get_edgar_store(),
+            get_macro_store(),
+            get_screener()
+        )
+        logger.info(f"Warm-up finished in {time.perf_counter() - started:.2f}s")
+    await job_manager.start()
+    yield
+    await job_manager.stop()
+    await assessment_store.close()
+    await coordinator.graph_builder.close()
+    await api_manager.close_session()
+    llm_cache.close()
+    logger.info("HTTP client pool closed")
+
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
-    description="Multi-agent enterprise risk assessment platform"
+    description="Multi-agent enterprise risk assessment platform",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -22,7 +69,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-coordinator = CoordinatorAgent()
+assessment_store = get_assessment_store()
+coordinator = CoordinatorAgent(snapshot_store=assessment_store)
+event_broker = EventBroker()
+job_manager = JobManager(coordinator, assessment_store, event_broker)
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+TERMINAL_STATUSES = {"completed", "failed", "interrupted"}
+
+class CompanyRequest(BaseModel):
+    company_name: str
+    ticker: Optional[str] = None
+    country: str = "US"
+    domain: Optional[str] = None
+    sectors: List[str] = ["Technology"]
+    incremental: bool = False
+
+async def _persist_result(request: Dict[str, Any], result: Dict[str, Any]):
+    try:
+        await assessment_store.save_result(result["assessment_id"], request, result)
+    except Exception as e:
+        logger.warning(f"Could not persist assessment {result['assessment_id']}: {e}")
 
 @app.get("/")
 async def root():
@@ -39,17 +106,107 @@ async def create_assessment(
     ticker: str = None,
     country: str = "US",
     domain: str = None,
-    sectors: list = None
+    sectors: list = None,
+    mode: str = "sync",
+    incremental: bool = False,
+    profile: bool = Header(False, alias="X-Profile")
 ):
-    result = await coordinator.run_assessment(
-        company_name=company_name,
-        ticker=ticker,
-        country=country,
-        domain=domain,
-        sectors=sectors or ["Technology"]
-    )
+    request = {
+        "company_name": company_name,
+        "ticker": ticker,
+        "country": country,
+        "domain": domain,
+        "sectors": sectors or ["Technology"],
+        "incremental": incremental,
+        "profile": profile
+    }
+    
+    if mode == "job":
+        try:
+            assessment_id = await job_manager.submit(request)
+        except QueueFullError as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        return JSONResponse(status_code=202, content={
+            "assessment_id": assessment_id,
+            "status": "queued",
+            "status_url": f"/api/v1/assessment/{assessment_id}"
+        })
+    
+    result = await coordinator.run_assessment(**request)
+    await _persist_result(request, result)
     return result
 
+@app.post("/api/v1/assess/stream")
+async def stream_assessment(
+    company_name: str,
+    ticker: str = None,
+    country: str = "US",
+    domain: str = None,
+    sectors: list = None,
+    incremental: bool = False,
+    profile: bool = Header(False, alias="X-Profile")
+):
+    """Run an assessment, streaming phases and per-agent results as SSE"""
+    request = {
+        "company_name": company_name,
+        "ticker": ticker,
+        "country": country,
+        "domain": domain,
+        "sectors": sectors or ["Technology"],
+        "incremental": incremental,
+        "profile": profile
+    }
+    assessment_id = new_assessment_id()
+    queue = asyncio.Queue()
+    
+    async def on_event(event: str, data: Dict[str, Any]):
+        queue.put_nowait((event, data))
+    
+    async def run():
+        try:
+            result = await coordinator.run_assessment(
+                **request,
+                assessment_id=assessment_id,
+                on_event=on_event
+            )
+            queue.put_nowait(("result", result))
+            await _persist_result(request, result)
+        finally:
+            queue.put_nowait(END_OF_STREAM)
+    
+    async def body():
+        task = asyncio.create_task(run())
+        try:
+            yield format_sse("accepted", {"assessment_id": assessment_id})
+            async for message in stream_events(queue):
+                yield message
+        finally:
+            # Client went away: stop spending agent time on an unread stream
+            if not task.done():
+                task.cancel()
+    
+    return StreamingResponse(body(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+@app.post("/api/v1/assess/batch")
+async def batch_assessment(companies: List[CompanyRequest], concurrency: int = None):
+    """Assess a portfolio, streaming one JSON line per company as it completes"""
+    if len(companies) > settings.BATCH_MAX_COMPANIES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch limited to {settings.BATCH_MAX_COMPANIES} companies"
+        )
+    
+    concurrency = min(concurrency or settings.BATCH_CONCURRENCY, settings.BATCH_CONCURRENCY)
+    runner = BatchRunner(coordinator, concurrency=concurrency)
+    
+    async def body():
+        async for record in runner.run([c.model_dump() for c in companies]):
+            if record.get("assessment_id"):
+                await _persist_result(record["input"], record)
+            yield json.dumps(record, default=str) + "\n"
+    
+    return StreamingResponse(body(), media_type="application/x-ndjson")
+
 @app.get("/api/v1/health")
 async def health_check():
     agent_health = await coordinator.health_check()
@@ -57,16 +214,77 @@ async def health_check():
         "status": "healthy",
         "agents": agent_health,
         "coordinator_status": coordinator.status,
+        "http_pool": api_manager.get_pool_stats(),
+        "cache": api_manager.get_cache_stats(),
+        "rate_limits": api_manager.get_rate_limit_stats(),
+        "circuit_breakers": api_manager.get_breaker_stats(),
+        "llm_cache": llm_cache.get_stats(),
+        "datastores": {
+            "gleif": lei_registry.get_stats(),
+            "edgar": edgar_store.get_stats(),
+            "macro": macro_store.get_stats(),
+            "sanctions": sanctions_screener.get_stats(),
+        },
+        "jobs": job_manager.get_stats(),
         "timestamp": datetime.now().isoformat()
     }
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus scrape endpoint"""
+    body, content_type = render_metrics()
+    if not body:
+        raise HTTPException(status_code=404, detail="Metrics disabled or prometheus_client not installed")
+    return Response(content=body, media_type=content_type)
+
 @app.get("/api/v1/assessment/{assessment_id}")
 async def get_assessment(assessment_id: str):
-    return {
-        "assessment_id": assessment_id,
-        "status": "pending",
-        "message": "Use /api/v1/assess to run assessment"
-    }
+    record = await assessment_store.get(assessment_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Assessment {assessment_id} not found")
+    return record
+
+@app.get("/api/v1/assessment/{assessment_id}/profile")
+async def get_assessment_profile(assessment_id: str, format: str = "speedscope"):
+    """Stored sampling profile: speedscope JSON (speedscope.app) or collapsed stacks"""
+    path = profile_path(assessment_id, format)
+    if path is None:
+        raise HTTPException(status_code=404, detail=f"No {format} profile for assessment {assessment_id}")
+    media_type = "application/json" if format == "speedscope" else "text/plain"
+    return FileResponse(path, media_type=media_type, filename=os.path.basename(path))
+
+@app.get("/api/v1/assessment/{assessment_id}/events")
+async def assessment_events(assessment_id: str):
+    """Live SSE progress for a queued or running job"""
+    # Subscribe before reading the record so no event slips in between
+    queue = event_broker.subscribe(assessment_id)
+    record = await assessment_store.get(assessment_id)
+    if record is None:
+        event_broker.unsubscribe(assessment_id, queue)
+        raise HTTPException(status_code=404, detail=f"Assessment {assessment_id} not found")
+    
+    if record["status"] in TERMINAL_STATUSES:
+        event_broker.unsubscribe(assessment_id, queue)
+        
+        async def finished():
+            yield format_sse("result", record["result"] or record)
+        
+        return StreamingResponse(finished(), media_type="text/event-stream", headers=SSE_HEADERS)
+    
+    async def body():
+        try:
+            yield format_sse("status", {
+                "assessment_id": assessment_id,
+                "status": record["status"],
+                "phase": record["phase"],
+                "progress": record["progress"]
+            })
+            async for message in stream_events(queue):
+                yield message
+        finally:
+            event_broker.unsubscribe(assessment_id, queue)
+    
+    return StreamingResponse(body(), media_type="text/event-stream", headers=SSE_HEADERS)
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,59 @@
+import asyncio
+import json
+import logging
+from typing import Dict, Any, Set, Tuple, Optional, AsyncIterator
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Queue item marking the end of an event stream
+END_OF_STREAM: Tuple[str, Dict[str, Any]] = ("end", {})
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Encode one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+class EventBroker:
+    """Fans out assessment events to any number of live subscribers"""
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+    def subscribe(self, assessment_id: str) -> asyncio.Queue:
+        queue = asyncio.Queue()
+        self._subscribers.setdefault(assessment_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, assessment_id: str, queue: asyncio.Queue):
+        subscribers = self._subscribers.get(assessment_id)
+        if subscribers is not None:
+            subscribers.discard(queue)
+            if not subscribers:
+                del self._subscribers[assessment_id]
+
+    async def publish(self, assessment_id: str, event: str, data: Dict[str, Any]):
+        for queue in self._subscribers.get(assessment_id, ()):
+            queue.put_nowait((event, data))
+
+    async def close(self, assessment_id: str, result: Optional[Dict[str, Any]] = None):
+        """Send the final result (if any) and end every subscriber's stream"""
+        if result is not None:
+            await self.publish(assessment_id, "result", result)
+        for queue in self._subscribers.get(assessment_id, ()):
+            queue.put_nowait(END_OF_STREAM)
+
+async def stream_events(queue: asyncio.Queue) -> AsyncIterator[str]:
+    """Yield SSE messages from queue until END_OF_STREAM, with keep-alives"""
+    while True:
+        try:
+            item = await asyncio.wait_for(queue.get(), timeout=settings.SSE_KEEPALIVE_INTERVAL)
+        except asyncio.TimeoutError:
+            # Comment line keeps proxies from closing an idle connection
+            yield ": keep-alive\n\n"
+            continue
+
+        if item is END_OF_STREAM:
+            return
+        event, data = item
+        yield format_sse(event, data)
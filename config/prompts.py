@@ -1,6 +1,7 @@
 """
 Agent system prompts for specialized risk assessment
 """
+import hashlib
 
 def get_agent_prompt(agent_type: str) -> str:
     """Get system prompt for specific agent type"""
@@ -171,3 +172,7 @@ EXPECTED OUTPUT:
     }
     
     return prompts.get(agent_type, "")
+
+def get_prompt_hash(system_prompt: str) -> str:
+    """Short stable hash of a system prompt, used to version cached LLM responses"""
+    return hashlib.sha256(system_prompt.encode()).hexdigest()[:16]
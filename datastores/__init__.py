@@ -0,0 +1,11 @@
+from .edgar import EdgarStore, edgar_store, update_edgar
+from .gleif import LEIRegistry, lei_registry, update_gleif
+from .macro import MacroStore, macro_store, update_macro
+from .sanctions import SanctionsScreener, sanctions_screener, update_sanctions
+
+__all__ = [
+    "EdgarStore", "edgar_store", "update_edgar",
+    "LEIRegistry", "lei_registry", "update_gleif",
+    "MacroStore", "macro_store", "update_macro",
+    "SanctionsScreener", "sanctions_screener", "update_sanctions",
+]
@@ -0,0 +1,100 @@
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+import aiohttp
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "EnterpriseRiskAssessment/3.0"
+_CHUNK = 1 << 20
+
+class Manifest:
+    """Per-directory record of downloaded files (validators, hash, sync time)"""
+
+    def __init__(self, directory: Path):
+        self.path = Path(directory) / "manifest.json"
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            self.entries = json.loads(self.path.read_text(encoding="utf-8"))
+
+    def get(self, name: str) -> Dict[str, Any]:
+        return self.entries.get(name, {})
+
+    def update(self, name: str, **fields):
+        self.entries.setdefault(name, {}).update(fields)
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.entries, indent=2, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+def open_session(headers: Optional[Dict[str, str]] = None) -> aiohttp.ClientSession:
+    """Session for bulk downloads: no total timeout, only a stall timeout"""
+    return aiohttp.ClientSession(
+        headers={"User-Agent": USER_AGENT, **(headers or {})},
+        timeout=aiohttp.ClientTimeout(total=None, sock_read=settings.DATASTORE_DOWNLOAD_TIMEOUT),
+    )
+
+async def download(
+    session: aiohttp.ClientSession,
+    url: str,
+    dest: Path,
+    manifest: Manifest,
+    name: Optional[str] = None
+) -> bool:
+    """Fetch url into dest unless it is unchanged upstream
+
+    Sends the stored ETag/Last-Modified as a conditional request, streams
+    the body to a temp file and only replaces dest when the content hash
+    differs. Returns True when dest changed.
+    """
+    name = name or dest.name
+    entry = manifest.get(name)
+    headers = {}
+    if dest.exists():
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(dest.name + ".part")
+    digest = hashlib.sha256()
+    size = 0
+
+    async with session.get(url, headers=headers) as response:
+        if response.status == 304:
+            logger.info(f"{name}: not modified")
+            manifest.update(name, checked_at=datetime.now().isoformat())
+            return False
+        response.raise_for_status()
+        with open(tmp, "wb") as fh:
+            async for chunk in response.content.iter_chunked(_CHUNK):
+                fh.write(chunk)
+                digest.update(chunk)
+                size += len(chunk)
+        validators = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+
+    sha256 = digest.hexdigest()
+    now = datetime.now().isoformat()
+    if dest.exists() and entry.get("sha256") == sha256:
+        tmp.unlink()
+        logger.info(f"{name}: content unchanged")
+        manifest.update(name, checked_at=now, **validators)
+        return False
+
+    os.replace(tmp, dest)
+    manifest.update(name, url=url, sha256=sha256, bytes=size, checked_at=now, updated_at=now, **validators)
+    logger.info(f"{name}: downloaded {size / 1e6:.1f} MB")
+    return True
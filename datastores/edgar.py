@@ -0,0 +1,438 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+import zipfile
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Iterable, Set
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pc = pq = None
+
+from config.settings import settings
+from .download import Manifest, open_session, download
+
+logger = logging.getLogger(__name__)
+
+TICKERS_URL = "https://www.sec.gov/files/company_tickers.json"
+COMPANYFACTS_URL = "https://www.sec.gov/Archives/edgar/daily-index/xbrl/companyfacts.zip"
+SUBMISSIONS_URL = "https://www.sec.gov/Archives/edgar/daily-index/bulkdata/submissions.zip"
+DAILY_INDEX_URL = "https://www.sec.gov/Archives/edgar/daily-index/{year}/QTR{quarter}/master.{day:%Y%m%d}.idx"
+COMPANY_FACTS_API = "https://data.sec.gov/api/xbrl/companyfacts/CIK{cik:010d}.json"
+SUBMISSIONS_API = "https://data.sec.gov/submissions/CIK{cik:010d}.json"
+
+# SEC fair access: at most 10 requests per second
+_SEC_REQUESTS_PER_SECOND = 10
+# Beyond this many days of daily indexes a bulk reload is cheaper
+_MAX_INCREMENTAL_DAYS = 30
+_ROW_GROUP_SIZE = 10_000
+
+ANNUAL_FORMS = {"10-K", "10-K/A", "20-F", "20-F/A", "40-F", "40-F/A"}
+
+# Statement line -> XBRL concepts in order of preference (USD facts only)
+FINANCIAL_CONCEPTS: Dict[str, List[str]] = {
+    "revenue_usd": [
+        "us-gaap:Revenues",
+        "us-gaap:RevenueFromContractWithCustomerExcludingAssessedTax",
+        "us-gaap:RevenueFromContractWithCustomerIncludingAssessedTax",
+        "us-gaap:SalesRevenueNet",
+        "ifrs-full:Revenue",
+    ],
+    "net_income_usd": ["us-gaap:NetIncomeLoss", "us-gaap:ProfitLoss", "ifrs-full:ProfitLoss"],
+    "operating_income_usd": ["us-gaap:OperatingIncomeLoss"],
+    "operating_cash_flow_usd": [
+        "us-gaap:NetCashProvidedByUsedInOperatingActivities",
+        "ifrs-full:CashFlowsFromUsedInOperatingActivities",
+    ],
+    "total_assets_usd": ["us-gaap:Assets", "ifrs-full:Assets"],
+    "total_liabilities_usd": ["us-gaap:Liabilities", "ifrs-full:Liabilities"],
+    "equity_usd": [
+        "us-gaap:StockholdersEquity",
+        "us-gaap:StockholdersEquityIncludingPortionAttributableToNoncontrollingInterest",
+        "ifrs-full:Equity",
+    ],
+    "current_assets_usd": ["us-gaap:AssetsCurrent", "ifrs-full:CurrentAssets"],
+    "current_liabilities_usd": ["us-gaap:LiabilitiesCurrent", "ifrs-full:CurrentLiabilities"],
+    "cash_usd": ["us-gaap:CashAndCashEquivalentsAtCarryingValue", "ifrs-full:CashAndCashEquivalents"],
+    "long_term_debt_usd": ["us-gaap:LongTermDebt", "us-gaap:LongTermDebtNoncurrent"],
+}
+# Period (income/cash flow) lines; the rest are balance-sheet instants
+_FLOW_METRICS = {"revenue_usd", "net_income_usd", "operating_income_usd", "operating_cash_flow_usd"}
+_CONCEPT_METRIC = {c: m for m, concepts in FINANCIAL_CONCEPTS.items() for c in concepts}
+_CONCEPT_PRIORITY = {c: i for concepts in FINANCIAL_CONCEPTS.values() for i, c in enumerate(concepts)}
+
+_FACT_COLUMNS = ["cik", "concept", "value", "start", "end", "fy", "fp", "form", "filed", "accn"]
+_FILING_COLUMNS = ["cik", "accession", "form", "filing_date", "report_date", "primary_document"]
+_COMPANY_COLUMNS = ["cik", "name", "sic", "sic_description", "state_of_incorporation",
+                    "fiscal_year_end", "tickers", "exchanges"]
+_DATE_COLUMNS = {"start", "end", "filed", "filing_date", "report_date"}
+_INT_COLUMNS = {"cik", "fy"}
+_CATEGORY_COLUMNS = {"concept", "form", "fp"}
+
+def _columns(names: List[str]) -> Dict[str, list]:
+    return {name: [] for name in names}
+
+def fact_rows(doc: Dict[str, Any], rows: Optional[Dict[str, list]] = None) -> Dict[str, list]:
+    """Annual-report USD facts for the tracked concepts of one companyfacts document"""
+    rows = rows if rows is not None else _columns(_FACT_COLUMNS)
+    cik = int(doc["cik"])
+    for taxonomy, concepts in doc.get("facts", {}).items():
+        for concept, body in concepts.items():
+            qualified = f"{taxonomy}:{concept}"
+            if qualified not in _CONCEPT_METRIC:
+                continue
+            for fact in body.get("units", {}).get("USD", []):
+                if fact.get("form") not in ANNUAL_FORMS:
+                    continue
+                for column, value in zip(_FACT_COLUMNS, (
+                    cik, qualified, float(fact["val"]), fact.get("start"), fact["end"],
+                    fact.get("fy"), fact.get("fp"), fact["form"], fact["filed"], fact.get("accn")
+                )):
+                    rows[column].append(value)
+    return rows
+
+def filing_rows(doc: Dict[str, Any], rows: Optional[Dict[str, list]] = None) -> Dict[str, list]:
+    """The recent-filings block of one submissions document"""
+    rows = rows if rows is not None else _columns(_FILING_COLUMNS)
+    recent = doc.get("filings", {}).get("recent", {})
+    accessions = recent.get("accessionNumber", [])
+    rows["cik"].extend([int(doc["cik"])] * len(accessions))
+    rows["accession"].extend(accessions)
+    rows["form"].extend(recent.get("form", []))
+    rows["filing_date"].extend(recent.get("filingDate", []))
+    rows["report_date"].extend(d or None for d in recent.get("reportDate", []))
+    rows["primary_document"].extend(recent.get("primaryDocument", []))
+    return rows
+
+def company_row(doc: Dict[str, Any], rows: Optional[Dict[str, list]] = None) -> Dict[str, list]:
+    rows = rows if rows is not None else _columns(_COMPANY_COLUMNS)
+    for column, value in zip(_COMPANY_COLUMNS, (
+        int(doc["cik"]), doc.get("name"), doc.get("sic") or None, doc.get("sicDescription") or None,
+        doc.get("stateOfIncorporation") or None, doc.get("fiscalYearEnd") or None,
+        ",".join(doc.get("tickers", [])), ",".join(e for e in doc.get("exchanges", []) if e)
+    )):
+        rows[column].append(value)
+    return rows
+
+def _to_table(rows: Dict[str, list]) -> "pa.Table":
+    arrays = {}
+    for name, values in rows.items():
+        if name in _INT_COLUMNS:
+            array = pa.array(values, type=pa.int64())
+        elif name == "value":
+            array = pa.array(values, type=pa.float64())
+        else:
+            array = pa.array(values, type=pa.string())
+        if name in _DATE_COLUMNS:
+            array = array.cast(pa.date32())
+        elif name in _CATEGORY_COLUMNS:
+            array = array.dictionary_encode()
+        arrays[name] = array
+    return pa.table(arrays)
+
+def _write_sorted(table: "pa.Table", path: Path):
+    """Write sorted by cik so row-group statistics prune per-company reads"""
+    table = table.sort_by("cik")
+    tmp = path.with_name(path.name + ".tmp")
+    pq.write_table(table, tmp, row_group_size=_ROW_GROUP_SIZE, compression="zstd")
+    tmp.replace(path)
+
+def _upsert(path: Path, rows: Dict[str, list], ciks: Set[int]):
+    """Replace every row of ciks in the table at path with rows"""
+    new = _to_table(rows)
+    if path.exists():
+        old = pq.read_table(path)
+        keep = pc.invert(pc.is_in(old["cik"], value_set=pa.array(sorted(ciks), pa.int64())))
+        new = pa.concat_tables([old.filter(keep), new])
+    _write_sorted(new, path)
+
+class EdgarStore:
+    """Local SEC EDGAR data: ticker->CIK index plus Parquet company facts and filings
+
+    Tables are sorted by cik, so each company lives in one or two row
+    groups; the footer's per-row-group cik range is kept in memory and a
+    lookup reads only the row groups that can contain it.
+    """
+
+    TABLES = ("companies", "filings", "facts")
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = Path(directory or settings.EDGAR_DATA_DIR)
+        self.tickers: Dict[str, Dict[str, Any]] = {}
+        self.row_groups: Dict[str, Any] = {}
+        self._mtimes: Dict[str, float] = {}
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def path(self, table: str) -> Path:
+        return self.directory / f"{table}.parquet"
+
+    def has(self, table: str) -> bool:
+        return table in self.row_groups
+
+    def load(self):
+        """(Re)read the ticker index and table footers that changed on disk"""
+        if pq is None:
+            return
+        with self._lock:
+            for table in ("tickers", *self.TABLES):
+                path = self.path(table)
+                if not path.exists() or path.stat().st_mtime == self._mtimes.get(table):
+                    continue
+                self._mtimes[table] = path.stat().st_mtime
+                if table == "tickers":
+                    rows = pq.read_table(path).to_pydict()
+                    self.tickers = {
+                        ticker: {"cik": cik, "title": title}
+                        for ticker, cik, title in zip(rows["ticker"], rows["cik"], rows["title"])
+                    }
+                    logger.info(f"Loaded EDGAR ticker index: {len(self.tickers)} tickers")
+                    continue
+                parquet = pq.ParquetFile(path)
+                column = parquet.schema_arrow.get_field_index("cik")
+                stats = [parquet.metadata.row_group(i).column(column).statistics
+                         for i in range(parquet.num_row_groups)]
+                self.row_groups[table] = (
+                    parquet,
+                    np.array([s.min for s in stats], dtype=np.int64),
+                    np.array([s.max for s in stats], dtype=np.int64),
+                )
+            self._checked_at = time.monotonic()
+
+    def stale(self) -> bool:
+        return time.monotonic() - self._checked_at >= settings.DATASTORE_RELOAD_INTERVAL
+
+    def cik_for(self, ticker: Optional[str]) -> Optional[str]:
+        """CIK (unpadded) for a ticker; share classes like BRK.B map via BRK-B"""
+        if not ticker:
+            return None
+        entry = self.tickers.get(ticker.upper()) or self.tickers.get(ticker.upper().replace(".", "-"))
+        return str(entry["cik"]) if entry else None
+
+    def _read(self, table: str, cik: str) -> pd.DataFrame:
+        parquet, mins, maxs = self.row_groups[table]
+        cik = int(cik)
+        groups = np.flatnonzero((mins <= cik) & (maxs >= cik)).tolist()
+        if not groups:
+            return parquet.schema_arrow.empty_table().to_pandas()
+        rows = parquet.read_row_groups(groups)
+        return rows.filter(pc.equal(rows["cik"], cik)).to_pandas()
+
+    def company(self, cik: str) -> Optional[Dict[str, Any]]:
+        if not self.has("companies"):
+            return None
+        rows = self._read("companies", cik)
+        return rows.astype(object).where(rows.notna(), None).iloc[0].to_dict() if len(rows) else None
+
+    def filings(self, cik: str) -> pd.DataFrame:
+        """Recent filings of cik, newest first"""
+        if not self.has("filings"):
+            return pd.DataFrame(columns=_FILING_COLUMNS)
+        return self._read("filings", cik).sort_values("filing_date", ascending=False, ignore_index=True)
+
+    def facts(self, cik: str) -> pd.DataFrame:
+        if not self.has("facts"):
+            return pd.DataFrame(columns=_FACT_COLUMNS)
+        return self._read("facts", cik)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "tickers": len(self.tickers),
+            "tables": {t: self.has(t) for t in self.TABLES},
+        }
+
+_METRIC_CODE = {metric: i for i, metric in enumerate(FINANCIAL_CONCEPTS)}
+_FLOW_CODES = [_METRIC_CODE[m] for m in _FLOW_METRICS]
+
+def _days(column: pd.Series) -> np.ndarray:
+    """Dates (date objects or ISO strings, nulls allowed) as datetime64[D]"""
+    return np.array(column.to_numpy(dtype=object, na_value=None), dtype="datetime64[D]")
+
+def latest_financials(facts: pd.DataFrame) -> Dict[str, Any]:
+    """Most recent annual figure per statement line, plus revenue growth
+
+    Flow lines only count full-year periods (10-Ks also carry quarterly
+    breakdowns); for each line the latest period wins, then the preferred
+    concept, then the latest filing (restatements). Plain NumPy: a
+    company has a few hundred facts, where pandas overhead would dominate.
+    """
+    if facts.empty:
+        return {}
+    concepts = facts["concept"].astype(str).to_numpy()
+    code = np.array([_METRIC_CODE[_CONCEPT_METRIC[c]] for c in concepts])
+    priority = np.array([_CONCEPT_PRIORITY[c] for c in concepts])
+    end, start, filed = _days(facts["end"]), _days(facts["start"]), _days(facts["filed"])
+    value = facts["value"].to_numpy(dtype=float)
+
+    duration = (end - start).astype("timedelta64[D]").astype(float)  # NaT -> nan
+    keep = ~np.isin(code, _FLOW_CODES) | ((duration >= 350) & (duration <= 380))
+    if not keep.any():
+        return {}
+    rows = np.flatnonzero(keep)
+    # sort by metric, then newest period, preferred concept, newest filing
+    rows = rows[np.lexsort((-filed[rows].astype(int), priority[rows], -end[rows].astype(int), code[rows]))]
+    _, first = np.unique(code[rows], return_index=True)
+    latest = {int(code[r]): r for r in rows[first]}
+
+    names = list(FINANCIAL_CONCEPTS)
+    metrics: Dict[str, Any] = {names[c]: float(value[r]) for c, r in latest.items()}
+    revenue = latest.get(_METRIC_CODE["revenue_usd"])
+    anchor = revenue if revenue is not None else rows[0]
+    metrics["period_end"] = str(end[anchor])
+    metrics["fiscal_year"] = int(facts["fy"].iloc[anchor]) if pd.notna(facts["fy"].iloc[anchor]) else None
+
+    if revenue is not None:
+        gap = (end[revenue] - end[rows]).astype(int)
+        prior = rows[(concepts[rows] == concepts[revenue]) & (gap >= 350) & (gap <= 380)]
+        if len(prior) and value[prior[0]]:
+            metrics["revenue_growth_pct"] = round(float(value[revenue] / value[prior[0]] - 1) * 100, 2)
+    return metrics
+
+async def get_edgar_store() -> EdgarStore:
+    """The shared store, reloading the ticker index off the event loop"""
+    if edgar_store.stale():
+        await asyncio.to_thread(edgar_store.load)
+    return edgar_store
+
+def _read_tickers(path: Path) -> Dict[str, list]:
+    doc = json.loads(path.read_text(encoding="utf-8"))
+    rows = _columns(["ticker", "cik", "title"])
+    for entry in doc.values():
+        rows["ticker"].append(entry["ticker"].upper())
+        rows["cik"].append(int(entry["cik_str"]))
+        rows["title"].append(entry["title"])
+    return rows
+
+def _tracked_member(member: str, tracked: Set[int]) -> bool:
+    """CIK0000320193.json of a tracked company; -submissions-001.json pages are older filings"""
+    return member.startswith("CIK") and member[13:] == ".json" and int(member[3:13]) in tracked
+
+def _load_bulk(directory: Path, tracked: Set[int]) -> Dict[str, int]:
+    """Rebuild all tables from the bulk archives, keeping only tracked CIKs"""
+    facts, filings, companies = _columns(_FACT_COLUMNS), _columns(_FILING_COLUMNS), _columns(_COMPANY_COLUMNS)
+    with zipfile.ZipFile(directory / "companyfacts.zip") as archive:
+        for member in archive.namelist():
+            if _tracked_member(member, tracked):
+                fact_rows(json.loads(archive.read(member)), facts)
+    with zipfile.ZipFile(directory / "submissions.zip") as archive:
+        for member in archive.namelist():
+            if _tracked_member(member, tracked):
+                doc = json.loads(archive.read(member))
+                filing_rows(doc, filings)
+                company_row(doc, companies)
+    for table, rows in (("facts", facts), ("filings", filings), ("companies", companies)):
+        _write_sorted(_to_table(rows), directory / f"{table}.parquet")
+    return {"companies": len(companies["cik"]), "filings": len(filings["cik"]), "facts": len(facts["cik"])}
+
+def _apply_updates(directory: Path, docs: Dict[int, Dict[str, Any]]) -> Dict[str, int]:
+    facts, filings, companies = _columns(_FACT_COLUMNS), _columns(_FILING_COLUMNS), _columns(_COMPANY_COLUMNS)
+    for cik, doc in docs.items():
+        if doc.get("facts"):
+            fact_rows(doc["facts"], facts)
+        if doc.get("submissions"):
+            filing_rows(doc["submissions"], filings)
+            company_row(doc["submissions"], companies)
+    ciks = set(docs)
+    _upsert(directory / "facts.parquet", facts, {c for c in ciks if docs[c].get("facts")})
+    _upsert(directory / "filings.parquet", filings, {c for c in ciks if docs[c].get("submissions")})
+    _upsert(directory / "companies.parquet", companies, {c for c in ciks if docs[c].get("submissions")})
+    return {"companies": len(ciks), "filings": len(filings["cik"]), "facts": len(facts["cik"])}
+
+async def _changed_ciks(session, since: date, until: date) -> Set[int]:
+    """CIKs with any filing in the EDGAR daily indexes after since, up to until"""
+    ciks = set()
+    day = since + timedelta(days=1)
+    while day <= until:
+        if day.weekday() < 5:
+            url = DAILY_INDEX_URL.format(year=day.year, quarter=(day.month - 1) // 3 + 1, day=day)
+            async with session.get(url) as response:
+                if response.status == 200:
+                    for line in (await response.text(errors="replace")).splitlines():
+                        # CIK|Company Name|Form Type|Date Filed|Filename
+                        fields = line.split("|")
+                        if len(fields) == 5 and fields[0].isdigit():
+                            ciks.add(int(fields[0]))
+                elif response.status not in (403, 404):  # no index on holidays
+                    response.raise_for_status()
+            await asyncio.sleep(1 / _SEC_REQUESTS_PER_SECOND)
+        day += timedelta(days=1)
+    return ciks
+
+async def _fetch_company_docs(session, ciks: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+    """companyfacts and submissions JSON per CIK, paced to the SEC rate limit"""
+    async def fetch(url: str) -> Optional[Dict[str, Any]]:
+        async with session.get(url) as response:
+            if response.status == 404:  # e.g. no XBRL financials
+                return None
+            response.raise_for_status()
+            return await response.json(content_type=None)
+
+    docs = {}
+    ciks = sorted(ciks)
+    for i in range(0, len(ciks), _SEC_REQUESTS_PER_SECOND // 2):
+        batch = ciks[i:i + _SEC_REQUESTS_PER_SECOND // 2]
+        started = time.monotonic()
+        results = await asyncio.gather(*(
+            fetch(url.format(cik=cik)) for cik in batch for url in (COMPANY_FACTS_API, SUBMISSIONS_API)
+        ))
+        for j, cik in enumerate(batch):
+            docs[cik] = {"facts": results[2 * j], "submissions": results[2 * j + 1]}
+        await asyncio.sleep(max(0.0, 1 - (time.monotonic() - started)))
+    return docs
+
+async def update_edgar(sources: Optional[List[str]] = None, force: bool = False) -> Dict[str, Any]:
+    """Nightly sync: refresh tickers, then re-pull only companies that filed
+
+    The first run (or --force, or a gap over _MAX_INCREMENTAL_DAYS) loads
+    the bulk companyfacts/submissions archives. Later runs read the daily
+    filing indexes since the last sync and fetch just those companies.
+    """
+    if pq is None:
+        logger.error("pyarrow is not installed; EDGAR store disabled")
+        return {"edgar": {"status": "error", "error": "pyarrow not installed"}}
+
+    directory = Path(settings.EDGAR_DATA_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    manifest = Manifest(directory)
+    today = date.today()
+    summary: Dict[str, Any] = {}
+
+    async with open_session({"User-Agent": settings.SEC_USER_AGENT}) as session:
+        tickers_file = directory / "company_tickers.json"
+        if await download(session, TICKERS_URL, tickers_file, manifest, "company_tickers") \
+                or not (directory / "tickers.parquet").exists():
+            _write_sorted(_to_table(_read_tickers(tickers_file)), directory / "tickers.parquet")
+            summary["tickers"] = {"status": "rebuilt"}
+        tracked = set(pq.read_table(directory / "tickers.parquet", columns=["cik"])["cik"].to_pylist())
+
+        synced = manifest.get("filings").get("synced_through")
+        tables_exist = all((directory / f"{t}.parquet").exists() for t in ("facts", "filings", "companies"))
+        if force or not tables_exist or not synced \
+                or (today - date.fromisoformat(synced)).days > _MAX_INCREMENTAL_DAYS:
+            for name, url in (("companyfacts", COMPANYFACTS_URL), ("submissions", SUBMISSIONS_URL)):
+                await download(session, url, directory / f"{name}.zip", manifest, name)
+            stats = await asyncio.to_thread(_load_bulk, directory, tracked)
+            summary["filings"] = {"status": "rebuilt", **stats}
+        else:
+            stored = set(pq.read_table(directory / "companies.parquet", columns=["cik"])["cik"].to_pylist())
+            changed = (await _changed_ciks(session, date.fromisoformat(synced), today) & tracked) \
+                | (tracked - stored)
+            docs = await _fetch_company_docs(session, changed)
+            stats = await asyncio.to_thread(_apply_updates, directory, docs)
+            summary["filings"] = {"status": "updated", **stats}
+        manifest.update("filings", synced_through=today.isoformat(), updated_at=datetime.now().isoformat())
+
+    manifest.save()
+    logger.info(f"EDGAR sync: {summary}")
+    return summary
+
+edgar_store = EdgarStore()
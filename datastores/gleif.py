@@ -0,0 +1,218 @@
+import asyncio
+import csv
+import io
+import json
+import logging
+import shutil
+import threading
+import time
+import zipfile
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Iterator, TextIO
+
+import numpy as np
+
+from config.settings import settings
+from .download import Manifest, open_session, download
+from .names import normalize_name, name_hash
+
+logger = logging.getLogger(__name__)
+
+GOLDEN_COPY = "lei2_golden_copy"
+_ARRAYS = ["keys", "rows", "lei", "country", "jurisdiction", "entity_status",
+           "registration_status", "name_offsets"]
+
+@contextmanager
+def _open_golden_copy(path: Path) -> Iterator[TextIO]:
+    """The golden copy CSV, whether downloaded zipped or plain"""
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            member = next(n for n in archive.namelist() if n.endswith(".csv"))
+            with archive.open(member) as raw:
+                yield io.TextIOWrapper(raw, encoding="utf-8", newline="")
+    else:
+        with open(path, encoding="utf-8", newline="") as fh:
+            yield fh
+
+def _is_other_name(column: str) -> bool:
+    # Entity.OtherEntityNames.OtherEntityName.1, but not its .xmllang/.type
+    return column.startswith(("Entity.OtherEntityNames.", "Entity.TransliteratedOtherEntityNames.")) \
+        and column.rsplit(".", 1)[-1].isdigit()
+
+def build_index(source: Path, target: Path) -> Dict[str, Any]:
+    """Write the LEI lookup arrays for a golden copy file into target
+
+    keys is the sorted 64-bit hash of every normalized legal and other
+    name, rows[i] the record it belongs to. Record columns are fixed-width
+    arrays and legal names one UTF-8 blob, so everything can be mmapped.
+    """
+    started = time.perf_counter()
+    keys, rows = [], []
+    columns = {name: [] for name in ["lei", "country", "jurisdiction", "entity_status", "registration_status"]}
+    legal_names = []
+    with _open_golden_copy(source) as fh:
+        reader = csv.DictReader(fh)
+        other_columns = [c for c in reader.fieldnames if _is_other_name(c)]
+        for record in reader:
+            legal = record.get("Entity.LegalName")
+            if not record.get("LEI") or not legal:
+                continue
+            row = len(legal_names)
+            seen = set()
+            for name in [legal, *(record[c] for c in other_columns if record[c])]:
+                normalized = normalize_name(name)
+                if normalized and normalized not in seen:
+                    seen.add(normalized)
+                    keys.append(name_hash(normalized))
+                    rows.append(row)
+            legal_names.append(legal.encode("utf-8"))
+            columns["lei"].append(record["LEI"])
+            columns["country"].append(record.get("Entity.LegalAddress.Country", ""))
+            columns["jurisdiction"].append(record.get("Entity.LegalJurisdiction", ""))
+            columns["entity_status"].append(record.get("Entity.EntityStatus", ""))
+            columns["registration_status"].append(record.get("Registration.RegistrationStatus", ""))
+
+    keys = np.array(keys, dtype=np.uint64)
+    order = np.argsort(keys, kind="stable")
+    arrays = {
+        "keys": keys[order],
+        "rows": np.array(rows, dtype=np.int32)[order],
+        "lei": np.array(columns["lei"], dtype="S20"),
+        "country": np.array(columns["country"], dtype="S2"),
+        "jurisdiction": np.array(columns["jurisdiction"], dtype="S8"),
+        "entity_status": np.array(columns["entity_status"], dtype="S8"),
+        "registration_status": np.array(columns["registration_status"], dtype="S20"),
+        "name_offsets": np.concatenate(([0], np.cumsum([len(n) for n in legal_names]))).astype(np.int64),
+    }
+
+    target.mkdir(parents=True, exist_ok=True)
+    for name, array in arrays.items():
+        np.save(target / f"{name}.npy", array)
+    (target / "names.bin").write_bytes(b"".join(legal_names))
+    meta = {"built_at": datetime.now().isoformat(), "records": len(legal_names), "names": len(keys)}
+    (target / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+    return {**meta, "seconds": round(time.perf_counter() - started, 2)}
+
+class LEIRegistry:
+    """Exact normalized-name lookup over a memory-mapped GLEIF golden copy
+
+    A lookup hashes the normalized name and binary-searches the sorted key
+    array, so only the touched pages of the index are ever read.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = Path(directory or settings.GLEIF_DATA_DIR)
+        self.arrays: Dict[str, np.ndarray] = {}
+        self.names: Optional[np.memmap] = None
+        self.meta: Dict[str, Any] = {}
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def index_path(self) -> Path:
+        return self.directory / "index"
+
+    @property
+    def available(self) -> bool:
+        return bool(self.arrays)
+
+    def load(self):
+        """Map the index if it is new or was rebuilt since the last load"""
+        with self._lock:
+            meta_path = self.index_path / "meta.json"
+            if meta_path.exists() and meta_path.stat().st_mtime != self._mtime:
+                self._mtime = meta_path.stat().st_mtime
+                self.arrays = {name: np.load(self.index_path / f"{name}.npy", mmap_mode="r") for name in _ARRAYS}
+                self.names = np.memmap(self.index_path / "names.bin", dtype=np.uint8, mode="r") \
+                    if self.arrays["name_offsets"][-1] else np.empty(0, dtype=np.uint8)
+                self.meta = json.loads(meta_path.read_text(encoding="utf-8"))
+                logger.info(f"Mapped GLEIF index: {self.meta['records']} LEI records")
+            self._checked_at = time.monotonic()
+
+    def stale(self) -> bool:
+        return time.monotonic() - self._checked_at >= settings.DATASTORE_RELOAD_INTERVAL
+
+    def _record(self, row: int) -> Dict[str, Any]:
+        a = self.arrays
+        start, end = a["name_offsets"][row], a["name_offsets"][row + 1]
+        return {
+            "lei": a["lei"][row].decode(),
+            "name": self.names[start:end].tobytes().decode("utf-8"),
+            "country": a["country"][row].decode() or None,
+            "jurisdiction": a["jurisdiction"][row].decode() or None,
+            "entity_status": a["entity_status"][row].decode() or None,
+            "registration_status": a["registration_status"][row].decode() or None,
+        }
+
+    def resolve(self, name: str, country: Optional[str] = None, limit: int = 5) -> List[Dict[str, Any]]:
+        """LEI records whose legal or other name normalizes like name
+
+        Active, issued registrations in the given country rank first.
+        """
+        if not self.available:
+            return []
+        normalized = normalize_name(name)
+        if not normalized:
+            return []
+        keys = self.arrays["keys"]
+        key = np.uint64(name_hash(normalized))
+        lo, hi = np.searchsorted(keys, key, "left"), np.searchsorted(keys, key, "right")
+        records = [self._record(int(row)) for row in dict.fromkeys(self.arrays["rows"][lo:hi].tolist())]
+        for record in records:
+            record["matched"] = "legal_name" if normalize_name(record["name"]) == normalized else "other_name"
+        country = (country or "").upper()
+        records.sort(key=lambda r: (
+            r["matched"] != "legal_name",
+            bool(country) and r["country"] != country,
+            r["entity_status"] != "ACTIVE",
+            r["registration_status"] != "ISSUED",
+        ))
+        return records[:limit]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"available": self.available, **self.meta}
+
+async def get_lei_registry() -> LEIRegistry:
+    """The shared registry, (re)mapping the index off the event loop"""
+    if lei_registry.stale():
+        await asyncio.to_thread(lei_registry.load)
+    return lei_registry
+
+def _swap_index(directory: Path, built: Path):
+    """Replace directory/index with built; open mmaps of the old files stay valid"""
+    current, old = directory / "index", directory / "index.old"
+    shutil.rmtree(old, ignore_errors=True)
+    if current.exists():
+        current.rename(old)
+    built.rename(current)
+    shutil.rmtree(old, ignore_errors=True)
+
+async def update_gleif(sources: Optional[List[str]] = None, force: bool = False) -> Dict[str, Any]:
+    """Refresh the golden copy and rebuild the index if the file changed"""
+    directory = Path(settings.GLEIF_DATA_DIR)
+    source = directory / f"{GOLDEN_COPY}.zip"
+    manifest = Manifest(directory)
+    async with open_session() as session:
+        try:
+            changed = await download(session, settings.GLEIF_GOLDEN_COPY_URL, source, manifest, GOLDEN_COPY)
+        except Exception as e:
+            logger.error(f"GLEIF golden copy download failed: {e}")
+            return {GOLDEN_COPY: {"status": "error", "error": str(e)}}
+
+    if not (changed or force or not (directory / "index" / "meta.json").exists()):
+        manifest.save()
+        return {GOLDEN_COPY: {"status": "unchanged"}}
+
+    building = directory / "index.building"
+    shutil.rmtree(building, ignore_errors=True)
+    stats = await asyncio.to_thread(build_index, source, building)
+    _swap_index(directory, building)
+    manifest.update(GOLDEN_COPY, indexed_at=datetime.now().isoformat(), records=stats["records"])
+    manifest.save()
+    logger.info(f"Rebuilt GLEIF index: {stats}")
+    return {GOLDEN_COPY: {"status": "rebuilt", **stats}}
+
+lei_registry = LEIRegistry()
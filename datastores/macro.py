@@ -0,0 +1,307 @@
+import asyncio
+import logging
+import threading
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pc = pq = None
+
+from config.settings import settings
+from .download import Manifest, open_session
+
+logger = logging.getLogger(__name__)
+
+WORLD_BANK_API = "https://api.worldbank.org/v2/country/all/indicator/{code}"
+FRED_API = "https://api.stlouisfed.org/fred/series/observations"
+
+SOURCES = ("worldbank", "fred")
+# Worldwide Governance Indicators (*.EST) are published under World Bank source 3
+WGI_SOURCE = 3
+# FRED price indexes are stored as % change from a year ago, like the World Bank rates
+_FRED_INDEX_SERIES = {"CPIAUCSL", "CPILFESL", "PCEPI"}
+_WORLD_BANK_PAGE_SIZE = 20_000
+_CONCURRENT_SERIES = 4
+_STRING_COLUMNS = ["indicator", "source", "country", "iso3"]
+
+def _columns() -> Dict[str, list]:
+    return {name: [] for name in [*_STRING_COLUMNS, "date", "value"]}
+
+def world_bank_rows(indicator: str, records: List[Dict[str, Any]],
+                    rows: Optional[Dict[str, list]] = None) -> Dict[str, list]:
+    """Long-format rows for one page of a World Bank country/all response
+
+    Aggregates (World, EU, income groups) are kept under their World Bank
+    codes; periods are annual, dated January 1st.
+    """
+    rows = rows if rows is not None else _columns()
+    for record in records or []:
+        value, country = record.get("value"), (record.get("country") or {}).get("id")
+        if value is None or not country:
+            continue
+        for column, item in zip(rows, (
+            indicator, "worldbank", country, record.get("countryiso3code") or None,
+            date(int(record["date"][:4]), 1, 1), float(value)
+        )):
+            rows[column].append(item)
+    return rows
+
+def fred_rows(indicator: str, observations: List[Dict[str, Any]],
+              rows: Optional[Dict[str, list]] = None) -> Dict[str, list]:
+    """Long-format rows for a FRED series; FRED only covers the US"""
+    rows = rows if rows is not None else _columns()
+    for observation in observations or []:
+        if observation.get("value") in (None, "", "."):
+            continue
+        for column, item in zip(rows, (
+            indicator, "fred", "US", "USA",
+            date.fromisoformat(observation["date"]), float(observation["value"])
+        )):
+            rows[column].append(item)
+    return rows
+
+def _to_table(rows: Dict[str, list]) -> "pa.Table":
+    return pa.table({
+        **{name: pa.array(rows[name], type=pa.string()) for name in _STRING_COLUMNS},
+        "date": pa.array(rows["date"], type=pa.date32()),
+        "value": pa.array(rows["value"], type=pa.float64()),
+    })
+
+def _upsert(path: Path, rows: Dict[str, list], series: List[str]):
+    """Replace the rows of every "source/indicator" in series with rows"""
+    new = _to_table(rows)
+    if path.exists():
+        old = pq.read_table(path, columns=new.column_names)
+        keys = pc.binary_join_element_wise(old["source"], old["indicator"], "/")
+        new = pa.concat_tables([old.filter(pc.invert(pc.is_in(keys, value_set=pa.array(series)))), new])
+    new = new.sort_by([("indicator", "ascending"), ("country", "ascending"), ("date", "ascending")])
+    tmp = path.with_name(path.name + ".tmp")
+    pq.write_table(new, tmp, compression="zstd")
+    tmp.replace(path)
+
+# (countries, dates, values): countries x dates matrix of one source's series
+Panel = Tuple[pd.Index, np.ndarray, np.ndarray]
+
+class MacroStore:
+    """Local World Bank / FRED macro indicators, one Parquet table in long format
+
+    On load every (source, indicator) series is pivoted into a dense
+    countries x dates matrix, so latest-value lookups for any number of
+    countries are a gather plus an argmax over the NaN mask.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = Path(directory or settings.MACRO_DATA_DIR)
+        self.panels: Dict[Tuple[str, str], Panel] = {}
+        # indicator -> sources carrying it
+        self.indicators: Dict[str, List[str]] = {}
+        self.iso3: Dict[str, str] = {}
+        self.rows = 0
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> Path:
+        return self.directory / "indicators.parquet"
+
+    @property
+    def available(self) -> bool:
+        return bool(self.panels)
+
+    def load(self):
+        """Re-read and pivot the table if it changed on disk"""
+        if pq is None:
+            return
+        with self._lock:
+            if self.path.exists() and self.path.stat().st_mtime != self._mtime:
+                self._mtime = self.path.stat().st_mtime
+                frame = pq.read_table(self.path).to_pandas()
+                panels = {}
+                for key, rows in frame.groupby(["source", "indicator"], sort=False):
+                    pivot = rows.pivot(index="country", columns="date", values="value").sort_index(axis=1)
+                    panels[key] = (pivot.index, pivot.columns.to_numpy(dtype="datetime64[D]"),
+                                   pivot.to_numpy(dtype=np.float64))
+                codes = frame[["iso3", "country"]].dropna().drop_duplicates("iso3")
+                indicators = {}
+                for source, name in panels:
+                    indicators.setdefault(name, []).append(source)
+                self.panels, self.indicators, self.rows = panels, indicators, len(frame)
+                self.iso3 = dict(zip(codes["iso3"], codes["country"]))
+                logger.info(f"Loaded macro store: {len(panels)} series, {self.rows} observations")
+            self._checked_at = time.monotonic()
+
+    def stale(self) -> bool:
+        return time.monotonic() - self._checked_at >= settings.DATASTORE_RELOAD_INTERVAL
+
+    def country_code(self, country: str) -> str:
+        """ISO2 code the store is keyed by; ISO3 codes are mapped"""
+        country = (country or "").strip().upper()
+        return self.iso3.get(country, country) if len(country) == 3 else country
+
+    def has(self, indicator: str) -> bool:
+        return indicator in self.indicators
+
+    @staticmethod
+    def _last_valid(panel: Panel, countries: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        index, dates, values = panel
+        rows = index.get_indexer(countries)
+        block = values[rows.clip(0)]
+        valid = ~np.isnan(block) & (rows >= 0)[:, None]
+        # index of the last True per row: first True of the reversed row
+        last = block.shape[1] - 1 - np.argmax(valid[:, ::-1], axis=1)
+        found = valid.any(axis=1)
+        return (np.where(found, block[np.arange(len(rows)), last], np.nan),
+                np.where(found, dates[last], np.datetime64("NaT")))
+
+    def _latest(self, indicator: str, codes: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        value = np.full(len(codes), np.nan)
+        when = np.full(len(codes), np.datetime64("NaT"), dtype="datetime64[D]")
+        source = np.full(len(codes), None, dtype=object)
+        for name in self.indicators.get(indicator, []):
+            candidate, candidate_date = self._last_valid(self.panels[(name, indicator)], codes)
+            newer = ~np.isnan(candidate) & (np.isnat(when) | (candidate_date > when))
+            value[newer], when[newer], source[newer] = candidate[newer], candidate_date[newer], name
+        return value, when, source
+
+    def latest(self, indicator: str, countries: List[str]) -> pd.DataFrame:
+        """Most recent value of indicator for each country (rows in input order)
+
+        Where several sources carry the series (FRED and the World Bank for
+        the US) the most recent observation wins. Countries without data
+        get NaN/NaT and a null source.
+        """
+        codes = [self.country_code(c) for c in countries]
+        value, when, source = self._latest(indicator, codes)
+        return pd.DataFrame({"value": value, "date": when, "source": source}, index=pd.Index(codes, name="country"))
+
+    def snapshot(self, countries: List[str], indicators: Optional[List[str]] = None) -> pd.DataFrame:
+        """Latest value of every indicator for a set of countries (countries x indicators)"""
+        codes = [self.country_code(c) for c in countries]
+        indicators = indicators or sorted(self.indicators)
+        values = np.column_stack([self._latest(name, codes)[0] for name in indicators]) \
+            if indicators else np.empty((len(codes), 0))
+        return pd.DataFrame(values, index=pd.Index(codes, name="country"), columns=indicators)
+
+    def history(self, indicator: str, country: str, source: str = "worldbank", limit: int = 5) -> pd.DataFrame:
+        """Last limit observations of one country's series, newest first"""
+        panel = self.panels.get((source, indicator))
+        if panel is None:
+            return pd.DataFrame(columns=["date", "value"])
+        index, dates, values = panel
+        row = index.get_indexer([self.country_code(country)])[0]
+        if row < 0:
+            return pd.DataFrame(columns=["date", "value"])
+        series = values[row]
+        keep = np.flatnonzero(~np.isnan(series))[::-1][:limit]
+        return pd.DataFrame({"date": dates[keep], "value": series[keep]})
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "available": self.available,
+            "series": sorted(f"{source}/{name}" for source, name in self.panels),
+            "countries": len(set().union(*(panel[0] for panel in self.panels.values()))) if self.panels else 0,
+            "observations": self.rows,
+        }
+
+async def get_macro_store() -> MacroStore:
+    """The shared store, re-reading the table off the event loop"""
+    if macro_store.stale():
+        await asyncio.to_thread(macro_store.load)
+    return macro_store
+
+async def _fetch_world_bank(session, indicator: str, code: str) -> Dict[str, list]:
+    url = WORLD_BANK_API.format(code=code)
+    params = {"format": "json", "per_page": _WORLD_BANK_PAGE_SIZE,
+              "date": f"{settings.MACRO_START_YEAR}:{date.today().year}"}
+    if code.endswith(".EST"):
+        params["source"] = WGI_SOURCE
+    rows, page, pages = _columns(), 1, 1
+    while page <= pages:
+        async with session.get(url, params={**params, "page": page}) as response:
+            response.raise_for_status()
+            payload = await response.json(content_type=None)
+        if len(payload) < 2:
+            # errors come back as 200 with [{"message": [...]}]
+            raise ValueError(f"World Bank {code}: {payload[0].get('message') if payload else 'empty response'}")
+        pages = int(payload[0].get("pages") or 1)
+        world_bank_rows(indicator, payload[1], rows)
+        page += 1
+    return rows
+
+async def _fetch_fred(session, indicator: str, series_id: str) -> Dict[str, list]:
+    params = {
+        "series_id": series_id, "api_key": settings.FRED_KEY, "file_type": "json",
+        "observation_start": f"{settings.MACRO_START_YEAR}-01-01",
+        "units": "pc1" if series_id in _FRED_INDEX_SERIES else "lin",
+    }
+    async with session.get(FRED_API, params=params) as response:
+        response.raise_for_status()
+        payload = await response.json(content_type=None)
+    return fred_rows(indicator, payload.get("observations", []))
+
+async def update_macro(sources: Optional[List[str]] = None, force: bool = False) -> Dict[str, Any]:
+    """Bulk-pull every configured series for all countries and rewrite the table
+
+    Each series is one (paged) country/all request, so a full sync is a
+    dozen calls. Series that fail keep their previously synced rows. force
+    is accepted for the common job signature; series are always refetched.
+    """
+    if pq is None:
+        logger.error("pyarrow is not installed; macro store disabled")
+        return {"macro": {"status": "error", "error": "pyarrow not installed"}}
+
+    jobs = {}
+    wanted = set(sources or SOURCES)
+    if "worldbank" in wanted:
+        jobs.update({f"worldbank/{name}": (_fetch_world_bank, name, code)
+                     for name, code in settings.MACRO_WORLD_BANK_INDICATORS.items()})
+    if "fred" in wanted:
+        if settings.FRED_KEY:
+            jobs.update({f"fred/{name}": (_fetch_fred, name, series_id)
+                         for name, series_id in settings.MACRO_FRED_SERIES.items()})
+        else:
+            logger.info("FRED_KEY not set; skipping FRED series")
+
+    directory = Path(settings.MACRO_DATA_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    manifest = Manifest(directory)
+    limit = asyncio.Semaphore(_CONCURRENT_SERIES)
+
+    async def fetch(key: str, job) -> Dict[str, list]:
+        fetcher, name, code = job
+        async with limit:
+            return await fetcher(session, name, code)
+
+    async with open_session() as session:
+        results = await asyncio.gather(*(fetch(key, job) for key, job in jobs.items()), return_exceptions=True)
+
+    rows, fetched, summary = _columns(), [], {}
+    now = datetime.now().isoformat()
+    for (key, (_, _, code)), result in zip(jobs.items(), results):
+        if isinstance(result, Exception):
+            logger.error(f"Macro series {key} ({code}) failed: {result}")
+            summary[key] = {"status": "error", "error": str(result)}
+            continue
+        for column, values in result.items():
+            rows[column].extend(values)
+        fetched.append(key)
+        manifest.update(key, code=code, rows=len(result["value"]), updated_at=now)
+        summary[key] = {"status": "updated", "rows": len(result["value"])}
+
+    if fetched:
+        await asyncio.to_thread(_upsert, directory / "indicators.parquet", rows, fetched)
+    manifest.save()
+    logger.info(f"Macro sync: {len(fetched)}/{len(jobs)} series, {len(rows['value'])} observations")
+    return summary
+
+macro_store = MacroStore()
@@ -0,0 +1,23 @@
+import hashlib
+import re
+import unicodedata
+
+# Legal forms carry no identity; "Acme Holdings Ltd" should match "ACME HOLDINGS"
+LEGAL_FORMS = {
+    "inc", "incorporated", "corp", "corporation", "co", "company", "ltd", "limited",
+    "llc", "llp", "lp", "plc", "sa", "ag", "gmbh", "bv", "nv", "oy", "ab", "as",
+    "spa", "srl", "sarl", "pjsc", "ojsc", "jsc", "cjsc", "ooo", "zao", "pte", "pty",
+    "aktiengesellschaft", "kg", "kgaa", "se", "sas", "sl", "kk", "asa", "bhd",
+}
+
+def normalize_name(name: str) -> str:
+    """Casefolded ASCII name without punctuation or legal-form tokens"""
+    text = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode().lower()
+    tokens = re.sub(r"[^a-z0-9]+", " ", text).split()
+    core = [t for t in tokens if t not in LEGAL_FORMS]
+    return " ".join(core or tokens)
+
+def name_hash(normalized: str) -> int:
+    """Stable 64-bit key of a normalized name"""
+    return int.from_bytes(hashlib.blake2b(normalized.encode("utf-8"), digest_size=8).digest(), "little")
+
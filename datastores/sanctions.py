@@ -0,0 +1,386 @@
+import asyncio
+import csv
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Iterable, Iterator, Tuple
+
+import numpy as np
+
+from config.settings import settings
+from .download import Manifest, open_session, download
+from .names import normalize_name
+
+logger = logging.getLogger(__name__)
+
+# Names are folded to ASCII [a-z0-9 ], so a trigram is a base-37 number
+_ALPHABET = b" 0123456789abcdefghijklmnopqrstuvwxyz"
+_BASE = len(_ALPHABET)
+_GRAMS = _BASE ** 3
+_SYMBOL = np.zeros(256, dtype=np.int64)
+_SYMBOL[np.frombuffer(_ALPHABET, dtype=np.uint8)] = np.arange(_BASE)
+_BUILD_CHUNK = 100_000
+
+def trigrams(normalized: str) -> np.ndarray:
+    """Sorted unique trigram codes of an already normalized name"""
+    symbols = _SYMBOL[np.frombuffer(f" {normalized} ".encode("ascii"), dtype=np.uint8)]
+    if len(symbols) < 3:
+        return np.empty(0, dtype=np.int64)
+    return np.unique(symbols[:-2] * _BASE * _BASE + symbols[1:-1] * _BASE + symbols[2:])
+
+def _distinct(values: np.ndarray) -> np.ndarray:
+    """Sorted distinct values; sort-based, which beats np.unique's hashing here"""
+    values = np.sort(values)
+    if len(values) == 0:
+        return values
+    return values[np.concatenate(([True], values[1:] != values[:-1]))]
+
+def _gram_pairs(names: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """(name id, trigram code) for every distinct trigram of every name
+
+    All names of a chunk are encoded as one padded buffer, so the work is a
+    handful of array operations instead of a Python loop per name. Pairs
+    come out sorted by name id, then code.
+    """
+    name_ids, codes = [], []
+    for start in range(0, len(names), _BUILD_CHUNK):
+        chunk = [f" {name} " for name in names[start:start + _BUILD_CHUNK]]
+        lengths = np.fromiter(map(len, chunk), dtype=np.int64, count=len(chunk))
+        symbols = _SYMBOL[np.frombuffer("".join(chunk).encode("ascii"), dtype=np.uint8)]
+        grams = symbols[:-2] * _BASE * _BASE + symbols[1:-1] * _BASE + symbols[2:]
+        owner = np.repeat(np.arange(len(chunk)), lengths)[:-2]
+        # drop trigrams that straddle two names
+        valid = np.arange(len(grams)) + 3 <= np.cumsum(lengths)[owner]
+        keys = _distinct(owner[valid] * _GRAMS + grams[valid])
+        name_ids.append(keys // _GRAMS + start)
+        codes.append(keys % _GRAMS)
+    if not name_ids:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return np.concatenate(name_ids), np.concatenate(codes)
+
+class TrigramIndex:
+    """Trigram index with Dice-coefficient search
+
+    Stored both ways round: postings[offsets[g]:offsets[g + 1]] are the
+    names containing trigram g, and grams[name_offsets[n]:name_offsets[n + 1]]
+    are the trigrams of name n.
+    """
+
+    def __init__(self, offsets: np.ndarray, postings: np.ndarray, name_offsets: np.ndarray, grams: np.ndarray):
+        self.offsets = offsets
+        self.postings = postings
+        self.name_offsets = name_offsets
+        self.grams = grams
+        self.gram_counts = np.diff(name_offsets)
+
+    @classmethod
+    def build(cls, names: List[str]) -> "TrigramIndex":
+        name_ids, codes = _gram_pairs(names)
+        offsets = np.zeros(_GRAMS + 1, dtype=np.int64)
+        np.cumsum(np.bincount(codes, minlength=_GRAMS), out=offsets[1:])
+        name_offsets = np.zeros(len(names) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(name_ids, minlength=len(names)), out=name_offsets[1:])
+        order = np.argsort(codes, kind="stable")
+        return cls(offsets, name_ids[order].astype(np.int32), name_offsets, codes.astype(np.int32))
+
+    def __len__(self) -> int:
+        return len(self.gram_counts)
+
+    def search(self, grams: np.ndarray, threshold: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Name ids and scores with dice(query, name) >= threshold
+
+        A name reaching the threshold has between t*q/(2 - t) and
+        (2 - t)*q/t trigrams and shares at least ceil(t*q / (2 - t)) of
+        the q query trigrams, so candidates only need to come from the
+        q - that + 1 rarest ones (prefix filtering).
+        """
+        q = len(grams)
+        if q == 0 or len(self) == 0:
+            return np.empty(0, dtype=np.int32), np.empty(0)
+        starts, ends = self.offsets[grams], self.offsets[grams + 1]
+        min_shared = max(1, int(np.ceil(threshold * q / (2 - threshold) - 1e-9)))
+        rarest = np.argsort(ends - starts, kind="stable")[:q - min_shared + 1]
+        candidates = _distinct(np.concatenate([self.postings[starts[i]:ends[i]] for i in rarest]))
+
+        counts = self.gram_counts[candidates]
+        fits = (counts >= min_shared) & (counts <= (2 - threshold) * q / threshold + 1e-9)
+        candidates, counts = candidates[fits], counts[fits]
+        if len(candidates) == 0:
+            return candidates, np.empty(0)
+
+        # overlap: look up each candidate's trigrams in a query bitmap
+        in_query = np.zeros(_GRAMS, dtype=np.int32)
+        in_query[grams] = 1
+        bounds = np.cumsum(counts) - counts
+        positions = np.arange(counts.sum()) + np.repeat(self.name_offsets[candidates] - bounds, counts)
+        shared = np.add.reduceat(in_query[self.grams[positions]], bounds)
+
+        scores = 2 * shared / (q + counts)
+        keep = scores >= threshold
+        return candidates[keep], scores[keep]
+
+class Watchlist:
+    """One source list: entity records, their (alias) names and a trigram index"""
+
+    def __init__(
+        self,
+        source: str,
+        list_name: str,
+        entities: List[Dict[str, Any]],
+        names: List[str],
+        entity_of: np.ndarray,
+        index: TrigramIndex,
+        built_at: str
+    ):
+        self.source = source
+        self.list_name = list_name
+        self.entities = entities
+        self.names = names
+        self.entity_of = entity_of
+        self.index = index
+        self.built_at = built_at
+
+    @classmethod
+    def build(cls, source: str, list_name: str, records: Iterable[Dict[str, Any]]) -> "Watchlist":
+        entities, names, normalized, entity_of = [], [], [], []
+        for record in records:
+            aliases = record.pop("aliases", [])
+            seen = set()
+            for name in [record["name"], *aliases]:
+                norm = normalize_name(name)
+                if norm and norm not in seen:
+                    seen.add(norm)
+                    names.append(name)
+                    normalized.append(norm)
+                    entity_of.append(len(entities))
+            if seen:
+                entities.append(record)
+        return cls(
+            source, list_name, entities, names, np.array(entity_of, dtype=np.int32),
+            TrigramIndex.build(normalized), datetime.now().isoformat()
+        )
+
+    def search(self, grams: np.ndarray, threshold: float) -> Iterator[Tuple[int, str, float]]:
+        """(entity id, matched name, score), best alias per entity"""
+        ids, scores = self.index.search(grams, threshold)
+        order = np.argsort(-scores, kind="stable")
+        ids, scores = ids[order], scores[order]
+        _, first = np.unique(self.entity_of[ids], return_index=True)
+        for i in np.sort(first):
+            yield int(self.entity_of[ids[i]]), self.names[ids[i]], float(scores[i])
+
+    def save(self, path: Path):
+        meta = json.dumps({
+            "source": self.source, "list": self.list_name, "built_at": self.built_at,
+            "names": self.names, "entities": self.entities,
+        })
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as fh:
+            np.savez(
+                fh,
+                offsets=self.index.offsets,
+                postings=self.index.postings,
+                name_offsets=self.index.name_offsets,
+                grams=self.index.grams,
+                entity_of=self.entity_of,
+                meta=np.frombuffer(meta.encode("utf-8"), dtype=np.uint8),
+            )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "Watchlist":
+        with np.load(path) as data:
+            meta = json.loads(data["meta"].tobytes().decode("utf-8"))
+            index = TrigramIndex(data["offsets"], data["postings"], data["name_offsets"], data["grams"])
+            entity_of = data["entity_of"]
+        return cls(meta["source"], meta["list"], meta["entities"], meta["names"], entity_of, index, meta["built_at"])
+
+# Bulk file parsers: path -> entity records with name, aliases and list metadata
+
+def _split(value: str) -> List[str]:
+    return [v for v in value.split(";") if v] if value else []
+
+def parse_opensanctions(path: Path) -> Iterator[Dict[str, Any]]:
+    """OpenSanctions targets.simple.csv"""
+    with open(path, newline="", encoding="utf-8") as fh:
+        for row in csv.DictReader(fh):
+            if not row.get("name"):
+                continue
+            yield {
+                "id": row["id"],
+                "name": row["name"],
+                "aliases": _split(row.get("aliases", "")),
+                "schema": row.get("schema"),
+                "countries": _split(row.get("countries", "")),
+                "program": row.get("sanctions") or None,
+                "dataset": row.get("dataset"),
+            }
+
+def _ofac_value(value: str) -> Optional[str]:
+    value = value.strip()
+    return None if value in ("", "-0-") else value
+
+def parse_ofac_sdn(path: Path) -> Iterator[Dict[str, Any]]:
+    """OFAC SDN.CSV (no header: ent_num, name, type, program, ...)"""
+    with open(path, newline="", encoding="latin-1") as fh:
+        for row in csv.reader(fh):
+            if len(row) < 4 or not _ofac_value(row[1]):
+                continue
+            name = _ofac_value(row[1])
+            sdn_type = _ofac_value(row[2])
+            aliases = []
+            # individuals are listed "LAST, First"
+            if sdn_type == "individual" and "," in name:
+                last, first = name.split(",", 1)
+                aliases.append(f"{first.strip()} {last.strip()}")
+            yield {
+                "id": f"ofac-{row[0].strip()}",
+                "name": name,
+                "aliases": aliases,
+                "schema": "Person" if sdn_type == "individual" else (sdn_type or "Entity").title(),
+                "countries": [],
+                "program": _ofac_value(row[3]),
+                "dataset": "us_ofac_sdn",
+            }
+
+PARSERS = {
+    "opensanctions": parse_opensanctions,
+    "ofac_sdn": parse_ofac_sdn,
+}
+
+csv.field_size_limit(1 << 24)
+
+class SanctionsScreener:
+    """Offline screening against locally indexed sanctions and PEP lists
+
+    Each configured source is its own Watchlist segment file, so an update
+    only rebuilds the sources that changed. Processes pick up rebuilt
+    segments via refresh().
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = Path(directory or settings.SANCTIONS_DATA_DIR)
+        self.watchlists: Dict[str, Watchlist] = {}
+        self._mtimes: Dict[str, float] = {}
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def segment_path(self, source: str) -> Path:
+        return self.directory / "index" / f"{source}.npz"
+
+    def load(self):
+        """(Re)load every segment file that is new or changed on disk"""
+        with self._lock:
+            for source in settings.SANCTIONS_SOURCES:
+                path = self.segment_path(source)
+                if not path.exists():
+                    continue
+                mtime = path.stat().st_mtime
+                if self._mtimes.get(source) == mtime:
+                    continue
+                started = time.perf_counter()
+                self.watchlists[source] = Watchlist.load(path)
+                self._mtimes[source] = mtime
+                logger.info(
+                    f"Loaded {source} watchlist: {len(self.watchlists[source].entities)} entities "
+                    f"in {time.perf_counter() - started:.2f}s"
+                )
+            self._checked_at = time.monotonic()
+
+    def stale(self) -> bool:
+        return time.monotonic() - self._checked_at >= settings.DATASTORE_RELOAD_INTERVAL
+
+    def has_list(self, list_name: str) -> bool:
+        return any(w.list_name == list_name for w in self.watchlists.values())
+
+    def screen(
+        self,
+        name: str,
+        lists: Optional[List[str]] = None,
+        threshold: Optional[float] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Best-scoring listed entities for name, highest score first"""
+        threshold = settings.SANCTIONS_MATCH_THRESHOLD if threshold is None else threshold
+        grams = trigrams(normalize_name(name))
+        best: Dict[str, Dict[str, Any]] = {}
+        for watchlist in self.watchlists.values():
+            if lists and watchlist.list_name not in lists:
+                continue
+            for entity_id, matched, score in watchlist.search(grams, threshold):
+                entity = watchlist.entities[entity_id]
+                # the same entity often appears in several sources
+                key = normalize_name(entity["name"])
+                if key not in best or score > best[key]["score"]:
+                    best[key] = {
+                        **entity, "matched_name": matched, "score": round(score, 4),
+                        "list": watchlist.list_name, "source": watchlist.source,
+                    }
+        matches = sorted(best.values(), key=lambda m: -m["score"])
+        return matches[:limit or settings.SANCTIONS_MAX_MATCHES]
+
+    def screen_many(self, names: List[str], lists: Optional[List[str]] = None, **kwargs) -> Dict[str, List[Dict[str, Any]]]:
+        """Batch screening; repeated names are screened once"""
+        return {name: self.screen(name, lists, **kwargs) for name in dict.fromkeys(names)}
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            source: {"list": w.list_name, "entities": len(w.entities), "names": len(w.names), "built_at": w.built_at}
+            for source, w in self.watchlists.items()
+        }
+
+async def get_screener() -> SanctionsScreener:
+    """The shared screener, loading or refreshing segments off the event loop"""
+    if sanctions_screener.stale():
+        await asyncio.to_thread(sanctions_screener.load)
+    return sanctions_screener
+
+def rebuild_segment(source: str, directory: Path) -> Dict[str, Any]:
+    """Parse a source's bulk file and write its segment; returns entity diff counts"""
+    spec = settings.SANCTIONS_SOURCES[source]
+    path = directory / "index" / f"{source}.npz"
+    previous = {e["id"] for e in Watchlist.load(path).entities} if path.exists() else set()
+
+    started = time.perf_counter()
+    watchlist = Watchlist.build(source, spec["list"], PARSERS[spec["format"]](directory / f"{source}.csv"))
+    watchlist.save(path)
+
+    current = {e["id"] for e in watchlist.entities}
+    return {
+        "entities": len(current),
+        "names": len(watchlist.names),
+        "added": len(current - previous),
+        "removed": len(previous - current),
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+async def update_sanctions(sources: Optional[List[str]] = None, force: bool = False) -> Dict[str, Any]:
+    """Refresh bulk lists and rebuild only the segments whose file changed"""
+    directory = Path(settings.SANCTIONS_DATA_DIR)
+    manifest = Manifest(directory)
+    summary = {}
+    async with open_session() as session:
+        for source in sources or list(settings.SANCTIONS_SOURCES):
+            spec = settings.SANCTIONS_SOURCES[source]
+            try:
+                changed = await download(session, spec["url"], directory / f"{source}.csv", manifest, source)
+            except Exception as e:
+                logger.error(f"Sanctions source {source} download failed: {e}")
+                summary[source] = {"status": "error", "error": str(e)}
+                continue
+            if not (changed or force or not (directory / "index" / f"{source}.npz").exists()):
+                summary[source] = {"status": "unchanged"}
+                continue
+            stats = await asyncio.to_thread(rebuild_segment, source, directory)
+            manifest.update(source, indexed_at=datetime.now().isoformat(), entities=stats["entities"])
+            summary[source] = {"status": "rebuilt", **stats}
+            logger.info(f"Rebuilt {source}: {stats}")
+    manifest.save()
+    return summary
+
+sanctions_screener = SanctionsScreener()
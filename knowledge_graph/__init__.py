@@ -1,3 +1,3 @@
-from .graph_builder import GraphBuilder
+from .graph_builder import GraphBuilder, GraphWriteBuffer
 
-__all__ = ["GraphBuilder"]
\ No newline at end of file
+__all__ = ["GraphBuilder", "GraphWriteBuffer"]
\ No newline at end of file
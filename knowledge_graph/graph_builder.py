@@ -1,68 +1,178 @@
+import asyncio
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 
-try:
-    from neo4j import GraphDatabase
-except ImportError:
-    GraphDatabase = None
-
 from config.settings import settings
+from telemetry import span
+from telemetry.metrics import GRAPH_ROWS, GRAPH_WRITE_SECONDS
 
 logger = logging.getLogger(__name__)
 
+SCHEMA_STATEMENTS = [
+    "CREATE CONSTRAINT company_name_unique IF NOT EXISTS FOR (c:Company) REQUIRE c.name IS UNIQUE",
+    "CREATE INDEX risk_type IF NOT EXISTS FOR (r:Risk) ON (r.type)",
+]
+
+# One statement writes any number of assessments: MERGE each company, then
+# attach its risks. Companies with no risks are still merged.
+WRITE_ASSESSMENTS = """
+UNWIND $rows AS row
+MERGE (c:Company {name: row.name})
+SET c += row.props
+WITH c, row
+UNWIND row.risks AS risk
+CREATE (r:Risk {
+    type: risk.type,
+    score: risk.score,
+    confidence: risk.confidence,
+    description: risk.description,
+    assessment_id: row.assessment_id,
+    timestamp: datetime()
+})
+CREATE (c)-[:HAS_RISK]->(r)
+"""
+
+def assessment_row(
+    company_data: Dict[str, Any],
+    risks: List[Dict[str, Any]],
+    assessment_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """Shape one assessment as a parameter row for WRITE_ASSESSMENTS"""
+    return {
+        "name": company_data.get("name"),
+        "assessment_id": assessment_id,
+        # SET += with a null would erase the property, so omit unknowns
+        "props": {
+            key: value for key, value in {
+                "ticker": company_data.get("ticker"),
+                "country": company_data.get("country"),
+                "domain": company_data.get("domain"),
+                "lei": company_data.get("lei"),
+                "cik": company_data.get("cik"),
+                "updated": datetime.now().isoformat()
+            }.items() if value is not None
+        },
+        "risks": [
+            {
+                "type": risk.get("type"),
+                "score": risk.get("score", 0),
+                "confidence": risk.get("confidence", "MEDIUM"),
+                "description": risk.get("description", "")
+            }
+            for risk in risks
+        ]
+    }
+
+_UNSET = object()
+
 class GraphBuilder:
-    """Neo4j knowledge graph builder"""
+    """Neo4j knowledge graph builder
+
+    The driver (and the neo4j package, slow to import) is created on first
+    use; assigning driver = None disables graph writes.
+    """
 
     def __init__(self):
-        if GraphDatabase is None:
+        self._schema_ready = False
+        self._driver = _UNSET
+
+    @property
+    def driver(self):
+        if self._driver is _UNSET:
+            self._driver = self._connect()
+        return self._driver
+
+    @driver.setter
+    def driver(self, driver):
+        self._driver = driver
+
+    def _connect(self):
+        try:
+            from neo4j import AsyncGraphDatabase
+        except ImportError:
             logger.warning("Neo4j is not available. Graph operations disabled.")
-            self.driver = None
-        else:
-            try:
-                self.driver = GraphDatabase.driver(
-                    settings.NEO4J_URI,
-                    auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD),
-                    max_connection_lifetime=1000
-                )
-                logger.info("Connected to Neo4j")
-            except Exception as e:
-                logger.error(f"Failed to connect to Neo4j: {e}")
-                self.driver = None
+            return None
+        try:
+            driver = AsyncGraphDatabase.driver(
+                settings.NEO4J_URI,
+                auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD),
+                max_connection_lifetime=1000,
+                max_connection_pool_size=settings.NEO4J_MAX_POOL_SIZE,
+                connection_acquisition_timeout=settings.NEO4J_ACQUISITION_TIMEOUT,
+                keep_alive=True
+            )
+            logger.info("Connected to Neo4j")
+            return driver
+        except Exception as e:
+            logger.error(f"Failed to connect to Neo4j: {e}")
+            return None
 
-    async def create_company_node(self, company_data: Dict[str, Any]):
-        if not self.driver:
+    async def ensure_schema(self):
+        """Create uniqueness constraints and indexes (idempotent)"""
+        if not self.driver or self._schema_ready:
             return
-        with self.driver.session() as session:
-            session.run(
-                "MERGE (c:Company {name: $name}) SET c += $props RETURN c",
-                name=company_data.get("name"),
-                props={
-                    "ticker": company_data.get("ticker"),
-                    "country": company_data.get("country"),
-                    "domain": company_data.get("domain"),
-                    "updated": datetime.now().isoformat()
-                }
-            )
+        async with self.driver.session() as session:
+            for statement in SCHEMA_STATEMENTS:
+                await session.run(statement)
+        self._schema_ready = True
+        logger.info("Neo4j schema constraints and indexes ensured")
 
-    async def create_risk_node(self, company_name: str, risk_type: str, risk_data: Dict[str, Any]):
-        if not self.driver:
+    async def write_assessments(self, rows: List[Dict[str, Any]]):
+        """Write assessments with one UNWIND transaction per NEO4J_WRITE_BATCH_SIZE rows"""
+        if not self.driver or not rows:
             return
-        with self.driver.session() as session:
-            session.run(
-                """
-                MATCH (c:Company {name: $company_name})
-                CREATE (r:Risk {type: $risk_type, score: $score, confidence: $confidence, description: $description, timestamp: datetime()})
-                CREATE (c)-[:HAS_RISK]->(r)
-                RETURN r
-                """,
-                company_name=company_name,
-                risk_type=risk_type,
-                score=risk_data.get("score", 0),
-                confidence=risk_data.get("confidence", "MEDIUM"),
-                description=risk_data.get("description", "")
-            )
+        await self.ensure_schema()
+
+        batch_size = settings.NEO4J_WRITE_BATCH_SIZE
+        with span("neo4j.write_assessments", {"db.system": "neo4j", "db.rows": len(rows)}) as write:
+            async with self.driver.session() as session:
+                for i in range(0, len(rows), batch_size):
+                    chunk = rows[i:i + batch_size]
+                    await session.execute_write(self._write_chunk, chunk)
+        GRAPH_WRITE_SECONDS.observe(write.seconds)
+        GRAPH_ROWS.inc(len(rows))
+
+    @staticmethod
+    async def _write_chunk(tx, rows: List[Dict[str, Any]]):
+        result = await tx.run(WRITE_ASSESSMENTS, rows=rows)
+        await result.consume()
+
+    async def write_assessment(
+        self,
+        company_data: Dict[str, Any],
+        risks: List[Dict[str, Any]],
+        assessment_id: Optional[str] = None
+    ):
+        await self.write_assessments([assessment_row(company_data, risks, assessment_id)])
+
+    async def create_company_node(self, company_data: Dict[str, Any]):
+        await self.write_assessment(company_data, [])
+
+    async def create_risk_node(self, company_name: str, risk_type: str, risk_data: Dict[str, Any]):
+        await self.write_assessment({"name": company_name}, [{"type": risk_type, **risk_data}])
+
+    async def close(self):
+        # never created: nothing to close, and no reason to import neo4j now
+        if self._driver not in (_UNSET, None):
+            await self._driver.close()
+
+class GraphWriteBuffer:
+    """Collects assessment rows so a batch is written in a few large transactions"""
+
+    def __init__(self, graph_builder: GraphBuilder, flush_size: int = None):
+        self.graph_builder = graph_builder
+        self.flush_size = flush_size or settings.NEO4J_WRITE_BATCH_SIZE
+        self.rows: List[Dict[str, Any]] = []
+        self._lock = asyncio.Lock()
+
+    async def add(self, row: Dict[str, Any]):
+        self.rows.append(row)
+        if len(self.rows) >= self.flush_size:
+            await self.flush()
 
-    def close(self):
-        if self.driver:
-            self.driver.close()
+    async def flush(self):
+        async with self._lock:
+            rows, self.rows = self.rows, []
+            if rows:
+                await self.graph_builder.write_assessments(rows)
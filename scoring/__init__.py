@@ -0,0 +1,3 @@
+from .engine import RiskScorer, risk_scorer, format_scores
+
+__all__ = ["RiskScorer", "risk_scorer", "format_scores"]
@@ -0,0 +1,363 @@
+import logging
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Union, Callable, Iterable
+
+import numpy as np
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+CATEGORIES = ["financial", "compliance", "reputation", "operational", "strategic", "cyber", "esg"]
+
+# Qualitative tool ratings on the 0-10 risk scale
+LEVELS = {
+    "clear": 0.0, "minimal": 1.0, "implemented": 1.0, "low": 2.0, "positive": 2.0,
+    "adequate": 4.0, "moderate": 5.0, "neutral": 5.0, "partial": 5.0,
+    "moderate-high": 7.0, "high": 8.0, "negative": 8.0, "critical": 10.0, "none": 10.0,
+}
+
+# Variance of a uniform 0-10 score: the uncertainty of a feature we know nothing about
+PRIOR_VARIANCE = 100 / 12
+# Floor on within-category variance so a single feature still has an interval
+MIN_VARIANCE = 0.25
+Z_95 = 1.96
+
+def level_value(value: Any) -> Optional[float]:
+    """Numeric value of a metric: numbers as-is, booleans as 0/1, ratings via LEVELS"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return LEVELS.get(value.strip().lower())
+    return float(value)
+
+def risk_level(score: float) -> str:
+    if np.isnan(score):
+        return "NO DATA"
+    if score < 3:
+        return "LOW"
+    if score < 4.5:
+        return "LOW-MODERATE"
+    if score < 6:
+        return "MODERATE"
+    if score < 7:
+        return "MODERATE-HIGH"
+    if score < 8.5:
+        return "HIGH"
+    return "CRITICAL"
+
+def confidence_level(coverage: float) -> str:
+    if coverage >= 0.8:
+        return "HIGH"
+    if coverage >= 0.5:
+        return "MEDIUM"
+    return "LOW"
+
+@dataclass(frozen=True)
+class Feature:
+    """One tool metric mapped linearly onto 0-10 risk
+
+    `low` maps to risk 0 and `high` to risk 10 (values beyond are
+    clipped), so low > high means "higher is safer".
+    """
+    name: str
+    category: str
+    tool: str
+    metric: Union[str, Callable[[Dict[str, Any]], Optional[float]]]
+    low: float
+    high: float
+    weight: float = 1.0
+
+    def extract(self, output: Dict[str, Any]) -> Optional[float]:
+        if callable(self.metric):
+            return self.metric(output)
+        return level_value(output.get("metrics", {}).get(self.metric))
+
+def _ratio(numerator: str, denominator: str, scale: float = 1.0):
+    def metric(output: Dict[str, Any]) -> Optional[float]:
+        metrics = output.get("metrics", {})
+        if metrics.get(numerator) is None or not metrics.get(denominator):
+            return None
+        return metrics[numerator] / metrics[denominator] * scale
+    return metric
+
+def _items_mean(key: str):
+    def metric(output: Dict[str, Any]) -> Optional[float]:
+        values = [level_value(item.get(key)) for item in output.get("items", [])]
+        values = [v for v in values if v is not None]
+        return sum(values) / len(values) if values else None
+    return metric
+
+def _daily_move(output: Dict[str, Any]) -> Optional[float]:
+    metrics = output.get("metrics", {})
+    if not metrics.get("previous_close"):
+        return None
+    return abs(metrics.get("price", 0) / metrics["previous_close"] - 1) * 100
+
+def _mean_of(*keys: str):
+    def metric(output: Dict[str, Any]) -> Optional[float]:
+        values = [level_value(output.get("metrics", {}).get(k)) for k in keys]
+        values = [v for v in values if v is not None]
+        return sum(values) / len(values) if values else None
+    return metric
+
+def _unpatched(output: Dict[str, Any]) -> Optional[float]:
+    metrics = output.get("metrics", {})
+    if "high" not in metrics:
+        return None
+    return metrics["high"] - metrics.get("high_patched", 0)
+
+FEATURES: List[Feature] = [
+    # financial
+    Feature("daily_move_pct", "financial", "get_stock_price", _daily_move, 0, 5),
+    Feature("net_margin_pct", "financial", "get_financial_statements", _ratio("net_income_usd", "revenue_usd", 100), 25, -10),
+    Feature("revenue_growth_pct", "financial", "get_financial_statements", "revenue_growth_pct", 15, -15, 0.5),
+    Feature("liabilities_to_assets_pct", "financial", "get_financial_statements",
+            _ratio("total_liabilities_usd", "total_assets_usd", 100), 30, 95),
+    Feature("current_ratio", "financial", "get_financial_statements",
+            _ratio("current_assets_usd", "current_liabilities_usd"), 2.5, 0.5),
+    Feature("gdp_growth_pct", "financial", "get_gdp_growth", "latest_pct", 4, -2, 0.5),
+    Feature("inflation_pct", "financial", "get_inflation_rate", "current_pct", 2, 10, 0.5),
+    Feature("unemployment_pct", "financial", "get_unemployment_rate", "current_pct", 3, 12, 0.5),
+    # compliance
+    Feature("sanctions_matches", "compliance", "check_sanctions_ofac", "matches", 0, 3, 3.0),
+    Feature("pep_match", "compliance", "check_pep_status", "pep_match", 0, 1, 2.0),
+    Feature("aml_compliant", "compliance", "check_aml_compliance", "compliant", 1, 0, 2.0),
+    Feature("active_violations", "compliance", "get_regulatory_violations", "active", 0, 5),
+    Feature("historical_violations", "compliance", "get_regulatory_violations", "historical", 0, 20, 0.5),
+    Feature("late_filings", "compliance", "get_sec_filings", "late_filings_12m", 0, 2, 1.5),
+    Feature("rule_of_law", "compliance", "get_governance_indicators", "rule_of_law", 2.5, -2.5, 0.5),
+    # reputation
+    Feature("news_sentiment", "reputation", "get_news_sentiment", "tone", 3, -5),
+    Feature("review_rating", "reputation", "get_customer_reviews", _mean_of("trustpilot", "google"), 5, 1),
+    Feature("social_positive_pct", "reputation", "get_social_media_sentiment", "positive_pct", 90, 30),
+    Feature("brand_score", "reputation", "get_brand_reputation_score", "score", 100, 0),
+    Feature("employee_rating", "reputation", "get_employee_satisfaction", "glassdoor", 5, 1, 0.5),
+    # operational
+    Feature("supplier_risk", "operational", "check_supplier_health", "risk", 0, 10),
+    Feature("supply_chain_risk", "operational", "get_supply_chain_risk", "risk", 0, 10),
+    Feature("on_time_pct", "operational", "get_logistics_status", "on_time_pct", 100, 70),
+    Feature("material_availability", "operational", "get_raw_material_availability", _items_mean("availability"), 0, 10),
+    Feature("continuity_plan", "operational", "get_business_continuity_status", "status", 0, 10),
+    Feature("rto_hours", "operational", "get_business_continuity_status", "rto_hours", 1, 72, 0.5),
+    # strategic
+    Feature("market_share_pct", "strategic", "get_competitive_landscape", "market_share_pct", 40, 0),
+    Feature("sector_ma_deals", "strategic", "get_ma_activity", "deals", 10, 100, 0.5),
+    Feature("patent_grant_ratio", "strategic", "get_patent_trends", _ratio("granted", "filed"), 0.9, 0.3, 0.5),
+    # cyber
+    Feature("known_breaches", "cyber", "check_data_breaches", "known_breaches", 0, 5, 1.5),
+    Feature("critical_cves", "cyber", "check_cve_vulnerabilities", "critical", 0, 3, 2.0),
+    Feature("unpatched_high_cves", "cyber", "check_cve_vulnerabilities", _unpatched, 0, 5),
+    Feature("domain_detections", "cyber", "check_domain_reputation", "detections", 0, 5),
+    Feature("ransomware_risk", "cyber", "check_ransomware_risk", "risk", 0, 10),
+    # esg
+    Feature("environmental_score", "esg", "get_esg_score", "environmental", 100, 0),
+    Feature("social_score", "esg", "get_esg_score", "social", 100, 0),
+    Feature("governance_score", "esg", "get_esg_score", "governance", 100, 0),
+    Feature("water_stress", "esg", "get_water_stress_risk", _items_mean("risk"), 0, 10, 0.5),
+    Feature("female_workforce_pct", "esg", "get_diversity_metrics", "female_workforce_pct", 50, 10, 0.5),
+]
+
+@dataclass
+class ScoreMatrix:
+    """Scores for n companies: category arrays are (n, categories), overall arrays (n,)"""
+    categories: List[str]
+    risk: np.ndarray
+    category_score: np.ndarray
+    category_ci: np.ndarray
+    category_coverage: np.ndarray
+    overall_score: np.ndarray
+    overall_ci: np.ndarray
+    overall_coverage: np.ndarray
+
+class RiskScorer:
+    """Weighted, vectorized risk scoring over structured tool metrics
+
+    extract() turns each company's tool outputs into one feature row;
+    score_matrix() scores any number of rows with array operations only,
+    so a stored portfolio matrix can be rescored under new weights without
+    touching the tools again.
+    """
+
+    def __init__(
+        self,
+        category_weights: Optional[Dict[str, float]] = None,
+        feature_weights: Optional[Dict[str, float]] = None,
+        features: Optional[List[Feature]] = None
+    ):
+        self.features = features or FEATURES
+        self.categories = CATEGORIES
+        category_weights = {**settings.RISK_CATEGORY_WEIGHTS, **(category_weights or {})}
+        feature_weights = {**settings.RISK_FEATURE_WEIGHTS, **(feature_weights or {})}
+
+        self._low = np.array([f.low for f in self.features], dtype=float)
+        self._span = np.array([f.high - f.low for f in self.features], dtype=float)
+        self._weights = np.array([feature_weights.get(f.name, f.weight) for f in self.features], dtype=float)
+        self._membership = np.zeros((len(self.features), len(self.categories)))
+        for i, feature in enumerate(self.features):
+            self._membership[i, self.categories.index(feature.category)] = 1.0
+        self._category_weights = np.array([category_weights.get(c, 1.0) for c in self.categories], dtype=float)
+
+    def with_weights(
+        self,
+        category_weights: Optional[Dict[str, float]] = None,
+        feature_weights: Optional[Dict[str, float]] = None
+    ) -> "RiskScorer":
+        return RiskScorer(category_weights, feature_weights, self.features)
+
+    def extract(self, tool_outputs: Dict[str, Dict[str, Any]]) -> np.ndarray:
+        """Feature row for one company; NaN where a tool or metric is missing
+
+        tool_outputs maps tool name -> ToolResult.to_dict(). Outputs without
+        a source are placeholders rather than measurements and count as
+        missing, so they lower coverage instead of setting the score.
+        """
+        row = np.full(len(self.features), np.nan)
+        for i, feature in enumerate(self.features):
+            output = tool_outputs.get(feature.tool)
+            if not output or output.get("status", "ok") != "ok" or not output.get("source"):
+                continue
+            try:
+                value = feature.extract(output)
+            except (TypeError, ValueError, ZeroDivisionError):
+                value = None
+            if value is not None:
+                row[i] = value
+        return row
+
+    def extract_many(self, portfolio: Iterable[Dict[str, Dict[str, Any]]]) -> np.ndarray:
+        rows = [self.extract(tool_outputs) for tool_outputs in portfolio]
+        return np.vstack(rows) if rows else np.empty((0, len(self.features)))
+
+    def score_matrix(self, values: np.ndarray) -> ScoreMatrix:
+        values = np.atleast_2d(values)
+        risk = np.clip((values - self._low) / self._span, 0.0, 1.0) * 10.0
+        valid = ~np.isnan(risk)
+        risk_z = np.where(valid, risk, 0.0)
+        w = self._weights
+        m = self._membership
+
+        # Weighted mean per category over the features present
+        weight_present = valid * w
+        weight_sum = weight_present @ m
+        weight_total = w @ m
+        with np.errstate(invalid="ignore", divide="ignore"):
+            score = (risk_z * w) @ m / weight_sum
+            coverage = np.where(weight_total > 0, weight_sum / weight_total, 0.0)
+
+            # Spread of the features around their category mean, over the
+            # Kish effective sample size, plus prior variance for what's missing
+            deviation = np.where(valid, risk_z - np.nan_to_num(score) @ m.T, 0.0)
+            variance = np.maximum((deviation ** 2 * weight_present) @ m / weight_sum, MIN_VARIANCE)
+            n_eff = weight_sum ** 2 / ((weight_present ** 2) @ m)
+            std_err = np.sqrt(variance / n_eff + (1 - coverage) ** 2 * PRIOR_VARIANCE)
+
+        category_ci = np.stack([
+            np.clip(score - Z_95 * std_err, 0, 10),
+            np.clip(score + Z_95 * std_err, 0, 10)
+        ], axis=-1)
+
+        # Overall: category-weighted mean over categories with data
+        cw = self._category_weights
+        has_score = ~np.isnan(score)
+        cw_present = has_score * cw
+        cw_sum = cw_present.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            overall = (np.nan_to_num(score) * cw).sum(axis=1) / cw_sum
+            category_share = cw_sum / cw.sum()
+            overall_err = np.sqrt(
+                ((cw_present ** 2) * np.nan_to_num(std_err) ** 2).sum(axis=1) / cw_sum ** 2
+                + (1 - category_share) ** 2 * PRIOR_VARIANCE
+            )
+        overall_coverage = (coverage * cw).sum(axis=1) / cw.sum()
+        overall_ci = np.stack([
+            np.clip(overall - Z_95 * overall_err, 0, 10),
+            np.clip(overall + Z_95 * overall_err, 0, 10)
+        ], axis=-1)
+
+        return ScoreMatrix(
+            categories=self.categories,
+            risk=risk,
+            category_score=score,
+            category_ci=category_ci,
+            category_coverage=coverage,
+            overall_score=overall,
+            overall_ci=overall_ci,
+            overall_coverage=overall_coverage
+        )
+
+    def score(self, tool_outputs: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Scores for one company as plain JSON-friendly values"""
+        matrix = self.score_matrix(self.extract(tool_outputs))
+        categories = {}
+        for j, category in enumerate(self.categories):
+            value = matrix.category_score[0, j]
+            categories[category] = {
+                "score": _round(value),
+                "ci_95": [_round(v) for v in matrix.category_ci[0, j]],
+                "level": risk_level(value),
+                "coverage": round(float(matrix.category_coverage[0, j]), 3),
+                "confidence": confidence_level(matrix.category_coverage[0, j])
+            }
+
+        features = [
+            {
+                "name": feature.name,
+                "category": feature.category,
+                "tool": feature.tool,
+                "risk": _round(matrix.risk[0, i])
+            }
+            for i, feature in enumerate(self.features)
+            if not np.isnan(matrix.risk[0, i])
+        ]
+
+        overall = matrix.overall_score[0]
+        return {
+            "overall": {
+                "score": _round(overall),
+                "ci_95": [_round(v) for v in matrix.overall_ci[0]],
+                "level": risk_level(overall),
+                "coverage": round(float(matrix.overall_coverage[0]), 3),
+                "confidence": confidence_level(matrix.overall_coverage[0])
+            },
+            "categories": categories,
+            "features": features
+        }
+
+def _round(value: float) -> Optional[float]:
+    return None if np.isnan(value) else round(float(value), 2)
+
+CATEGORY_LABELS = {
+    "financial": "Financial",
+    "compliance": "Compliance",
+    "reputation": "Reputation",
+    "operational": "Operational",
+    "strategic": "Strategic",
+    "cyber": "Cybersecurity",
+    "esg": "ESG",
+}
+
+def format_scores(scores: Dict[str, Any]) -> List[str]:
+    """Report lines for the result of RiskScorer.score()"""
+    lines = ["Risk Scores by Category:"]
+    for category, data in scores["categories"].items():
+        label = f"{CATEGORY_LABELS.get(category, category)}:"
+        if data["score"] is None:
+            lines.append(f"  {label:17s}N/A (no data)")
+        else:
+            low, high = data["ci_95"]
+            lines.append(f"  {label:17s}{data['score']:.1f}/10 ({data['level']})  95% CI {low:.1f}-{high:.1f}")
+
+    overall = scores["overall"]
+    lines.append("")
+    if overall["score"] is None:
+        lines.append("OVERALL ENTERPRISE RISK SCORE: N/A (no data)")
+    else:
+        low, high = overall["ci_95"]
+        lines.append(
+            f"OVERALL ENTERPRISE RISK SCORE: {overall['score']:.1f}/10 ({overall['level']})  95% CI {low:.1f}-{high:.1f}"
+        )
+    lines.append(f"CONFIDENCE LEVEL: {overall['confidence']} ({overall['coverage']:.0%} data coverage)")
+    return lines
+
+risk_scorer = RiskScorer()
@@ -0,0 +1,358 @@
+"""
+Offline end-to-end benchmark: full CoordinatorAgent assessments against a
+scripted chat model and a local mock of every upstream API.
+
+The mock server replays the responses in scripts/fixtures/upstreams.json
+(per upstream: origin, latency, path regex -> body) and
+API_UPSTREAM_OVERRIDES points the tools at it. Local datastores are
+switched to an empty directory so tools take their API paths. The chat
+model follows a fixed policy: call the first --tool-calls functions it is
+offered whose arguments it can fill from the task, then answer.
+
+Reports p50/p95 latency (total and per phase), throughput, tracemalloc
+peak and upstream/LLM call counts for each concurrency level.
+
+    python scripts/benchmark_assessments.py --assessments 40 --concurrency 1 8 32
+    python scripts/benchmark_assessments.py --mode direct --json bench.json
+    python scripts/benchmark_assessments.py --baseline bench.json   # exit 1 on regression
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+from aiohttp import web
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, FunctionMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config.logging_config import setup_logging
+from config.settings import settings
+
+FIXTURES = Path(__file__).parent / "fixtures" / "upstreams.json"
+TICKERS = ["ACME", "GLBX", "INIT"]
+
+llm_calls: Counter = Counter()
+upstream_calls: Counter = Counter()
+
+# SCRIPTED CHAT MODEL
+
+_HEADER = re.compile(r"^[A-Z][A-Z &/-]+:\s*(.+)$", re.M)
+_FIELD = re.compile(r"^(Ticker|Country|Domain|Sectors):\s*(.+)$", re.M)
+
+def task_facts(messages: List[BaseMessage]) -> Dict[str, Any]:
+    """Company facts stated in the agent task (the last human message)"""
+    text = next((m.content for m in reversed(messages) if isinstance(m, HumanMessage)), "")
+    facts: Dict[str, Any] = {}
+    header = _HEADER.search(text)
+    if header:
+        facts["name"] = header.group(1).strip()
+    for field, value in _FIELD.findall(text):
+        value = value.strip()
+        if value not in ("N/A", "None", ""):
+            facts[field.lower()] = value.split(", ") if field == "Sectors" else value
+    return facts
+
+def function_arguments(function: Dict[str, Any], facts: Dict[str, Any]) -> Dict[str, Any]:
+    """Arguments for an OpenAI function spec, filled from facts like the coordinator does"""
+    from tools.tool_inputs import ARGUMENT_SOURCES
+
+    parameters = function.get("parameters", {})
+    required = set(parameters.get("required", []))
+    arguments = {}
+    for name, spec in parameters.get("properties", {}).items():
+        source = ARGUMENT_SOURCES.get(name)
+        value = source(facts) if source else None
+        if value is None and name in required:
+            # parameters only an LLM would choose (supplier_name, product, ...)
+            kind = spec.get("type")
+            value = [facts.get("country", "US")] if kind == "array" else 7 if kind == "integer" \
+                else facts.get("name", "unknown")
+        if value is not None:
+            arguments[name] = value
+    return arguments
+
+class ScriptedChatModel(BaseChatModel):
+    """Stand-in for ChatOpenAI: deterministic function calls, fixed latency
+
+    With functions bound (ReAct), each turn calls the next offered
+    function not yet called until tool_calls is reached; otherwise it
+    answers from the observations in the prompt.
+    """
+
+    latency: float = 0.0
+    tool_calls: int = 3
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def _respond(self, messages: List[BaseMessage], functions: Optional[List[Dict[str, Any]]]) -> AIMessage:
+        called = [m.name for m in messages if isinstance(m, FunctionMessage)]
+        if functions and len(called) < self.tool_calls:
+            function = next((f for f in functions if f["name"] not in called), None)
+            if function is not None:
+                llm_calls["function_call"] += 1
+                arguments = function_arguments(function, task_facts(messages))
+                return AIMessage(content="", additional_kwargs={
+                    "function_call": {"name": function["name"], "arguments": json.dumps(arguments)}
+                })
+        llm_calls["answer"] += 1
+        observations = sum(1 for m in messages if isinstance(m, FunctionMessage))
+        return AIMessage(content=f"Scripted assessment from {observations} tool observations. "
+                                 f"Overall risk: MEDIUM (confidence: MEDIUM).")
+
+    def _result(self, messages: List[BaseMessage], functions) -> ChatResult:
+        message = self._respond(messages, functions)
+        # rough 4-characters-per-token usage, so token metrics have data
+        prompt = sum(len(str(m.content)) for m in messages) // 4
+        completion = len(message.content or json.dumps(message.additional_kwargs)) // 4
+        return ChatResult(generations=[ChatGeneration(message=message)], llm_output={"token_usage": {
+            "prompt_tokens": prompt, "completion_tokens": completion, "total_tokens": prompt + completion
+        }})
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.latency)
+        return self._result(messages, kwargs.get("functions"))
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return self._result(messages, kwargs.get("functions"))
+
+# MOCK UPSTREAM SERVER
+
+class MockUpstreams:
+    """aiohttp server replaying fixture responses under /<upstream>/<path>"""
+
+    def __init__(self, fixtures: Dict[str, Any], latency: Optional[float], jitter: float):
+        self.fixtures = fixtures
+        self.routes = {
+            name: [(re.compile(route["path"]), route) for route in spec["routes"]]
+            for name, spec in fixtures.items()
+        }
+        self.latency = latency
+        self.jitter = jitter
+        self.runner: Optional[web.AppRunner] = None
+        self.port = 0
+
+    async def handle(self, request: web.Request) -> web.Response:
+        name, path = request.match_info["upstream"], "/" + request.match_info["path"]
+        route = next((r for pattern, r in self.routes.get(name, []) if pattern.fullmatch(path)), None)
+        if route is None:
+            upstream_calls["unmatched"] += 1
+            return web.json_response({"error": f"no fixture for {name}{path}"}, status=404)
+        upstream_calls[name] += 1
+        latency = self.latency if self.latency is not None else self.fixtures[name].get("latency", 0.0)
+        await asyncio.sleep(max(0.0, latency * (1 + random.uniform(-self.jitter, self.jitter))))
+        return web.json_response(route["body"], status=route.get("status", 200))
+
+    async def start(self) -> Dict[str, str]:
+        """Start on a free port; returns the API_UPSTREAM_OVERRIDES mapping"""
+        app = web.Application()
+        app.router.add_get("/{upstream}/{path:.*}", self.handle)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = self.runner.addresses[0][1]
+        return {spec["origin"]: f"http://127.0.0.1:{self.port}/{name}" for name, spec in self.fixtures.items()}
+
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
+
+# BENCHMARK
+
+def configure(args, data_dir: str):
+    """Offline settings; must run before agents/tools are imported"""
+    settings.OPENAI_API_KEY = settings.OPENAI_API_KEY or "sk-benchmark"
+    settings.LLM_CACHE_ENABLED = False
+    settings.AGENT_EXECUTION_MODE = args.mode
+    settings.AGENT_EXECUTION_MODES = {}
+    for name in ("GLEIF_DATA_DIR", "EDGAR_DATA_DIR", "SANCTIONS_DATA_DIR", "MACRO_DATA_DIR"):
+        setattr(settings, name, str(Path(data_dir) / name.lower()))
+    if not args.keep_rate_limits:
+        # measure our own code, not the production request budgets
+        settings.API_RATE_LIMITS, settings.API_RATE_LIMIT, settings.API_RATE_BURST = {}, 10 ** 9, 10 ** 6
+        settings.API_CONCURRENCY_LIMITS = {}
+
+def build_coordinator(model: ScriptedChatModel):
+    from agents.coordinator_agent import CoordinatorAgent
+    from tools.api_manager import api_manager
+
+    coordinator = CoordinatorAgent()
+    coordinator.graph_builder.driver = None
+    for agent in coordinator.agents.values():
+        # keep the agent's callbacks (telemetry) on the stand-in model
+        agent.llm = model.model_copy(update={"callbacks": agent.llm.callbacks})
+        agent._initialize()
+    api_manager.cache.l2 = None
+    return coordinator
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"p50": 0.0, "p95": 0.0, "max": 0.0}
+    p50, p95 = np.percentile(values, [50, 95])
+    return {"p50": round(float(p50), 1), "p95": round(float(p95), 1), "max": round(float(max(values)), 1)}
+
+async def run_level(coordinator, concurrency: int, assessments: int, level: int) -> Dict[str, Any]:
+    """assessments runs with at most concurrency in flight; cold API cache"""
+    from agents.context import PHASES
+    from tools.api_manager import api_manager
+
+    api_manager.cache.l1.clear()
+    llm_calls.clear()
+    upstream_calls.clear()
+    tracemalloc.reset_peak()
+    limit = asyncio.Semaphore(concurrency)
+    latencies, phases, failures = [], {name: [] for _, name, _ in PHASES}, []
+
+    async def one(i: int):
+        marks = []
+
+        async def on_event(event: str, payload: Dict[str, Any]):
+            if event == "phase":
+                marks.append((payload["phase"], time.perf_counter()))
+
+        async with limit:
+            started = time.perf_counter()
+            result = await coordinator.run_assessment(
+                company_name=f"Benchmark Company L{level} {i:04d}", ticker=TICKERS[i % len(TICKERS)],
+                country="US", domain=f"company{i}.example.com", on_event=on_event
+            )
+            ended = time.perf_counter()
+        if result.get("status") != "success":
+            failures.append(result.get("error"))
+            return
+        latencies.append((ended - started) * 1000)
+        for (name, at), (_, until) in zip(marks, [*marks[1:], (None, ended)]):
+            phases[name].append((until - at) * 1000)
+        failures.extend(
+            f"{agent}: {r.get('error')}" for agent, r in result["agent_results"].items() if r.get("status") != "success"
+        )
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(assessments)))
+    wall = time.perf_counter() - started
+    return {
+        "concurrency": concurrency,
+        "assessments": assessments,
+        "wall_s": round(wall, 2),
+        "throughput_per_s": round(len(latencies) / wall, 2),
+        "latency_ms": percentiles(latencies),
+        "phases_ms": {name: percentiles(values) for name, values in phases.items()},
+        "llm_calls": dict(llm_calls),
+        "upstream_calls": dict(sorted(upstream_calls.items())),
+        "tracemalloc_peak_mb": round(tracemalloc.get_traced_memory()[1] / 1e6, 1),
+        "failures": len(failures),
+        "failure_samples": failures[:3],
+    }
+
+def print_level(level: Dict[str, Any]):
+    latency = level["latency_ms"]
+    print(f"\nconcurrency {level['concurrency']:>3}: {level['assessments']} assessments in {level['wall_s']}s  "
+          f"throughput {level['throughput_per_s']}/s  p50 {latency['p50']}ms  p95 {latency['p95']}ms  "
+          f"peak {level['tracemalloc_peak_mb']}MB  failures {level['failures']}")
+    print("  phases (p50/p95 ms): " + ", ".join(
+        f"{name} {p['p50']}/{p['p95']}" for name, p in level["phases_ms"].items()
+    ))
+    print(f"  llm calls: {level['llm_calls']}")
+    print(f"  upstream calls: {level['upstream_calls']}")
+    for failure in level["failure_samples"]:
+        print(f"  ✗ {failure}")
+
+def regressions(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Levels whose p95 rose or throughput fell by more than tolerance vs baseline"""
+    previous = {level["concurrency"]: level for level in baseline.get("levels", [])}
+    problems = []
+    for level in report["levels"]:
+        base = previous.get(level["concurrency"])
+        if base is None:
+            continue
+        p95, base_p95 = level["latency_ms"]["p95"], base["latency_ms"]["p95"]
+        if base_p95 and p95 > base_p95 * (1 + tolerance):
+            problems.append(f"concurrency {level['concurrency']}: p95 {p95}ms vs {base_p95}ms")
+        throughput, base_throughput = level["throughput_per_s"], base["throughput_per_s"]
+        if throughput < base_throughput * (1 - tolerance):
+            problems.append(f"concurrency {level['concurrency']}: throughput {throughput}/s vs {base_throughput}/s")
+        if level["failures"] > base["failures"]:
+            problems.append(f"concurrency {level['concurrency']}: {level['failures']} failures vs {base['failures']}")
+    return problems
+
+async def main(args) -> int:
+    fixtures = json.loads(Path(args.fixtures).read_text(encoding="utf-8"))
+    with tempfile.TemporaryDirectory() as data_dir:
+        configure(args, data_dir)
+        server = MockUpstreams(fixtures, args.upstream_latency, args.jitter)
+        settings.API_UPSTREAM_OVERRIDES = await server.start()
+        tracemalloc.start()
+        model = ScriptedChatModel(latency=args.llm_latency, tool_calls=args.tool_calls)
+        coordinator = build_coordinator(model)
+
+        from tools.api_manager import api_manager
+        try:
+            report = {
+                "config": {
+                    "mode": args.mode, "llm_latency": args.llm_latency, "tool_calls": args.tool_calls,
+                    "upstream_latency": args.upstream_latency, "jitter": args.jitter,
+                    "rate_limits": args.keep_rate_limits,
+                },
+                "levels": [],
+            }
+            for level, concurrency in enumerate(args.concurrency):
+                result = await run_level(coordinator, concurrency, args.assessments, level)
+                report["levels"].append(result)
+                print_level(result)
+        finally:
+            tracemalloc.stop()
+            await api_manager.close_session()
+            await server.stop()
+
+    # ru_maxrss is KiB on Linux
+    report["max_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    print(f"\nmax RSS {report['max_rss_mb']}MB")
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    status = 1 if any(level["failures"] for level in report["levels"]) else 0
+    if args.baseline:
+        problems = regressions(report, json.loads(Path(args.baseline).read_text(encoding="utf-8")), args.tolerance)
+        for problem in problems:
+            print(f"  ✗ regression: {problem}")
+        print("✓ No regressions against baseline" if not problems else f"✗ {len(problems)} regressions")
+        status = status or (1 if problems else 0)
+    return status
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--assessments", type=int, default=20, help="assessments per concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8], help="concurrency levels to run")
+    parser.add_argument("--mode", default="react", help="agent execution mode: react, direct or structured")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="seconds per scripted LLM call")
+    parser.add_argument("--tool-calls", type=int, default=3, help="function calls per ReAct agent run")
+    parser.add_argument("--upstream-latency", type=float, default=None,
+                        help="seconds per upstream response (default: per-upstream fixture latency)")
+    parser.add_argument("--jitter", type=float, default=0.2, help="relative latency jitter")
+    parser.add_argument("--fixtures", default=str(FIXTURES), help="upstream response fixtures")
+    parser.add_argument("--keep-rate-limits", action="store_true", help="apply production API rate limits")
+    parser.add_argument("--json", help="write the report to this file")
+    parser.add_argument("--baseline", help="earlier --json report to compare against")
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative p95/throughput change")
+    args = parser.parse_args()
+    if args.mode not in ("react", "direct", "structured"):
+        parser.error(f"unknown mode: {args.mode}")
+    setup_logging(args.log_level)
+    sys.exit(asyncio.run(main(args)))
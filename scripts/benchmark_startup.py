@@ -0,0 +1,143 @@
+"""
+Cold-start benchmark: how long each entry point takes to import, measured
+with `python -X importtime` in fresh interpreters.
+
+Each entry point is imported --runs times (after one unmeasured run that
+fills the bytecode cache). Reports the median import time, the whole
+interpreter's wall time, the number of modules loaded and the packages
+costing the most import time (self time summed per top-level package).
+With --lifespan, modules exposing a FastAPI `app` also time its startup
+(the lifespan up to `yield`: warm-up of agents, Neo4j schema and
+datastores), i.e. how long a new API worker takes before serving.
+
+    python scripts/benchmark_startup.py
+    python scripts/benchmark_startup.py api.main --runs 10 --lifespan --json startup.json
+    python scripts/benchmark_startup.py --baseline startup.json   # exit 1 on regression
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Any, List
+
+ROOT = Path(__file__).parent.parent
+ENTRY_POINTS = ["api.main", "scripts.run_assessment", "scripts.sync_datastores"]
+IMPORTTIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+# Written to stderr after the import, so lifespan imports are not counted as import time
+IMPORTED = "-- imported --"
+
+# Runs in the child interpreter; prints one JSON line of timings
+PROBE = """
+import asyncio, json, sys, time
+started = time.perf_counter()
+import {module} as module
+imported = time.perf_counter() - started
+print({marker!r}, file=sys.stderr, flush=True)
+startup = None
+app = getattr(module, "app", None)
+if {lifespan} and app is not None and hasattr(app, "router"):
+    async def start():
+        async with app.router.lifespan_context(app):
+            return time.perf_counter() - begun
+    begun = time.perf_counter()
+    startup = asyncio.run(start())
+print(json.dumps({{"import_s": imported, "startup_s": startup}}))
+"""
+
+def probe(module: str, lifespan: bool) -> Dict[str, Any]:
+    """Import module in a fresh interpreter; timings plus per-module importtime rows"""
+    env = {**os.environ, "LOG_LEVEL": "WARNING", "PYTHONPATH": str(ROOT)}
+    env.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.format(module=module, lifespan=lifespan, marker=IMPORTED)],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - started
+    if proc.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{proc.stderr[-2000:]}")
+    timings = json.loads(proc.stdout.strip().splitlines()[-1])
+    packages = Counter()
+    modules = 0
+    for match in IMPORTTIME.finditer(proc.stderr.split(IMPORTED, 1)[0]):
+        modules += 1
+        packages[match.group(4).split(".")[0]] += int(match.group(1))
+    return {**timings, "wall_s": wall, "modules": modules, "packages": packages}
+
+def measure(module: str, runs: int, lifespan: bool, top: int) -> Dict[str, Any]:
+    probe(module, lifespan)
+    samples = [probe(module, lifespan) for _ in range(runs)]
+    packages = sum((sample["packages"] for sample in samples), Counter())
+
+    def median_ms(key: str):
+        values = [sample[key] for sample in samples if sample[key] is not None]
+        return round(statistics.median(values) * 1000, 1) if values else None
+
+    return {
+        "module": module,
+        "import_ms": median_ms("import_s"),
+        "import_min_ms": round(min(sample["import_s"] for sample in samples) * 1000, 1),
+        "process_ms": median_ms("wall_s"),
+        "startup_ms": median_ms("startup_s"),
+        "modules": samples[-1]["modules"],
+        # importtime reports microseconds
+        "top_packages": [[name, round(us / runs / 1000, 1)] for name, us in packages.most_common(top)],
+    }
+
+def print_entry(entry: Dict[str, Any]):
+    print(f"\n{entry['module']}")
+    print(f"  import  median {entry['import_ms']}ms (min {entry['import_min_ms']}ms), "
+          f"{entry['modules']} modules")
+    print(f"  process median {entry['process_ms']}ms")
+    if entry["startup_ms"] is not None:
+        print(f"  lifespan startup median {entry['startup_ms']}ms")
+    for name, ms in entry["top_packages"]:
+        print(f"    {ms:>8.1f}ms  {name}")
+
+def regressions(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Entry points whose median import or startup time rose by more than tolerance vs baseline"""
+    previous = {entry["module"]: entry for entry in baseline.get("entry_points", [])}
+    problems = []
+    for entry in report["entry_points"]:
+        base = previous.get(entry["module"])
+        if base is None:
+            continue
+        for key in ("import_ms", "startup_ms"):
+            value, base_value = entry.get(key), base.get(key)
+            if value is not None and base_value and value > base_value * (1 + tolerance):
+                problems.append(f"{entry['module']}: {key} {value}ms vs {base_value}ms")
+    return problems
+
+def main(args) -> int:
+    report = {"python": sys.version.split()[0], "runs": args.runs, "entry_points": []}
+    for module in args.modules:
+        entry = measure(module, args.runs, args.lifespan, args.top)
+        report["entry_points"].append(entry)
+        print_entry(entry)
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    if not args.baseline:
+        return 0
+    problems = regressions(report, json.loads(Path(args.baseline).read_text(encoding="utf-8")), args.tolerance)
+    for problem in problems:
+        print(f"  ✗ regression: {problem}")
+    print("✓ No regressions against baseline" if not problems else f"✗ {len(problems)} regressions")
+    return 1 if problems else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", default=ENTRY_POINTS, help="entry point modules to import")
+    parser.add_argument("--runs", type=int, default=5, help="measured imports per entry point")
+    parser.add_argument("--lifespan", action="store_true", help="also time FastAPI lifespan startup")
+    parser.add_argument("--top", type=int, default=10, help="heaviest packages to list")
+    parser.add_argument("--json", help="write the report to this file")
+    parser.add_argument("--baseline", help="earlier --json report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative time increase")
+    sys.exit(main(parser.parse_args()))
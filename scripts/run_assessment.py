@@ -1,31 +1,98 @@
+import argparse
 import asyncio
+import json
 import sys
 from pathlib import Path
 import logging
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from agents.batch import BatchRunner, load_companies_csv, load_checkpoint
 from agents.coordinator_agent import CoordinatorAgent
+from tools.api_manager import api_manager
+from storage.assessment_store import get_assessment_store
 from config.logging_config import setup_logging
 from config.settings import settings
 
 setup_logging(settings.LOG_LEVEL)
 logger = logging.getLogger(__name__)
 
-async def main():
-    logger.info("Starting Enterprise Risk Assessment Platform")
-    logger.info("=" * 80)
-    coordinator = CoordinatorAgent()
+async def create_coordinator() -> CoordinatorAgent:
+    """Coordinator recording snapshots in the shared store for --incremental"""
+    store = get_assessment_store()
+    await store.init_schema()
+    return CoordinatorAgent(snapshot_store=store)
+
+async def run_single(args):
+    coordinator = await create_coordinator()
     result = await coordinator.run_assessment(
-        company_name="Apple Inc.",
-        ticker="AAPL",
-        country="US",
-        domain="apple.com",
-        sectors=["Technology", "Consumer Electronics"]
+        company_name=args.company,
+        ticker=args.ticker,
+        country=args.country,
+        domain=args.domain,
+        sectors=args.sectors,
+        incremental=args.incremental
     )
-    print("\n" + result["report"])
+    print("\n" + result.get("report", result.get("error", "")))
     logger.info(f"\nAssessment ID: {result['assessment_id']}")
     logger.info(f"Status: {result['status']}")
 
-if __name__ == "__main__":
+async def run_batch(args):
+    companies = [{**c, "incremental": args.incremental} for c in load_companies_csv(args.batch)]
+    output = args.output or str(Path(args.batch).with_suffix(".results.jsonl"))
+    skip = load_checkpoint(output) if args.resume else set()
+    logger.info(f"Batch: {len(companies)} companies from {args.batch} -> {output}")
+
+    coordinator = await create_coordinator()
+    runner = BatchRunner(coordinator, concurrency=args.concurrency)
+    succeeded = failed = 0
+
+    # The output file doubles as the checkpoint: append and flush per record
+    with open(output, "a" if args.resume else "w", encoding="utf-8") as fh:
+        async for record in runner.run(companies, skip=skip):
+            fh.write(json.dumps(record, default=str) + "\n")
+            fh.flush()
+            if record.get("status") == "success":
+                succeeded += 1
+            else:
+                failed += 1
+            logger.info(f"[{succeeded + failed}] {record['input']['company_name']}: {record.get('status')}")
+
+    logger.info(f"Batch complete: {succeeded} succeeded, {failed} failed, {len(skip)} skipped")
+
+async def main(args=None):
+    parser = argparse.ArgumentParser(description="Enterprise risk assessment")
+    parser.add_argument("--company", default="Apple Inc.")
+    parser.add_argument("--ticker", default="AAPL")
+    parser.add_argument("--country", default="US")
+    parser.add_argument("--domain", default="apple.com")
+    parser.add_argument("--sectors", nargs="+", default=["Technology", "Consumer Electronics"])
+    parser.add_argument("--batch", metavar="FILE.csv",
+                        help="portfolio CSV: company_name,ticker,country,domain,sectors")
+    parser.add_argument("--output", metavar="FILE.jsonl",
+                        help="JSON Lines results (default: <batch>.results.jsonl)")
+    parser.add_argument("--concurrency", type=int, default=settings.BATCH_CONCURRENCY,
+                        help="assessments run in parallel")
+    parser.add_argument("--resume", action="store_true",
+                        help="skip companies already successful in --output")
+    parser.add_argument("--incremental", action="store_true",
+                        help="refresh only stale inputs and re-run only agents whose inputs changed")
+    args = parser.parse_args(args)
+
+    logger.info("Starting Enterprise Risk Assessment Platform")
+    logger.info("=" * 80)
+    await api_manager.init_session()
+    try:
+        if args.batch:
+            await run_batch(args)
+        else:
+            await run_single(args)
+    finally:
+        await api_manager.close_session()
+
+def cli():
+    """Console-script entry point"""
     asyncio.run(main())
+
+if __name__ == "__main__":
+    cli()
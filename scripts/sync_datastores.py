@@ -0,0 +1,43 @@
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+import logging
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from datastores import update_edgar, update_gleif, update_macro, update_sanctions
+from config.logging_config import setup_logging
+from config.settings import settings
+
+setup_logging(settings.LOG_LEVEL)
+logger = logging.getLogger(__name__)
+
+# Datastore name -> update job(sources, force); meant to run nightly from cron
+DATASTORES = {
+    "sanctions": update_sanctions,
+    "gleif": update_gleif,
+    "edgar": update_edgar,
+    "macro": update_macro,
+}
+
+async def main(args=None):
+    parser = argparse.ArgumentParser(description="Download bulk reference data and rebuild local indexes")
+    parser.add_argument("stores", nargs="*", metavar="STORE",
+                        help=f"datastores to sync: {', '.join(DATASTORES)} (default: all)")
+    parser.add_argument("--sources", nargs="+", help="only these sources within the datastore")
+    parser.add_argument("--force", action="store_true", help="rebuild indexes even if files are unchanged")
+    args = parser.parse_args(args)
+    unknown = set(args.stores) - set(DATASTORES)
+    if unknown:
+        parser.error(f"unknown datastore: {', '.join(sorted(unknown))}")
+
+    summary = {}
+    for store in args.stores or list(DATASTORES):
+        logger.info(f"Syncing {store}")
+        summary[store] = await DATASTORES[store](sources=args.sources, force=args.force)
+    print(json.dumps(summary, indent=2))
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -29,7 +29,7 @@ setup(
     install_requires=requirements,
     entry_points={
         "console_scripts": [
-            "erp-assess=scripts.run_assessment:main",
+            "erp-assess=scripts.run_assessment:cli",
         ],
     },
 )
@@ -0,0 +1,3 @@
+from .assessment_store import AssessmentStore, get_assessment_store
+
+__all__ = ["AssessmentStore", "get_assessment_store"]
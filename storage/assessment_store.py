@@ -0,0 +1,352 @@
+import abc
+import asyncio
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Any, Optional, List
+
+try:
+    import psycopg2
+    import psycopg2.extras
+    import psycopg2.pool
+except ImportError:
+    psycopg2 = None
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_COLUMNS = ["assessment_id", "status", "phase", "progress", "company_name",
+            "request", "result", "error", "created_at", "updated_at"]
+_JSON_COLUMNS = {"request", "result"}
+_UPDATABLE = {"status", "phase", "progress", "result", "error"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS assessments (
+    assessment_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    phase TEXT,
+    progress INTEGER DEFAULT 0,
+    company_name TEXT,
+    request TEXT,
+    result TEXT,
+    error TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    worker_id TEXT,
+    heartbeat_at TEXT
+)
+"""
+
+# Added after the first release; ALTERed into older tables by init_schema
+_OWNER_COLUMNS = {"worker_id": "TEXT", "heartbeat_at": "TEXT"}
+_ACTIVE = "status IN ('queued', 'running')"
+
+# Latest per-company inputs and agent results, for incremental re-assessment
+_SNAPSHOT_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS tool_snapshots (
+        company_key TEXT NOT NULL,
+        tool TEXT NOT NULL,
+        arguments TEXT NOT NULL,
+        output TEXT NOT NULL,
+        fetched_at TEXT NOT NULL,
+        PRIMARY KEY (company_key, tool)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS agent_snapshots (
+        company_key TEXT NOT NULL,
+        agent TEXT NOT NULL,
+        inputs TEXT NOT NULL,
+        result TEXT NOT NULL,
+        completed_at TEXT NOT NULL,
+        PRIMARY KEY (company_key, agent)
+    )
+    """,
+]
+
+def _default_worker_id() -> str:
+    return settings.WORKER_ID or f"{socket.gethostname()}:{os.getpid()}"
+
+class AssessmentStore(abc.ABC):
+    """Persistent assessment records: job status, progress and results
+
+    Drivers are synchronous DB-API modules, so every call runs in a worker
+    thread to keep the event loop free.
+
+    Queued and running rows belong to the worker that created them, which
+    refreshes their heartbeat_at while it lives; other workers sharing the
+    store only take over rows whose heartbeat has gone stale.
+    """
+
+    placeholder = "?"
+
+    def __init__(self, worker_id: Optional[str] = None):
+        self.worker_id = worker_id or _default_worker_id()
+
+    @abc.abstractmethod
+    def _connect(self):
+        """Open (or borrow) a DB-API connection"""
+
+    def _release(self, conn):
+        """Give back a connection from _connect"""
+        conn.close()
+
+    def _execute(self, sql: str, params: tuple = (), fetch: bool = False) -> List[tuple]:
+        sql = sql.replace("?", self.placeholder)
+        conn = self._connect()
+        try:
+            cur = conn.cursor()
+            cur.execute(sql, params)
+            rows = cur.fetchall() if fetch else []
+            conn.commit()
+            return rows
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._release(conn)
+
+    def _execute_many(self, sql: str, rows: List[tuple]):
+        sql = sql.replace("?", self.placeholder)
+        conn = self._connect()
+        try:
+            conn.cursor().executemany(sql, rows)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._release(conn)
+
+    def _table_columns(self, table: str) -> List[str]:
+        conn = self._connect()
+        try:
+            cur = conn.cursor()
+            cur.execute(f"SELECT * FROM {table} WHERE 1 = 0")
+            columns = [d[0] for d in cur.description]
+            conn.commit()
+            return columns
+        finally:
+            self._release(conn)
+
+    async def _run(self, sql: str, params: tuple = (), fetch: bool = False) -> List[tuple]:
+        return await asyncio.to_thread(self._execute, sql, params, fetch)
+
+    async def init_schema(self):
+        await self._run(_SCHEMA)
+        existing = await asyncio.to_thread(self._table_columns, "assessments")
+        for column, kind in _OWNER_COLUMNS.items():
+            if column not in existing:
+                await self._run(f"ALTER TABLE assessments ADD COLUMN {column} {kind}")
+        for statement in _SNAPSHOT_SCHEMA:
+            await self._run(statement)
+
+    async def init(self):
+        """Create the schema and mark jobs orphaned by this worker's previous run"""
+        await self.init_schema()
+        await self.mark_orphans(include_own=True)
+
+    async def heartbeat(self):
+        """Show the workers sharing the store that this worker's jobs are alive"""
+        await self._run(
+            f"UPDATE assessments SET heartbeat_at = ? WHERE worker_id = ? AND {_ACTIVE}",
+            (datetime.now().isoformat(), self.worker_id)
+        )
+
+    async def mark_orphans(self, include_own: bool = False):
+        """Interrupt queued/running jobs whose worker stopped heartbeating
+
+        With include_own, also this worker's own rows: at startup nothing of
+        ours is running yet, so any such row was left by a previous process
+        with the same WORKER_ID.
+        """
+        stale_before = datetime.now() - timedelta(seconds=settings.JOB_HEARTBEAT_TIMEOUT)
+        owner = "heartbeat_at IS NULL OR heartbeat_at < ?"
+        params = [stale_before.isoformat()]
+        if include_own:
+            owner += " OR worker_id = ?"
+            params.append(self.worker_id)
+        await self._run(
+            f"UPDATE assessments SET status = ?, error = ?, updated_at = ? WHERE {_ACTIVE} AND ({owner})",
+            ("interrupted", "Worker stopped before completion", datetime.now().isoformat(), *params)
+        )
+
+    async def create(self, assessment_id: str, request: Dict[str, Any], status: str = "queued"):
+        now = datetime.now().isoformat()
+        await self._run(
+            "INSERT INTO assessments (assessment_id, status, progress, company_name, request, "
+            "created_at, updated_at, worker_id, heartbeat_at) VALUES (?, ?, 0, ?, ?, ?, ?, ?, ?)",
+            (assessment_id, status, request.get("company_name"), json.dumps(request), now, now,
+             self.worker_id, now)
+        )
+
+    async def update(self, assessment_id: str, **fields):
+        unknown = set(fields) - _UPDATABLE
+        if unknown:
+            raise ValueError(f"Cannot update columns: {sorted(unknown)}")
+
+        values = [json.dumps(v) if k in _JSON_COLUMNS else v for k, v in fields.items()]
+        assignments = ", ".join(f"{k} = ?" for k in fields)
+        now = datetime.now().isoformat()
+        await self._run(
+            f"UPDATE assessments SET {assignments}, updated_at = ?, heartbeat_at = ? WHERE assessment_id = ?",
+            (*values, now, now, assessment_id)
+        )
+
+    async def save_result(self, assessment_id: str, request: Dict[str, Any], result: Dict[str, Any]):
+        """Persist a finished (synchronous) assessment in one go"""
+        status = "completed" if result.get("status") == "success" else "failed"
+        await self.create(assessment_id, request, status=status)
+        await self.update(assessment_id, progress=100, result=result, error=result.get("error"))
+
+    async def get(self, assessment_id: str) -> Optional[Dict[str, Any]]:
+        rows = await self._run(
+            f"SELECT {', '.join(_COLUMNS)} FROM assessments WHERE assessment_id = ?",
+            (assessment_id,),
+            fetch=True
+        )
+        if not rows:
+            return None
+
+        record = dict(zip(_COLUMNS, rows[0]))
+        for column in _JSON_COLUMNS:
+            if record[column] is not None:
+                record[column] = json.loads(record[column])
+        return record
+
+    async def close(self):
+        """Release pooled connections"""
+
+    async def get_tool_snapshots(self, company_key: str) -> Dict[str, Dict[str, Any]]:
+        """Tool name -> {arguments, output, fetched_at} from the company's last runs"""
+        rows = await self._run(
+            "SELECT tool, arguments, output, fetched_at FROM tool_snapshots WHERE company_key = ?",
+            (company_key,),
+            fetch=True
+        )
+        return {
+            tool: {"arguments": arguments, "output": json.loads(output), "fetched_at": fetched_at}
+            for tool, arguments, output, fetched_at in rows
+        }
+
+    async def save_tool_snapshots(self, company_key: str, snapshots: Dict[str, Dict[str, Any]]):
+        """Upsert {tool: {arguments, output}} fetched now"""
+        if not snapshots:
+            return
+        now = datetime.now().isoformat()
+        await asyncio.to_thread(
+            self._execute_many,
+            "INSERT INTO tool_snapshots (company_key, tool, arguments, output, fetched_at) "
+            "VALUES (?, ?, ?, ?, ?) ON CONFLICT (company_key, tool) DO UPDATE SET "
+            "arguments = excluded.arguments, output = excluded.output, fetched_at = excluded.fetched_at",
+            [
+                (company_key, tool, snap["arguments"], json.dumps(snap["output"], default=str), now)
+                for tool, snap in snapshots.items()
+            ]
+        )
+
+    async def get_agent_snapshots(self, company_key: str) -> Dict[str, Dict[str, Any]]:
+        """Agent -> {inputs, result, completed_at} from the company's last runs"""
+        rows = await self._run(
+            "SELECT agent, inputs, result, completed_at FROM agent_snapshots WHERE company_key = ?",
+            (company_key,),
+            fetch=True
+        )
+        return {
+            agent: {"inputs": inputs, "result": json.loads(result), "completed_at": completed_at}
+            for agent, inputs, result, completed_at in rows
+        }
+
+    async def save_agent_snapshots(self, company_key: str, snapshots: Dict[str, Dict[str, Any]]):
+        """Upsert {agent: {inputs, result}} completed now"""
+        if not snapshots:
+            return
+        now = datetime.now().isoformat()
+        await asyncio.to_thread(
+            self._execute_many,
+            "INSERT INTO agent_snapshots (company_key, agent, inputs, result, completed_at) "
+            "VALUES (?, ?, ?, ?, ?) ON CONFLICT (company_key, agent) DO UPDATE SET "
+            "inputs = excluded.inputs, result = excluded.result, completed_at = excluded.completed_at",
+            [
+                (company_key, agent, snap["inputs"], json.dumps(snap["result"], default=str), now)
+                for agent, snap in snapshots.items()
+            ]
+        )
+
+class SQLiteAssessmentStore(AssessmentStore):
+    """Local single-file store"""
+
+    def __init__(self, path: str, worker_id: Optional[str] = None):
+        super().__init__(worker_id)
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+class PostgresAssessmentStore(AssessmentStore):
+    """Shared store for multi-worker deployments"""
+
+    placeholder = "%s"
+
+    def __init__(self, url: str, worker_id: Optional[str] = None):
+        if psycopg2 is None:
+            raise RuntimeError("psycopg2 is required for the postgres assessment store")
+        super().__init__(worker_id)
+        self.url = url
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        # getconn() raises PoolError rather than waiting once every connection
+        # is out, and store calls run on to_thread's larger executor: callers
+        # beyond the pool size queue here instead
+        self._checkouts = threading.BoundedSemaphore(settings.ASSESSMENT_DB_POOL_SIZE)
+
+    def _connect(self):
+        self._checkouts.acquire()
+        try:
+            # created on first use, from a worker thread, so startup doesn't block
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = psycopg2.pool.ThreadedConnectionPool(1, settings.ASSESSMENT_DB_POOL_SIZE, self.url)
+                pool = self._pool
+            return pool.getconn()
+        except BaseException:
+            self._checkouts.release()
+            raise
+
+    def _release(self, conn):
+        try:
+            if self._pool is not None:
+                self._pool.putconn(conn, close=bool(conn.closed))
+            else:
+                conn.close()
+        finally:
+            self._checkouts.release()
+
+    async def close(self):
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            await asyncio.to_thread(pool.closeall)
+
+_store: Optional[AssessmentStore] = None
+
+def get_assessment_store() -> AssessmentStore:
+    """Process-wide store selected by ASSESSMENT_STORE_BACKEND"""
+    global _store
+    if _store is None:
+        if settings.ASSESSMENT_STORE_BACKEND == "postgres":
+            _store = PostgresAssessmentStore(settings.POSTGRES_URL)
+        else:
+            _store = SQLiteAssessmentStore(settings.ASSESSMENT_DB_PATH)
+        logger.info(f"Assessment store: {settings.ASSESSMENT_STORE_BACKEND}")
+    return _store
@@ -0,0 +1,10 @@
+from .llm import LLMTelemetry
+from .metrics import render_metrics
+from .profiler import SamplingProfiler, finish_profile, profile_path, start_profile
+from .tracing import ActiveSpan, annotate, setup_tracing, span, start_span
+
+__all__ = [
+    "LLMTelemetry", "render_metrics",
+    "SamplingProfiler", "finish_profile", "profile_path", "start_profile",
+    "ActiveSpan", "annotate", "setup_tracing", "span", "start_span",
+]
@@ -0,0 +1,48 @@
+import logging
+from typing import Dict, Any, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from .metrics import LLM_SECONDS, LLM_TOKENS
+from .tracing import ActiveSpan, start_span
+
+logger = logging.getLogger(__name__)
+
+class LLMTelemetry(BaseCallbackHandler):
+    """Span, latency and token counts for every chat model call of one agent
+
+    Tokens come from the provider's token_usage, so responses served by
+    the LLM cache add latency samples but no tokens.
+    """
+
+    run_inline = True
+
+    def __init__(self, agent: str):
+        self.agent = agent
+        self._calls: Dict[UUID, Tuple[ActiveSpan, str]] = {}
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages, *, run_id: UUID, **kwargs):
+        params = kwargs.get("invocation_params") or {}
+        model = params.get("model") or params.get("model_name") or "unknown"
+        span = start_span("llm.call", {
+            "agent.name": self.agent, "gen_ai.request.model": model, "gen_ai.request.messages": len(messages[0])
+        }, current=False)
+        self._calls[run_id] = (span, model)
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs):
+        span, model = self._calls.pop(run_id, (None, None))
+        if span is None:
+            return
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        for kind, key in (("prompt", "prompt_tokens"), ("completion", "completion_tokens")):
+            if usage.get(key):
+                LLM_TOKENS.labels(self.agent, model, kind).inc(usage[key])
+        span.set("gen_ai.usage.input_tokens", usage.get("prompt_tokens"))
+        span.set("gen_ai.usage.output_tokens", usage.get("completion_tokens"))
+        LLM_SECONDS.labels(self.agent, model).observe(span.end())
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs):
+        span, model = self._calls.pop(run_id, (None, None))
+        if span is not None:
+            LLM_SECONDS.labels(self.agent, model).observe(span.end(error))
@@ -0,0 +1,63 @@
+import logging
+from typing import Tuple
+
+try:
+    from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, generate_latest
+except ImportError:
+    CollectorRegistry = None
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Assessments, phases and agents run for seconds to minutes
+LONG_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300, 600)
+# Upstream API and LLM calls
+CALL_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+class _NoopMetric:
+    """Stands in for every metric when prometheus_client is missing or METRICS_ENABLED is off"""
+
+    def labels(self, *args, **kwargs) -> "_NoopMetric":
+        return self
+
+    def inc(self, amount: float = 1):
+        pass
+
+    def observe(self, amount: float):
+        pass
+
+ENABLED = settings.METRICS_ENABLED and CollectorRegistry is not None
+# Own registry so only our metrics are exported and re-imports never clash
+registry = CollectorRegistry(auto_describe=True) if ENABLED else None
+
+def _counter(name: str, documentation: str, labels=()):
+    return Counter(name, documentation, labels, registry=registry) if ENABLED else _NoopMetric()
+
+def _histogram(name: str, documentation: str, labels=(), buckets=CALL_BUCKETS):
+    return Histogram(name, documentation, labels, buckets=buckets, registry=registry) if ENABLED else _NoopMetric()
+
+ASSESSMENTS = _counter("erp_assessments_total", "Finished assessments", ["status"])
+ASSESSMENT_SECONDS = _histogram("erp_assessment_duration_seconds", "End-to-end assessment time",
+                                buckets=LONG_BUCKETS)
+PHASE_SECONDS = _histogram("erp_phase_duration_seconds", "Time per coordinator phase", ["phase"],
+                           buckets=LONG_BUCKETS)
+AGENT_SECONDS = _histogram("erp_agent_duration_seconds", "BaseAgent.execute time, retries included",
+                           ["agent", "status"], buckets=LONG_BUCKETS)
+LLM_SECONDS = _histogram("erp_llm_duration_seconds", "Chat model call time", ["agent", "model"])
+LLM_TOKENS = _counter("erp_llm_tokens_total", "Tokens billed by the chat model", ["agent", "model", "kind"])
+API_REQUESTS = _counter("erp_api_requests_total", "api_manager.fetch calls by cache outcome "
+                        "(hit, coalesced, miss, stale, rejected)",
+                        ["api", "cache"])
+API_UPSTREAM_SECONDS = _histogram("erp_api_upstream_duration_seconds",
+                                  "Upstream request time including retries", ["api", "outcome"])
+API_RETRIES = _counter("erp_api_retries_total", "Upstream request retries", ["api"])
+API_CIRCUIT_OPENED = _counter("erp_api_circuit_opened_total", "Circuit breaker trips per upstream API", ["api"])
+GRAPH_WRITE_SECONDS = _histogram("erp_graph_write_duration_seconds", "Neo4j write transaction time")
+GRAPH_ROWS = _counter("erp_graph_rows_written_total", "Assessment rows written to Neo4j")
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Prometheus text exposition of all metrics and its content type"""
+    if not ENABLED:
+        return b"", "text/plain; charset=utf-8"
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,183 @@
+import json
+import logging
+import os
+import sys
+import sysconfig
+import threading
+import time
+from collections import Counter
+from typing import Dict, Any, List, Optional, Tuple
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {"collapsed": ".collapsed.txt", "speedscope": ".speedscope.json"}
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+MAX_DEPTH = 128
+# Stripped from frame file names (longest first) so stacks read "asyncio/events.py"
+_PATH_PREFIXES = sorted({
+    os.path.join(path, "") for path in (
+        sysconfig.get_paths()["purelib"], sysconfig.get_paths()["platlib"],
+        sysconfig.get_paths()["stdlib"], os.getcwd(),
+    )
+}, key=len, reverse=True)
+
+# One profile at a time bounds the overhead however many requests ask for one
+_active_lock = threading.Lock()
+
+class SamplingProfiler:
+    """Samples every thread's stack from a daemon thread via sys._current_frames
+
+    Nothing is hooked into the profiled code, so the cost is one stack walk
+    per thread per interval, paid by the sampler thread (and the GIL).
+    Samples cover the whole process while running: the event loop thread
+    shows both the assessment's coroutines and the time it sat idle in
+    select() waiting on I/O or the thread pool, and worker threads show
+    what asyncio.to_thread work was doing. Concurrent assessments land in
+    the same profile, so profile on a quiet instance for a clean picture.
+    """
+
+    def __init__(self, name: str, interval: float = 0.005, max_samples: int = 100_000):
+        self.name = name
+        self.interval = interval
+        self.max_samples = max_samples
+        # (seconds since start, weight, thread name, leaf-last code stack)
+        self.samples: List[Tuple[float, float, str, Tuple[Any, ...]]] = []
+        self.started = 0.0
+        self.seconds = 0.0
+        self._thread_names: Dict[int, str] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name=f"profiler-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.seconds = time.perf_counter() - self.started
+
+    def _run(self):
+        own = threading.get_ident()
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            self._sample(own, now - self.started, now - last)
+            last = now
+            if len(self.samples) >= self.max_samples:
+                logger.warning(f"Profile {self.name} hit {self.max_samples} samples; sampling stopped")
+                return
+
+    def _sample(self, own: int, at: float, weight: float):
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            stack = []
+            while frame is not None and len(stack) < MAX_DEPTH:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            stack.reverse()
+            self.samples.append((at, weight, self._thread_name(ident), tuple(stack)))
+
+    def _thread_name(self, ident: int) -> str:
+        if ident not in self._thread_names:
+            self._thread_names = {t.ident: t.name for t in threading.enumerate()}
+        return self._thread_names.get(ident, f"thread-{ident}")
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's folded stacks (flamegraph.pl, speedscope, inferno), weights in ms"""
+        totals = Counter()
+        for _, weight, thread, stack in self.samples:
+            totals[(thread,) + tuple(_frame_name(code) for code in stack)] += weight
+        return "".join(
+            f"{';'.join(frames)} {max(1, round(weight * 1000))}\n"
+            for frames, weight in sorted(totals.items())
+        )
+
+    def speedscope(self) -> Dict[str, Any]:
+        """speedscope file format: one time-ordered sampled profile per thread"""
+        frames, index = [], {}
+        threads: Dict[str, Dict[str, list]] = {}
+        for at, weight, thread, stack in self.samples:
+            ids = []
+            for code in stack:
+                if code not in index:
+                    index[code] = len(frames)
+                    frames.append({"name": _qualname(code), "file": _short_path(code.co_filename),
+                                   "line": code.co_firstlineno})
+                ids.append(index[code])
+            profile = threads.setdefault(thread, {"samples": [], "weights": [], "start": at})
+            profile["samples"].append(ids)
+            profile["weights"].append(weight)
+        profiles = [{
+            "type": "sampled",
+            "name": thread,
+            "unit": "seconds",
+            "startValue": data["start"],
+            "endValue": data["start"] + sum(data["weights"]),
+            "samples": data["samples"],
+            "weights": data["weights"],
+        } for thread, data in threads.items()]
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "name": self.name,
+            "exporter": settings.APP_NAME,
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": profiles,
+        }
+
+    def save(self, directory: str) -> Dict[str, str]:
+        """Write both formats as <name><suffix>; returns format -> path"""
+        os.makedirs(directory, exist_ok=True)
+        paths = {fmt: os.path.join(directory, f"{self.name}{suffix}") for fmt, suffix in FORMATS.items()}
+        with open(paths["collapsed"], "w") as f:
+            f.write(self.collapsed())
+        with open(paths["speedscope"], "w") as f:
+            json.dump(self.speedscope(), f)
+        return paths
+
+def _short_path(filename: str) -> str:
+    for prefix in _PATH_PREFIXES:
+        if filename.startswith(prefix):
+            return filename[len(prefix):]
+    return filename
+
+def _qualname(code) -> str:
+    # co_qualname is new in 3.11; older code objects only know the bare name
+    return getattr(code, "co_qualname", code.co_name)
+
+def _frame_name(code) -> str:
+    return f"{_qualname(code)} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+
+def start_profile(name: str) -> Optional[SamplingProfiler]:
+    """Start sampling for one assessment, or None if another profile is running"""
+    if not _active_lock.acquire(blocking=False):
+        logger.warning(f"Not profiling {name}: another profile is in progress")
+        return None
+    profiler = SamplingProfiler(name, interval=settings.PROFILE_INTERVAL_MS / 1000)
+    profiler.start()
+    logger.info(f"Profiling {name} every {settings.PROFILE_INTERVAL_MS}ms")
+    return profiler
+
+def finish_profile(profiler: SamplingProfiler) -> Dict[str, str]:
+    """Stop sampling and write the profile to PROFILE_DIR (blocking: run in a thread)"""
+    try:
+        profiler.stop()
+    finally:
+        _active_lock.release()
+    paths = profiler.save(settings.PROFILE_DIR)
+    logger.info(f"Profile of {profiler.name}: {len(profiler.samples)} samples over "
+                f"{profiler.seconds:.2f}s written to {paths['speedscope']}")
+    return paths
+
+def profile_path(name: str, fmt: str = "speedscope") -> Optional[str]:
+    """Path of a stored profile, or None when it does not exist"""
+    if fmt not in FORMATS or os.sep in name or name.startswith("."):
+        return None
+    path = os.path.join(settings.PROFILE_DIR, f"{name}{FORMATS[fmt]}")
+    return path if os.path.exists(path) else None
@@ -0,0 +1,105 @@
+import logging
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, Iterator, Union
+
+try:
+    from opentelemetry import context as otel_context, trace
+    from opentelemetry.trace import Status, StatusCode
+except ImportError:
+    otel_context = trace = None
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+TRACER_NAME = "enterprise_risk_platform"
+
+def setup_tracing():
+    """Install an SDK tracer provider when TRACING_EXPORTER asks for one
+
+    Without it spans go to whatever provider the host configured (e.g.
+    opentelemetry-instrument), or nowhere: the API's default is a no-op.
+    """
+    if settings.TRACING_EXPORTER == "none" or trace is None:
+        return
+    try:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+        if settings.TRACING_EXPORTER == "otlp":
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+            exporter = OTLPSpanExporter()
+        else:
+            exporter = ConsoleSpanExporter()
+    except ImportError as e:
+        logger.warning(f"Tracing exporter {settings.TRACING_EXPORTER!r} unavailable: {e}")
+        return
+    provider = TracerProvider(resource=Resource.create({"service.name": settings.APP_NAME}))
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    logger.info(f"Tracing spans exported via {settings.TRACING_EXPORTER}")
+
+class ActiveSpan:
+    """A span that is the current span until end(), unless current=False
+
+    Wraps an OpenTelemetry span (or nothing, without opentelemetry) and
+    always measures its own duration for the Prometheus histograms. A
+    current span must be ended in the task that started it, after any
+    spans started inside it.
+    """
+
+    def __init__(self, name: str, attributes: Optional[Dict[str, Any]] = None, current: bool = True):
+        self.started = time.perf_counter()
+        self.seconds: Optional[float] = None
+        self.span = None
+        self._token = None
+        if trace is not None:
+            self.span = trace.get_tracer(TRACER_NAME).start_span(name, attributes=_clean(attributes))
+            if current:
+                self._token = otel_context.attach(trace.set_span_in_context(self.span))
+
+    def set(self, key: str, value: Any):
+        if self.span is not None and value is not None:
+            self.span.set_attribute(key, value)
+
+    def end(self, error: Optional[Union[BaseException, str]] = None) -> float:
+        """Close the span (marking it failed if error) and return its duration"""
+        if self.seconds is not None:
+            return self.seconds
+        self.seconds = time.perf_counter() - self.started
+        if self.span is not None:
+            if isinstance(error, BaseException):
+                self.span.record_exception(error)
+            if error:
+                self.span.set_status(Status(StatusCode.ERROR, str(error)))
+            if self._token is not None:
+                otel_context.detach(self._token)
+            self.span.end()
+        return self.seconds
+
+def start_span(name: str, attributes: Optional[Dict[str, Any]] = None, current: bool = True) -> ActiveSpan:
+    return ActiveSpan(name, attributes, current)
+
+@contextmanager
+def span(name: str, attributes: Optional[Dict[str, Any]] = None) -> Iterator[ActiveSpan]:
+    """with-block form of start_span; exceptions mark the span failed"""
+    active = ActiveSpan(name, attributes)
+    try:
+        yield active
+    except BaseException as e:
+        active.end(e)
+        raise
+    active.end()
+
+def annotate(**attributes):
+    """Set attributes on whatever span is current (dots spelled as __)"""
+    if trace is None:
+        return
+    current = trace.get_current_span()
+    for key, value in _clean(attributes).items():
+        current.set_attribute(key.replace("__", "."), value)
+
+def _clean(attributes: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    # OpenTelemetry attributes must be non-null primitives
+    return {k: v for k, v in (attributes or {}).items() if v is not None}
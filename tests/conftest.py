@@ -0,0 +1,62 @@
+import asyncio
+import json
+
+import pytest
+
+from tools.api_manager import APIManager
+from tools.http_client import HTTPResponse
+
+class Clock:
+    """Stands in for the time module: monotonic() and time() both read now"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.now
+
+class FakeHTTP:
+    """Stands in for HTTPClient: answers every request with status/body after delay"""
+
+    def __init__(self, status: int = 200, body=None, delay: float = 0.0):
+        self.status = status
+        self.body = body if body is not None else {"ok": True}
+        self.delay = delay
+        self.calls = []
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def request(self, method, url, params=None, json_data=None, headers=None, timeout=None):
+        self.calls.append({"method": method, "url": url, "params": params, "timeout": timeout})
+        await asyncio.sleep(self.delay)
+        if isinstance(self.status, BaseException):
+            raise self.status
+        return HTTPResponse(self.status, {}, json.dumps(self.body).encode())
+
+@pytest.fixture
+def clock():
+    """A fake clock, not yet installed anywhere
+
+    Test modules override this fixture to patch it in as the time module of
+    the code they test: monkeypatch.setattr(module, "time", clock).
+    """
+    return Clock()
+
+@pytest.fixture
+def fake_http():
+    return FakeHTTP()
+
+@pytest.fixture
+def api_manager(fake_http):
+    """An APIManager with no Redis and a fake upstream"""
+    manager = APIManager()
+    manager.cache.l2 = None
+    manager.http = fake_http
+    return manager
@@ -0,0 +1,178 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from config.settings import settings
+from storage import assessment_store
+from storage.assessment_store import AssessmentStore, PostgresAssessmentStore, SQLiteAssessmentStore
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "assessments.db")
+
+async def started(db_path, worker_id):
+    store = SQLiteAssessmentStore(db_path, worker_id=worker_id)
+    await store.init()
+    return store
+
+def age_heartbeat(db_path, assessment_id, seconds):
+    conn = sqlite3.connect(db_path)
+    old = (datetime.now() - timedelta(seconds=seconds)).isoformat()
+    conn.execute("UPDATE assessments SET heartbeat_at = ? WHERE assessment_id = ?", (old, assessment_id))
+    conn.commit()
+    conn.close()
+
+def test_store_requires_a_connect_implementation():
+    with pytest.raises(TypeError):
+        AssessmentStore()
+
+@pytest.mark.asyncio
+async def test_create_update_and_get_round_trip(db_path):
+    store = await started(db_path, "w1")
+    await store.create("a1", {"company_name": "Acme", "country": "US"})
+    await store.update("a1", status="running", phase="analysis", progress=40)
+    await store.update("a1", status="completed", progress=100, result={"score": 7})
+
+    record = await store.get("a1")
+    assert record["status"] == "completed"
+    assert record["company_name"] == "Acme"
+    assert record["request"] == {"company_name": "Acme", "country": "US"}
+    assert record["result"] == {"score": 7}
+    assert await store.get("missing") is None
+
+@pytest.mark.asyncio
+async def test_update_rejects_unknown_columns(db_path):
+    store = await started(db_path, "w1")
+    with pytest.raises(ValueError):
+        await store.update("a1", worker_id="w2")
+
+@pytest.mark.asyncio
+async def test_restart_does_not_interrupt_other_live_workers(db_path):
+    first = await started(db_path, "w1")
+    await first.create("a1", {"company_name": "Acme"})
+    await first.update("a1", status="running")
+
+    await started(db_path, "w2")
+    assert (await first.get("a1"))["status"] == "running"
+
+@pytest.mark.asyncio
+async def test_restart_interrupts_its_own_previous_jobs(db_path):
+    first = await started(db_path, "w1")
+    await first.create("a1", {"company_name": "Acme"})
+    await first.update("a1", status="running")
+    await first.create("a2", {"company_name": "Beta"})
+    await first.update("a2", status="completed")
+
+    restarted = await started(db_path, "w1")
+    assert (await restarted.get("a1"))["status"] == "interrupted"
+    assert (await restarted.get("a2"))["status"] == "completed"
+
+@pytest.mark.asyncio
+async def test_jobs_with_a_stale_heartbeat_are_reaped(db_path):
+    dead = await started(db_path, "w1")
+    await dead.create("a1", {"company_name": "Acme"})
+    await dead.create("a2", {"company_name": "Beta"})
+    age_heartbeat(db_path, "a1", settings.JOB_HEARTBEAT_TIMEOUT + 10)
+
+    other = await started(db_path, "w2")
+    assert (await other.get("a1"))["status"] == "interrupted"
+    assert (await other.get("a2"))["status"] == "queued"
+
+@pytest.mark.asyncio
+async def test_heartbeat_keeps_own_jobs_alive(db_path):
+    live = await started(db_path, "w1")
+    await live.create("a1", {"company_name": "Acme"})
+    age_heartbeat(db_path, "a1", settings.JOB_HEARTBEAT_TIMEOUT + 10)
+
+    await live.heartbeat()
+    other = await started(db_path, "w2")
+    await other.mark_orphans()
+    assert (await other.get("a1"))["status"] == "queued"
+
+@pytest.mark.asyncio
+async def test_init_adds_owner_columns_to_an_existing_table(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE assessments (assessment_id TEXT PRIMARY KEY, status TEXT NOT NULL, phase TEXT, "
+        "progress INTEGER DEFAULT 0, company_name TEXT, request TEXT, result TEXT, error TEXT, "
+        "created_at TEXT NOT NULL, updated_at TEXT NOT NULL)"
+    )
+    now = datetime.now().isoformat()
+    conn.execute("INSERT INTO assessments VALUES ('old', 'running', NULL, 0, 'Acme', '{}', NULL, NULL, ?, ?)",
+                 (now, now))
+    conn.commit()
+    conn.close()
+
+    store = await started(db_path, "w1")
+    # rows from before ownership have no heartbeat, so no live worker claims them
+    assert (await store.get("old"))["status"] == "interrupted"
+    await store.create("a1", {"company_name": "Beta"})
+
+@pytest.mark.asyncio
+async def test_snapshots_upsert(db_path):
+    store = await started(db_path, "w1")
+    await store.save_tool_snapshots("acme", {"get_news": {"arguments": "{}", "output": {"n": 1}}})
+    await store.save_tool_snapshots("acme", {"get_news": {"arguments": "{}", "output": {"n": 2}}})
+    snapshots = await store.get_tool_snapshots("acme")
+    assert snapshots["get_news"]["output"] == {"n": 2}
+
+class FakeConnection:
+    closed = 0
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql, params=()):
+        time.sleep(0.01)
+
+    def fetchall(self):
+        return [(1,)]
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = 1
+
+class StrictPool:
+    """Like psycopg2's ThreadedConnectionPool: raises instead of waiting when exhausted"""
+
+    def __init__(self, minconn, maxconn, url):
+        self.maxconn = maxconn
+        self.out = 0
+        self.max_out = 0
+        self.lock = threading.Lock()
+
+    def getconn(self):
+        with self.lock:
+            if self.out >= self.maxconn:
+                raise RuntimeError("connection pool exhausted")
+            self.out += 1
+            self.max_out = max(self.max_out, self.out)
+        return FakeConnection()
+
+    def putconn(self, conn, close=False):
+        with self.lock:
+            self.out -= 1
+
+    def closeall(self):
+        pass
+
+@pytest.mark.asyncio
+async def test_postgres_callers_beyond_the_pool_size_wait_for_a_connection(monkeypatch):
+    pytest.importorskip("psycopg2.pool")
+    monkeypatch.setattr(settings, "ASSESSMENT_DB_POOL_SIZE", 2)
+    monkeypatch.setattr(assessment_store.psycopg2.pool, "ThreadedConnectionPool", StrictPool)
+    store = PostgresAssessmentStore("postgresql://test", worker_id="w1")
+
+    results = await asyncio.gather(*(store._run("SELECT 1", fetch=True) for _ in range(12)))
+    assert results == [[(1,)]] * 12
+    assert store._pool.max_out == 2
+    await store.close()
@@ -0,0 +1,119 @@
+import json
+
+import pytest
+
+from config.settings import settings
+from tools import cache as cache_module
+from tools.cache import LRUCache, TwoTierCache
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+        self.fail = False
+
+    async def get(self, key):
+        if self.fail:
+            raise ConnectionError("redis down")
+        return self.data.get(key)
+
+    async def setex(self, key, ttl, value):
+        if self.fail:
+            raise ConnectionError("redis down")
+        self.data[key] = value
+        self.ttls[key] = ttl
+
+    async def aclose(self):
+        pass
+
+@pytest.fixture
+def clock(clock, monkeypatch):
+    monkeypatch.setattr(cache_module, "time", clock)
+    return clock
+
+@pytest.fixture
+def two_tier(clock):
+    cache = TwoTierCache()
+    cache.l2 = FakeRedis()
+    return cache
+
+def test_lru_evicts_least_recently_used(clock):
+    lru = LRUCache(max_entries=2, default_ttl=60)
+    lru.set("a", 1, "api_a")
+    lru.set("b", 2, "api_b")
+    assert lru.get("a") == 1
+    assert lru.set("c", 3, "api_c") == "api_b"
+    assert lru.get("b") is None
+    assert len(lru) == 2
+
+def test_lru_ttl_is_capped_by_default_ttl(clock):
+    lru = LRUCache(max_entries=10, default_ttl=60)
+    lru.set("a", 1, "api", ttl=3600)
+    clock.now += 61
+    assert lru.get("a") is None
+
+def test_lru_keeps_expired_entries_for_stale_reads(clock):
+    lru = LRUCache(max_entries=10, default_ttl=60)
+    lru.set("a", 1, "api", ttl=10, stale_ttl=100)
+    clock.now += 30
+    assert lru.get("a") is None
+    assert lru.get_stale("a") == (1, 20)
+    clock.now += 100
+    assert lru.get_stale("a") is None
+    assert len(lru) == 0
+
+def test_lru_without_stale_ttl_drops_expired_entries(clock):
+    lru = LRUCache(max_entries=10, default_ttl=60)
+    lru.set("a", 1, "api", ttl=10)
+    clock.now += 11
+    assert lru.get("a") is None
+    assert len(lru) == 0
+
+@pytest.mark.asyncio
+async def test_l1_hit_and_miss_are_counted(two_tier):
+    assert await two_tier.get("k", "api") is None
+    await two_tier.set("k", {"v": 1}, "api", ttl=60)
+    assert await two_tier.get("k", "api") == {"v": 1}
+    stats = two_tier.get_stats()["apis"]["api"]
+    assert (stats["l1_hits"], stats["l2_hits"], stats["misses"]) == (1, 0, 1)
+
+@pytest.mark.asyncio
+async def test_l2_hit_refills_l1(two_tier):
+    await two_tier.set("k", {"v": 1}, "api", ttl=600)
+    assert two_tier.l2.ttls["k"] == 600 + settings.API_STALE_TTL
+    two_tier.l1.clear()
+
+    assert await two_tier.get("k", "api") == {"v": 1}
+    assert two_tier.l1.get("k") == {"v": 1}
+    assert two_tier.get_stats()["apis"]["api"]["l2_hits"] == 1
+
+@pytest.mark.asyncio
+async def test_expired_l2_entry_is_a_miss_but_served_stale(two_tier, clock):
+    await two_tier.set("k", {"v": 1}, "api", ttl=60)
+    two_tier.l1.clear()
+    clock.now += 90
+
+    assert await two_tier.get("k", "api") is None
+    assert await two_tier.get_stale("k", "api") == ({"v": 1}, 30)
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("raw", [b"not json", b"\xff\xfe", b"[1, 2]", b"42"])
+async def test_unreadable_l2_value_is_a_miss(two_tier, raw):
+    two_tier.l2.data["k"] = raw
+    assert await two_tier.get("k", "api") is None
+    assert await two_tier.get_stale("k", "api") is None
+    assert two_tier.get_stats()["apis"]["api"]["misses"] == 1
+
+@pytest.mark.asyncio
+async def test_pre_envelope_l2_value_is_fresh(two_tier):
+    two_tier.l2.data["k"] = json.dumps({"status": "success", "data": [1]})
+    assert await two_tier.get("k", "api") == {"status": "success", "data": [1]}
+
+@pytest.mark.asyncio
+async def test_l2_failure_backs_off(two_tier, clock):
+    two_tier.l2.fail = True
+    assert await two_tier.get("k", "api") is None
+    assert not two_tier._l2_available()
+
+    clock.now += settings.REDIS_RETRY_BACKOFF
+    assert two_tier._l2_available()
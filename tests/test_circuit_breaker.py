@@ -0,0 +1,191 @@
+import asyncio
+import contextvars
+
+import pytest
+
+from config.settings import settings
+from tools import cache as cache_module
+from tools import circuit_breaker as breaker_module
+from tools.circuit_breaker import ATTEMPT, CLOSED, HALF_OPEN, OPEN, PROBE, AdaptiveTimeout, CircuitBreaker
+
+URL = "https://api.example.com/lookup"
+
+@pytest.fixture
+def clock(clock, monkeypatch):
+    monkeypatch.setattr(breaker_module, "time", clock)
+    monkeypatch.setattr(cache_module, "time", clock)
+    return clock
+
+@pytest.fixture
+def quick_breaker(monkeypatch):
+    """Trip after one failed attempt, no retries (and so no backoff sleeps)"""
+    monkeypatch.setattr(settings, "API_BREAKER_FAILURES", 1)
+    monkeypatch.setattr(settings, "API_RETRY_ATTEMPTS", 1)
+    monkeypatch.setattr(settings, "API_BREAKER_COOLDOWN", 30)
+
+def test_breaker_opens_after_consecutive_failures(clock, monkeypatch):
+    monkeypatch.setattr(settings, "API_BREAKER_FAILURES", 3)
+    breaker = CircuitBreaker("api")
+    breaker.record(False)
+    breaker.record(True)
+    breaker.record(False)
+    breaker.record(False)
+    assert breaker.state == CLOSED
+    breaker.record(False)
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.stats.rejected == 1
+
+def test_half_open_allows_a_single_probe(clock, quick_breaker):
+    breaker = CircuitBreaker("api")
+    breaker.record(False)
+    clock.now += 30
+
+    assert breaker.available()
+    assert breaker.allow() == PROBE
+    assert breaker.state == HALF_OPEN
+    assert not breaker.available()
+    assert breaker.allow() is None
+
+    breaker.record(True, PROBE)
+    assert breaker.state == CLOSED
+    assert breaker.allow() == ATTEMPT
+
+def test_failed_probe_doubles_the_cooldown_up_to_the_cap(clock, quick_breaker, monkeypatch):
+    monkeypatch.setattr(settings, "API_BREAKER_COOLDOWN_MAX", 100)
+    breaker = CircuitBreaker("api")
+    breaker.record(False)
+    cooldowns = []
+    for _ in range(4):
+        clock.now += breaker.cooldown
+        breaker.record(False, breaker.allow())
+        cooldowns.append(breaker.cooldown)
+    assert cooldowns == [60, 100, 100, 100]
+
+    clock.now += breaker.cooldown
+    breaker.record(True, breaker.allow())
+    assert breaker.cooldown == 30
+
+def test_released_probe_can_be_claimed_again(clock, quick_breaker):
+    breaker = CircuitBreaker("api")
+    breaker.record(False)
+    clock.now += 30
+    breaker.release(breaker.allow())
+    assert breaker.allow() == PROBE
+
+def tripped_with_straggler(clock):
+    """A breaker in half-open with its probe out, and an attempt sent while it was still closed"""
+    breaker = CircuitBreaker("api")
+    straggler = breaker.allow()
+    breaker.record(False, breaker.allow())
+    clock.now += 30
+    probe = breaker.allow()
+    assert (straggler, probe) == (ATTEMPT, PROBE)
+    return breaker, straggler, probe
+
+@pytest.mark.parametrize("healthy", [True, False])
+def test_straggler_result_does_not_decide_the_half_open_state(clock, quick_breaker, healthy):
+    breaker, straggler, probe = tripped_with_straggler(clock)
+    breaker.record(healthy, straggler)
+
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow() is None
+    assert (breaker.stats.successes, breaker.stats.failures, breaker.stats.opened) == (int(healthy), 2 - healthy, 1)
+
+    breaker.record(True, probe)
+    assert breaker.state == CLOSED
+
+def test_cancelled_straggler_does_not_free_the_probe(clock, quick_breaker):
+    breaker, straggler, probe = tripped_with_straggler(clock)
+    breaker.release(straggler)
+    assert breaker.allow() is None
+
+    breaker.release(probe)
+    assert breaker.allow() == PROBE
+
+def test_adaptive_timeout_follows_recent_latency(monkeypatch):
+    monkeypatch.setattr(settings, "API_TIMEOUT", 30)
+    monkeypatch.setattr(settings, "API_TIMEOUT_MIN", 2)
+    monkeypatch.setattr(settings, "API_TIMEOUT_MIN_SAMPLES", 5)
+    monkeypatch.setattr(settings, "API_TIMEOUT_MULTIPLIER", 3)
+    latency = AdaptiveTimeout()
+
+    for _ in range(4):
+        latency.observe(1.5)
+    assert latency.timeout == 30.0
+    latency.observe(1.5)
+    assert latency.timeout == pytest.approx(4.5)
+
+    for _ in range(5):
+        latency.observe(0.1)
+    assert latency.timeout == pytest.approx(4.5)  # p99 still the slow samples
+    for _ in range(10):
+        latency.observe(20.0)
+    assert latency.timeout == 30.0
+
+@pytest.mark.asyncio
+async def test_open_circuit_fails_fast_without_cached_data(api_manager, fake_http, clock, quick_breaker):
+    fake_http.status = 503
+    first = await api_manager.fetch(URL, api_name="flaky")
+    assert first["circuit_open"] is True
+
+    second = await api_manager.fetch(URL, params={"q": 2}, api_name="flaky")
+    assert second["status"] == "failed"
+    assert second["error"] == "Circuit open for flaky"
+    assert len(fake_http.calls) == 1
+    assert api_manager.get_breaker_stats()["flaky"]["rejected"] == 1
+
+@pytest.mark.asyncio
+async def test_stale_data_is_served_while_the_circuit_is_open(api_manager, fake_http, clock, quick_breaker):
+    fresh = await api_manager.fetch(URL, api_name="flaky", cache_ttl=60)
+    clock.now += 120
+
+    # stale-if-error: the refresh fails and trips the breaker
+    fake_http.status = 503
+    result = await api_manager.fetch(URL, api_name="flaky", cache_ttl=60)
+    assert result["stale"] is True
+    assert result["data"] == fresh["data"]
+    assert result["stale_seconds"] == 60
+
+    # open: served stale without touching the upstream
+    calls = len(fake_http.calls)
+    result = await api_manager.fetch(URL, api_name="flaky", cache_ttl=60)
+    assert result["stale"] is True
+    assert len(fake_http.calls) == calls
+
+    # after the cooldown a background probe refreshes the entry
+    fake_http.status = 200
+    fake_http.body = {"fresh": True}
+    clock.now += 30
+    result = await api_manager.fetch(URL, api_name="flaky", cache_ttl=60)
+    assert result["stale"] is True
+    await asyncio.gather(*api_manager._inflight.values())
+
+    assert api_manager.guard.breaker("flaky").closed
+    result = await api_manager.fetch(URL, api_name="flaky", cache_ttl=60)
+    assert result["data"] == {"fresh": True}
+    assert "stale" not in result
+
+request_owner = contextvars.ContextVar("request_owner", default=None)
+
+@pytest.mark.asyncio
+async def test_background_refresh_does_not_inherit_the_callers_context(api_manager, fake_http, clock, quick_breaker):
+    seen = []
+    request = fake_http.request
+
+    async def recording_request(*args, **kwargs):
+        seen.append(request_owner.get())
+        return await request(*args, **kwargs)
+
+    fake_http.request = recording_request
+    request_owner.set("caller")
+    await api_manager.fetch(URL, api_name="flaky", cache_ttl=60)
+    clock.now += 120
+    fake_http.status = 503
+    await api_manager.fetch(URL, api_name="flaky", cache_ttl=60)
+    fake_http.status = 200
+    clock.now += 30
+    await api_manager.fetch(URL, api_name="flaky", cache_ttl=60)
+    await asyncio.gather(*api_manager._inflight.values())
+
+    assert seen == ["caller", "caller", None]
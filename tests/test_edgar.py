@@ -0,0 +1,111 @@
+import pytest
+
+pytest.importorskip("pyarrow")
+import pyarrow.parquet as pq
+
+from datastores.edgar import EdgarStore, _FACT_COLUMNS, _to_table, _tracked_member, _upsert, latest_financials
+
+REVENUES = "us-gaap:Revenues"
+CONTRACT_REVENUE = "us-gaap:RevenueFromContractWithCustomerExcludingAssessedTax"
+
+def fact(concept, value, end, start=None, filed=None, fy=None, cik=320193):
+    """One facts row; filed defaults to two months after the period"""
+    year = int(end[:4])
+    return {
+        "cik": cik, "concept": concept, "value": float(value), "start": start, "end": end,
+        "fy": fy or year, "fp": "FY", "form": "10-K", "filed": filed or f"{year + 1}-02-28", "accn": None,
+    }
+
+def year(concept, value, fiscal_year, **kwargs):
+    return fact(concept, value, f"{fiscal_year}-12-31", start=f"{fiscal_year}-01-01", **kwargs)
+
+def columns(facts):
+    return {column: [f[column] for f in facts] for column in _FACT_COLUMNS}
+
+def frame(facts):
+    """Facts as EdgarStore.facts() returns them: via Arrow, with date and category columns"""
+    return _to_table(columns(facts)).to_pandas()
+
+CASES = {
+    "latest period wins": (
+        [year(REVENUES, 100, 2022), year(REVENUES, 120, 2023)],
+        {"revenue_usd": 120.0, "period_end": "2023-12-31", "fiscal_year": 2023, "revenue_growth_pct": 20.0},
+    ),
+    "preferred concept wins within a period": (
+        [year(CONTRACT_REVENUE, 90, 2023, filed="2024-06-30"), year(REVENUES, 100, 2023)],
+        {"revenue_usd": 100.0},
+    ),
+    "restatement wins over the original filing": (
+        [year(REVENUES, 100, 2023, filed="2024-02-28"), year(REVENUES, 105, 2023, filed="2025-02-28")],
+        {"revenue_usd": 105.0},
+    ),
+    "quarterly and half-year flows are ignored": (
+        [year(REVENUES, 400, 2023),
+         fact(REVENUES, 110, "2023-12-31", start="2023-10-01", filed="2024-03-31"),
+         fact(REVENUES, 210, "2024-06-30", start="2024-01-01")],
+        {"revenue_usd": 400.0, "period_end": "2023-12-31"},
+    ),
+    "52-53 week years count as full years": (
+        [fact(REVENUES, 300, "2023-12-30", start="2023-01-01", fy=2023)],
+        {"revenue_usd": 300.0, "fiscal_year": 2023},
+    ),
+    "balance sheet instants need no start": (
+        [fact("us-gaap:Assets", 500, "2023-12-31"), fact("us-gaap:Assets", 450, "2022-12-31")],
+        {"total_assets_usd": 500.0, "period_end": "2023-12-31"},
+    ),
+    "growth uses the restated prior year": (
+        [year(REVENUES, 120, 2023),
+         year(REVENUES, 100, 2022, filed="2023-02-28"),
+         year(REVENUES, 110, 2022, filed="2024-02-28")],
+        {"revenue_usd": 120.0, "revenue_growth_pct": 9.09},
+    ),
+}
+
+NO_GROWTH = {
+    "prior year under another concept": [year(REVENUES, 120, 2023), year(CONTRACT_REVENUE, 100, 2022)],
+    "prior period two years back": [year(REVENUES, 120, 2023), year(REVENUES, 100, 2021)],
+    "zero prior revenue": [year(REVENUES, 120, 2023), year(REVENUES, 0, 2022)],
+}
+
+@pytest.mark.parametrize("facts,expected", CASES.values(), ids=CASES.keys())
+def test_latest_financials(facts, expected):
+    metrics = latest_financials(frame(facts))
+    assert {key: metrics.get(key) for key in expected} == expected
+
+@pytest.mark.parametrize("facts", NO_GROWTH.values(), ids=NO_GROWTH.keys())
+def test_revenue_growth_needs_a_matching_prior_year(facts):
+    metrics = latest_financials(frame(facts))
+    assert metrics["revenue_usd"] == 120.0
+    assert "revenue_growth_pct" not in metrics
+
+def test_only_partial_periods_yield_nothing():
+    assert latest_financials(frame([fact(REVENUES, 110, "2023-12-31", start="2023-10-01")])) == {}
+    assert latest_financials(frame([])) == {}
+
+@pytest.mark.parametrize("member,tracked", [
+    ("CIK0000320193.json", True),
+    ("CIK0000320193-submissions-001.json", False),
+    ("CIK0000789019.json", False),
+    ("CIK0000320193.json.tmp", False),
+    ("README.txt", False),
+])
+def test_tracked_member(member, tracked):
+    assert _tracked_member(member, {320193}) is tracked
+
+def test_upsert_replaces_only_the_given_ciks(tmp_path):
+    path = tmp_path / "facts.parquet"
+    _upsert(path, columns([year(REVENUES, 1, 2023, cik=2), year(REVENUES, 1, 2023, cik=1)]), {1, 2})
+    _upsert(path, columns([year(REVENUES, 2, 2023, cik=2), year(REVENUES, 2, 2024, cik=2)]), {2})
+
+    table = pq.read_table(path).to_pydict()
+    assert table["cik"] == [1, 2, 2]
+    assert table["value"] == [1.0, 2.0, 2.0]
+
+    store = EdgarStore(str(tmp_path))
+    store.load()
+    assert len(store.facts("2")) == 2
+    assert latest_financials(store.facts("2"))["revenue_usd"] == 2.0
+
+    # a refetch without tracked facts drops the company's old rows
+    _upsert(path, columns([]), {1})
+    assert pq.read_table(path)["cik"].to_pylist() == [2, 2]
@@ -0,0 +1,95 @@
+import csv
+import zipfile
+
+import pytest
+
+from datastores.gleif import LEIRegistry, _swap_index, build_index
+
+COLUMNS = [
+    "LEI", "Entity.LegalName",
+    "Entity.OtherEntityNames.OtherEntityName.1", "Entity.OtherEntityNames.OtherEntityName.1.xmllang",
+    "Entity.TransliteratedOtherEntityNames.TransliteratedOtherEntityName.1",
+    "Entity.LegalAddress.Country", "Entity.LegalJurisdiction",
+    "Entity.EntityStatus", "Registration.RegistrationStatus",
+]
+
+def lei(n: int) -> str:
+    return f"TEST{n:016d}"
+
+# (LEI, legal name, other name, transliterated name, country, status, registration)
+GOLDEN_COPY = [
+    (lei(1), "Acme Corp", "", "", "US", "ACTIVE", "ISSUED"),
+    (lei(2), "Acme GmbH", "", "", "DE", "ACTIVE", "ISSUED"),
+    (lei(3), "ACME, Inc.", "", "", "US", "INACTIVE", "LAPSED"),
+    (lei(4), "Beta Widgets Ltd", "Acme", "BETA WIDGETS", "GB", "ACTIVE", "ISSUED"),
+    (lei(5), "Société Générale", "", "Societe Generale SA", "FR", "ACTIVE", "ISSUED"),
+    ("", "No LEI Holdings", "", "", "US", "ACTIVE", "ISSUED"),
+    (lei(6), "", "Nameless", "", "US", "ACTIVE", "ISSUED"),
+]
+
+def write_golden_copy(path, rows):
+    with open(path, "w", encoding="utf-8", newline="") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(COLUMNS)
+        for code, legal, other, transliterated, country, status, registration in rows:
+            writer.writerow([code, legal, other, "en" if other else "", transliterated,
+                             country, country, status, registration])
+    return path
+
+@pytest.fixture
+def registry(tmp_path):
+    source = write_golden_copy(tmp_path / "golden.csv", GOLDEN_COPY)
+    build_index(source, tmp_path / "index")
+    registry = LEIRegistry(str(tmp_path))
+    registry.load()
+    return registry
+
+def test_build_skips_rows_without_lei_or_legal_name(tmp_path):
+    source = write_golden_copy(tmp_path / "golden.csv", GOLDEN_COPY)
+    meta = build_index(source, tmp_path / "index")
+    # the transliterated "BETA WIDGETS" normalizes like the legal name, so it adds no key
+    assert (meta["records"], meta["names"]) == (5, 6)
+
+def test_resolve_ranks_legal_local_active_matches_first(registry):
+    ranked = registry.resolve("acme incorporated", "us")
+    assert [r["lei"] for r in ranked] == [lei(1), lei(3), lei(2), lei(4)]
+    assert [r["matched"] for r in ranked] == ["legal_name"] * 3 + ["other_name"]
+    assert ranked[1]["entity_status"] == "INACTIVE"
+
+def test_resolve_without_country_keeps_file_order_among_equals(registry):
+    assert [r["lei"] for r in registry.resolve("Acme", limit=2)] == [lei(1), lei(2)]
+
+def test_resolve_returns_the_full_record(registry):
+    [record] = registry.resolve("Societe Generale")
+    assert record == {
+        "lei": lei(5), "name": "Société Générale", "country": "FR", "jurisdiction": "FR",
+        "entity_status": "ACTIVE", "registration_status": "ISSUED", "matched": "legal_name",
+    }
+    assert registry.resolve("Nameless") == []
+    assert registry.resolve("Ltd") == []
+    assert registry.resolve("") == []
+
+def test_zipped_golden_copy_builds_the_same_index(tmp_path):
+    source = write_golden_copy(tmp_path / "golden.csv", GOLDEN_COPY)
+    with zipfile.ZipFile(tmp_path / "golden.zip", "w") as archive:
+        archive.write(source, "20240101-gleif-concatenated-file-lei2.csv")
+    meta = build_index(tmp_path / "golden.zip", tmp_path / "index")
+    assert meta["records"] == 5
+
+def test_load_remaps_after_the_index_is_swapped(registry, tmp_path):
+    before = registry.arrays
+    registry.load()
+    assert registry.arrays is before
+
+    rebuilt = [row for row in GOLDEN_COPY if row[0] != lei(4)] + [(lei(7), "Gamma AG", "", "", "CH", "ACTIVE", "ISSUED")]
+    source = write_golden_copy(tmp_path / "golden2.csv", rebuilt)
+    build_index(source, tmp_path / "index.new")
+    _swap_index(tmp_path, tmp_path / "index.new")
+
+    # still mapped: the old files stay readable until the registry remaps
+    assert before["lei"][3].decode() == lei(4)
+    registry.load()
+    assert registry.arrays is not before
+    assert registry.resolve("Beta Widgets") == []
+    assert registry.resolve("Gamma")[0]["lei"] == lei(7)
+    assert registry.get_stats()["records"] == 5
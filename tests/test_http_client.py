@@ -0,0 +1,37 @@
+import pytest
+
+from config.settings import settings
+from tools.http_client import HTTPClient
+
+@pytest.mark.asyncio
+async def test_aiohttp_pool_reports_per_host_limit(monkeypatch):
+    monkeypatch.setattr(settings, "HTTP_CLIENT_BACKEND", "aiohttp")
+    client = HTTPClient()
+    await client.start()
+    try:
+        stats = client.get_stats()
+    finally:
+        await client.close()
+    assert stats["limit_per_host"] == settings.HTTP_POOL_LIMIT_PER_HOST
+    assert "max_keepalive_connections" not in stats
+
+@pytest.mark.asyncio
+async def test_httpx_pool_reports_keepalive_cap_not_per_host_limit(monkeypatch):
+    pytest.importorskip("httpx")
+    monkeypatch.setattr(settings, "HTTP_CLIENT_BACKEND", "httpx")
+    client = HTTPClient()
+    await client.start()
+    try:
+        stats = client.get_stats()
+    finally:
+        await client.close()
+    assert stats["backend"] == "httpx"
+    assert stats["max_keepalive_connections"] == settings.HTTP_POOL_LIMIT_PER_HOST
+    assert "limit_per_host" not in stats
+
+def test_unlimited_pool_reports_no_utilization(monkeypatch):
+    # aiohttp treats a limit of 0 as unlimited
+    monkeypatch.setattr(settings, "HTTP_POOL_LIMIT", 0)
+    stats = HTTPClient().get_stats()
+    assert stats["limit"] == 0
+    assert stats["utilization"] is None
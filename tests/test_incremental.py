@@ -0,0 +1,168 @@
+"""
+Incremental re-runs through the coordinator against a real SQLite
+snapshot store: fresh tool snapshots are reused, stale ones refetched,
+and only agents whose inputs changed run again.
+"""
+import sqlite3
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, Any
+
+import pytest
+from langchain_core.tools import tool
+
+from agents.base_agent import AgentState
+from agents.coordinator_agent import CoordinatorAgent
+from agents.incremental import inputs_fingerprint, reusable_result
+from config.settings import settings
+from storage.assessment_store import SQLiteAssessmentStore
+from tools.results import ToolResult
+
+AGENT_TYPES = ["financial", "compliance", "reputation", "operational", "strategic", "cyber", "esg"]
+
+calls = Counter()
+headline = {"text": "quiet quarter"}
+
+@tool
+async def get_headlines(company_name: str) -> str:
+    """Latest news for a company"""
+    calls["get_headlines"] += 1
+    return headline["text"]
+
+@tool
+async def get_statements(company_name: str) -> str:
+    """Financial statements for a company"""
+    calls["get_statements"] += 1
+    return "revenue 100"
+
+AGENT_TOOLS = {"reputation": [get_headlines], "financial": [get_statements]}
+
+class CountingAgent:
+    """Stand-in agent that counts its runs and echoes the inputs it saw"""
+
+    def __init__(self, agent_type: str):
+        self.agent_type = agent_type
+        self.tools = AGENT_TOOLS.get(agent_type, [])
+        self.state = AgentState(agent_name=f"{agent_type}_agent")
+
+    async def execute(self, task: str, context: Dict[str, Any] = None,
+                      company_info: Dict[str, Any] = None, tool_data: Dict[str, Any] = None):
+        calls[self.agent_type] += 1
+        return {
+            "status": "success",
+            "agent": self.agent_type,
+            "result": f"{self.agent_type} saw {sorted((tool_data or {}))}",
+            "timestamp": datetime.now().isoformat(),
+            "duration_seconds": 0.0
+        }
+
+    def get_state(self) -> AgentState:
+        return self.state
+
+class CountingCoordinator(CoordinatorAgent):
+    def __init__(self, snapshot_store):
+        super().__init__(snapshot_store=snapshot_store)
+        self.graph_builder.driver = None
+
+    def _initialize_agents(self):
+        self._agents = {agent_type: CountingAgent(agent_type) for agent_type in AGENT_TYPES}
+
+    async def _identify_company(self, ctx) -> Dict[str, Any]:
+        return {"verified": True, "lei": None, "cik": None,
+                "locations": [ctx.company_info["country"]],
+                "jurisdictions": [ctx.company_info["country"]]}
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    # names unknown to STRUCTURED_TOOLS, so invoke_structured calls the stand-ins
+    monkeypatch.setattr(settings, "DATA_FRESHNESS", {"get_headlines": 3600})
+    return str(tmp_path / "assessments.db")
+
+async def started(db_path):
+    headline["text"] = "quiet quarter"
+    store = SQLiteAssessmentStore(db_path, worker_id="w1")
+    await store.init()
+    return CountingCoordinator(store)
+
+def age_snapshot(db_path, table, column, name, seconds):
+    key_column = "tool" if table == "tool_snapshots" else "agent"
+    conn = sqlite3.connect(db_path)
+    old = (datetime.now() - timedelta(seconds=seconds)).isoformat()
+    conn.execute(f"UPDATE {table} SET {column} = ? WHERE {key_column} = ?", (old, name))
+    conn.commit()
+    conn.close()
+
+async def assess(coordinator):
+    calls.clear()
+    result = await coordinator.run_assessment("Acme Corp", ticker="ACME", incremental=True)
+    assert result["status"] == "success"
+    return result["incremental"]
+
+@pytest.mark.asyncio
+async def test_unchanged_inputs_reuse_every_agent(db_path):
+    coordinator = await started(db_path)
+    first = await assess(coordinator)
+    assert first == {"tools_fetched": 2, "agents_reused": [], "agents_run": sorted(AGENT_TYPES)}
+
+    second = await assess(coordinator)
+    assert second == {"tools_fetched": 0, "agents_reused": sorted(AGENT_TYPES), "agents_run": []}
+    assert sum(calls.values()) == 0
+
+@pytest.mark.asyncio
+async def test_stale_tool_is_refetched_but_same_output_keeps_the_agent(db_path):
+    coordinator = await started(db_path)
+    await assess(coordinator)
+    age_snapshot(db_path, "tool_snapshots", "fetched_at", "get_headlines",
+                 settings.DATA_FRESHNESS["get_headlines"] + 1)
+
+    run = await assess(coordinator)
+    assert calls == Counter({"get_headlines": 1})
+    assert run["tools_fetched"] == 1
+    assert run["agents_run"] == []
+
+@pytest.mark.asyncio
+async def test_only_the_agent_whose_inputs_changed_runs_again(db_path):
+    coordinator = await started(db_path)
+    await assess(coordinator)
+    age_snapshot(db_path, "tool_snapshots", "fetched_at", "get_headlines",
+                 settings.DATA_FRESHNESS["get_headlines"] + 1)
+    headline["text"] = "recall announced"
+
+    run = await assess(coordinator)
+    assert calls == Counter({"get_headlines": 1, "reputation": 1})
+    assert run["agents_run"] == ["reputation"]
+
+    # the new result is stored, so the next run reuses it
+    assert (await assess(coordinator))["agents_run"] == []
+
+@pytest.mark.asyncio
+async def test_agent_without_inputs_reruns_after_the_default_freshness(db_path):
+    coordinator = await started(db_path)
+    await assess(coordinator)
+    age_snapshot(db_path, "agent_snapshots", "completed_at", "cyber", settings.DATA_FRESHNESS_DEFAULT + 1)
+    age_snapshot(db_path, "agent_snapshots", "completed_at", "financial", settings.DATA_FRESHNESS_DEFAULT + 1)
+
+    # financial's inputs are still fresh and unchanged, so its age doesn't matter
+    assert (await assess(coordinator))["agents_run"] == ["cyber"]
+
+@pytest.mark.asyncio
+async def test_full_run_records_snapshots_for_the_next_incremental_one(db_path):
+    coordinator = await started(db_path)
+    calls.clear()
+    await coordinator.run_assessment("Acme Corp", ticker="ACME")
+    assert calls["financial"] == 1
+
+    assert (await assess(coordinator))["agents_run"] == []
+
+def test_fingerprint_ignores_order_and_result_wrapping():
+    news = ToolResult(tool="get_headlines", subject="Acme", metrics={"text": "quiet"})
+    rates = ToolResult(tool="get_statements", subject="Acme", metrics={"text": "100"})
+    assert inputs_fingerprint({"a": news, "b": rates}) == inputs_fingerprint({"b": rates.to_dict(), "a": news})
+    assert inputs_fingerprint({"a": news}) != inputs_fingerprint({"a": rates})
+
+def test_failed_or_mismatched_snapshots_are_not_reused():
+    snapshot = {"inputs": "abc", "result": {"status": "success"}, "completed_at": datetime.now().isoformat()}
+    assert reusable_result(snapshot, "abc", has_inputs=True)["reused"] is True
+    assert reusable_result(snapshot, "xyz", has_inputs=True) is None
+    assert reusable_result({**snapshot, "result": {"status": "error"}}, "abc", has_inputs=True) is None
+    assert reusable_result(None, "abc", has_inputs=True) is None
@@ -0,0 +1,102 @@
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration
+
+from agents import llm_cache as llm_cache_module
+from agents.llm_cache import LLMCache, LLMResponseCache, SQLiteLLMStore
+from config.settings import settings
+from tools import cache as cache_module
+
+@pytest.fixture
+def clock(clock, monkeypatch):
+    monkeypatch.setattr(llm_cache_module, "time", clock)
+    monkeypatch.setattr(cache_module, "time", clock)
+    return clock
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_CACHE_BACKEND", "sqlite")
+    monkeypatch.setattr(settings, "LLM_CACHE_PATH", str(tmp_path / "llm_cache.db"))
+    monkeypatch.setattr(settings, "LLM_CACHE_TTL", 60)
+    cache = LLMCache()
+    yield cache
+    cache.close()
+
+def generation(text: str):
+    return [ChatGeneration(message=AIMessage(content=text))]
+
+def chat_model(cache: LLMCache, namespace: str = "agent"):
+    return FakeListChatModel(responses=["first", "second", "third"], cache=LLMResponseCache(namespace, cache))
+
+def test_same_prompt_and_model_is_answered_from_the_cache(cache):
+    model = chat_model(cache)
+    assert model.invoke("hello").content == "first"
+    assert model.invoke("hello").content == "first"
+    assert cache.stats.l1_hits == 1
+    assert cache.stats.writes == 1
+
+def test_prompt_tools_and_namespace_are_part_of_the_key(cache):
+    model = chat_model(cache)
+    assert model.invoke("hello").content == "first"
+    assert model.invoke("hello again").content == "second"
+    assert model.invoke("hello", tools=[{"name": "search"}]).content == "third"
+    assert chat_model(cache, "other agent").invoke("hello").content == "first"
+    assert cache.stats.l1_hits == 0
+
+def test_model_settings_are_part_of_the_key(cache):
+    cheap = chat_model(cache)
+    cheap.invoke("hello")
+    other = FakeListChatModel(responses=["other model"], cache=LLMResponseCache("agent", cache))
+    assert other.invoke("hello").content == "other model"
+
+def test_store_hit_refills_l1(cache):
+    key = cache.make_key("agent", "prompt", "model")
+    cache.set(key, generation("stored"))
+    cache.l1.clear()
+
+    assert cache.get_l1(key) is None
+    assert cache.get_store(key)[0].message.content == "stored"
+    assert cache.get_l1(key)[0].message.content == "stored"
+    assert (cache.stats.l1_hits, cache.stats.store_hits, cache.stats.misses) == (1, 1, 0)
+
+def test_entries_expire_after_the_ttl(cache, clock):
+    key = cache.make_key("agent", "prompt", "model")
+    cache.set(key, generation("stored"))
+    clock.now += 61
+
+    assert cache.get_l1(key) is None
+    assert cache.get_store(key) is None
+    assert cache.stats.misses == 1
+
+def test_sqlite_store_survives_a_new_cache_instance(cache):
+    key = cache.make_key("agent", "prompt", "model")
+    cache.set(key, generation("stored"))
+
+    restarted = LLMCache()
+    try:
+        assert restarted.get_store(key)[0].message.content == "stored"
+    finally:
+        restarted.close()
+
+def test_sqlite_store_evicts_least_recently_read(tmp_path, clock):
+    store = SQLiteLLMStore(str(tmp_path / "llm_cache.db"), ttl=60, max_entries=2)
+    store.set("a", "1")
+    clock.now += 1
+    store.set("b", "2")
+    clock.now += 1
+    store.get("a")
+    clock.now += 1
+    store.set("c", "3")
+    assert [store.get(key) for key in "abc"] == ["1", None, "3"]
+    store.close()
+
+def test_unreadable_entry_counts_as_an_error_and_a_miss(cache):
+    key = cache.make_key("agent", "prompt", "model")
+    cache.store.set(key, "not json")
+    assert cache.get_store(key) is None
+
+    # a serialized object outside the core allowlist is refused, not imported
+    cache.store.set(key, '{"lc": 1, "type": "constructor", "id": ["os", "system"], "kwargs": {}}')
+    assert cache.get_store(key) is None
+    assert (cache.stats.errors, cache.stats.misses, cache.stats.store_hits) == (2, 2, 0)
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from datastores.macro import MacroStore, _upsert, fred_rows, world_bank_rows
+from tools import comprehensive_tools
+from tools.results import STRUCTURED_TOOLS
+
+def world_bank(indicator, country, iso3, values):
+    """World Bank page records for {year: value}; None values are gaps"""
+    return world_bank_rows(indicator, [
+        {"country": {"id": country}, "countryiso3code": iso3, "date": str(year), "value": value}
+        for year, value in values.items()
+    ])
+
+@pytest.fixture
+def store(tmp_path):
+    path = tmp_path / "indicators.parquet"
+    _upsert(path, world_bank("gdp_growth", "US", "USA", {2021: 5.8, 2022: 1.9, 2023: 2.5}), ["worldbank/gdp_growth"])
+    _upsert(path, world_bank("gdp_growth", "DE", "DEU", {2021: 3.2, 2022: 1.8, 2023: None}), ["worldbank/gdp_growth"])
+    _upsert(path, world_bank("inflation", "DE", "DEU", {2022: 6.9}), ["worldbank/inflation"])
+    _upsert(path, fred_rows("gdp_growth", [
+        {"date": "2024-01-01", "value": "1.6"},
+        {"date": "2024-04-01", "value": "3.0"},
+        {"date": "2024-07-01", "value": "."},
+    ]), ["fred/gdp_growth"])
+    store = MacroStore(str(tmp_path))
+    store.load()
+    return store
+
+def test_last_valid_skips_trailing_gaps_and_unknown_countries():
+    dates = np.array(["2021-01-01", "2022-01-01", "2023-01-01"], dtype="datetime64[D]")
+    panel = (pd.Index(["DE", "FR", "US"]), dates, np.array([
+        [3.2, 1.8, np.nan],
+        [np.nan, np.nan, np.nan],
+        [5.8, np.nan, 2.5],
+    ]))
+    values, when = MacroStore._last_valid(panel, ["US", "DE", "FR", "XX"])
+    np.testing.assert_array_equal(values, [2.5, 1.8, np.nan, np.nan])
+    assert when[:2].tolist() == [dates[2], dates[1]]
+    assert np.isnat(when[2:]).all()
+
+def test_latest_prefers_the_most_recent_source_and_keeps_input_order(store):
+    latest = store.latest("gdp_growth", ["DE", "us", "ZZ"])
+    assert latest.index.tolist() == ["DE", "US", "ZZ"]
+    assert latest["value"].tolist()[:2] == [1.8, 3.0]
+    assert latest["source"].tolist()[:2] == ["worldbank", "fred"]
+    assert latest["date"].iloc[1] == pd.Timestamp("2024-04-01")
+    assert latest.loc["ZZ"].isna().all()
+
+def test_iso3_codes_map_to_the_stored_iso2(store):
+    latest = store.latest("gdp_growth", ["USA", "deu", "XYZ"])
+    assert latest.index.tolist() == ["US", "DE", "XYZ"]
+    assert latest["value"].tolist()[:2] == [3.0, 1.8]
+    assert store.history("inflation", "DEU")["value"].tolist() == [6.9]
+
+def test_unknown_indicator_or_country_has_no_history(store):
+    assert store.history("gdp_growth", "ZZ").empty
+    assert store.history("gdp_growth", "US", source="imf").empty
+    assert store.latest("inflation", ["US"]).isna().all(axis=None)
+
+@pytest.mark.asyncio
+async def test_gdp_growth_history_comes_from_the_latest_series(store, monkeypatch):
+    async def local_store():
+        return store
+    monkeypatch.setattr(comprehensive_tools, "get_macro_store", local_store)
+    get_gdp_growth = STRUCTURED_TOOLS["get_gdp_growth"]
+
+    us = await get_gdp_growth(country="US")
+    assert us.source == "fred_local"
+    assert us.metrics == {"latest_pct": 3.0, "as_of": "2024-04-01"}
+    assert us.items == [{"year": "2024-04-01", "growth_pct": 3.0}, {"year": "2024-01-01", "growth_pct": 1.6}]
+
+    de = await get_gdp_growth(country="DEU")
+    assert de.metrics == {"latest_pct": 1.8, "as_of": "2022"}
+    assert de.items == [{"year": "2022", "growth_pct": 1.8}, {"year": "2021", "growth_pct": 3.2}]
+
+    assert (await get_gdp_growth(country="ZZ")).status == "no_data"
@@ -0,0 +1,53 @@
+import threading
+import time
+from dataclasses import dataclass
+
+from telemetry import profiler as profiler_module
+from telemetry.profiler import SamplingProfiler, profile_path
+
+def spin(stop: threading.Event):
+    while not stop.is_set():
+        sum(range(1000))
+
+def test_profiler_samples_other_threads_in_both_formats():
+    stop = threading.Event()
+    worker = threading.Thread(target=spin, args=(stop,), name="spinner")
+    worker.start()
+    profiler = SamplingProfiler("test", interval=0.002)
+    profiler.start()
+    time.sleep(0.05)
+    profiler.stop()
+    stop.set()
+    worker.join()
+
+    assert profiler.samples
+    assert any(line.startswith("spinner;") and "spin (" in line for line in profiler.collapsed().splitlines())
+    document = profiler.speedscope()
+    names = {frame["name"] for frame in document["shared"]["frames"]}
+    assert "spin" in names
+    assert "spinner" in {p["name"] for p in document["profiles"]}
+
+@dataclass(frozen=True)
+class OldCode:
+    """A code object as Python < 3.11 has it: no co_qualname"""
+    co_name: str
+    co_filename: str
+    co_firstlineno: int
+
+def test_frame_names_fall_back_to_co_name_without_co_qualname():
+    code = OldCode("run", "/elsewhere/job.py", 12)
+    profiler = SamplingProfiler("old")
+    profiler.samples = [(0.0, 0.01, "MainThread", (code,))]
+
+    assert profiler.collapsed() == "MainThread;run (/elsewhere/job.py:12) 10\n"
+    assert profiler.speedscope()["shared"]["frames"] == [{"name": "run", "file": "/elsewhere/job.py", "line": 12}]
+
+def test_profile_path_rejects_traversal(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiler_module.settings, "PROFILE_DIR", str(tmp_path))
+    profiler = SamplingProfiler("abc")
+    profiler.save(str(tmp_path))
+
+    assert profile_path("abc") == str(tmp_path / "abc.speedscope.json")
+    assert profile_path("abc", "collapsed") == str(tmp_path / "abc.collapsed.txt")
+    assert profile_path("../abc") is None
+    assert profile_path("abc", "svg") is None
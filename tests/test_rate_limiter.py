@@ -0,0 +1,93 @@
+import asyncio
+import time
+
+import pytest
+
+from config.settings import settings
+from tools import rate_limiter as rate_limiter_module
+from tools.rate_limiter import RateLimiter, RedisTokenBucket, TokenBucket
+
+@pytest.fixture
+def clock(clock, monkeypatch):
+    monkeypatch.setattr(rate_limiter_module, "time", clock)
+    return clock
+
+@pytest.mark.asyncio
+async def test_bucket_allows_a_burst_then_spaces_requests(clock):
+    bucket = TokenBucket(rate=2.0, capacity=3)
+    assert [await bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert await bucket.reserve() == pytest.approx(0.5)
+    assert await bucket.reserve() == pytest.approx(1.0)
+
+@pytest.mark.asyncio
+async def test_bucket_refills_over_time_up_to_capacity(clock):
+    bucket = TokenBucket(rate=1.0, capacity=2)
+    await bucket.reserve()
+    await bucket.reserve()
+    clock.now += 60
+    assert await bucket.reserve() == 0.0
+    assert bucket.tokens == pytest.approx(1.0)
+
+@pytest.mark.asyncio
+async def test_refund_returns_an_unused_token(clock):
+    bucket = TokenBucket(rate=1.0, capacity=1)
+    await bucket.reserve()
+    assert await bucket.reserve() == pytest.approx(1.0)
+    bucket.refund()
+    assert await bucket.reserve() == pytest.approx(1.0)
+
+class BrokenRedis:
+    async def eval(self, *args):
+        raise ConnectionError("redis down")
+
+@pytest.mark.asyncio
+async def test_shared_bucket_falls_back_to_local_when_redis_fails(clock):
+    bucket = RedisTokenBucket(BrokenRedis(), "ratelimit:test", rate=1.0, capacity=1)
+    assert await bucket.reserve() == 0.0
+    assert await bucket.reserve() == pytest.approx(1.0)
+
+@pytest.mark.asyncio
+async def test_limit_caps_concurrency_per_api(monkeypatch):
+    monkeypatch.setattr(settings, "API_CONCURRENCY_LIMITS", {"narrow": 2})
+    limiter = RateLimiter()
+
+    async def call():
+        async with limiter.limit("narrow"):
+            await asyncio.sleep(0.02)
+
+    await asyncio.gather(*(call() for _ in range(6)))
+    stats = limiter.get_stats()["narrow"]
+    assert stats["requests"] == 6
+    assert stats["max_in_flight"] == 2
+    assert stats["in_flight"] == 0
+
+@pytest.mark.asyncio
+async def test_limit_queues_requests_over_the_rate(monkeypatch):
+    # 20 per second, burst of one: the third call waits ~0.1s
+    monkeypatch.setattr(settings, "API_RATE_LIMITS", {"slow": 1200})
+    monkeypatch.setattr(settings, "API_RATE_BURST", 1)
+    limiter = RateLimiter()
+
+    started = time.monotonic()
+    for _ in range(3):
+        async with limiter.limit("slow"):
+            pass
+
+    assert time.monotonic() - started >= 0.09
+    assert limiter.get_stats()["slow"]["throttled"] == 2
+
+@pytest.mark.asyncio
+async def test_cancelled_wait_refunds_the_token(monkeypatch):
+    monkeypatch.setattr(settings, "API_RATE_LIMITS", {"slow": 6})
+    monkeypatch.setattr(settings, "API_RATE_BURST", 1)
+    limiter = RateLimiter()
+    async with limiter.limit("slow"):
+        pass
+
+    waiter = asyncio.create_task(limiter.limit("slow").__aenter__())
+    await asyncio.sleep(0.01)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    # without the refund the balance would sit near -1
+    assert limiter.buckets["slow"].tokens > -0.5
@@ -0,0 +1,111 @@
+import random
+import string
+
+import numpy as np
+import pytest
+
+from datastores.names import normalize_name
+from datastores.sanctions import (
+    SanctionsScreener, TrigramIndex, Watchlist, parse_ofac_sdn, parse_opensanctions, rebuild_segment, trigrams
+)
+
+def dice(a: str, b: str) -> float:
+    ga, gb = set(trigrams(a)), set(trigrams(b))
+    return 2 * len(ga & gb) / (len(ga) + len(gb))
+
+def random_names(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 8))) for _ in range(60)]
+    return [" ".join(rng.sample(words, rng.randint(1, 3))) for _ in range(count)]
+
+def test_trigrams_pad_with_spaces_and_dedupe():
+    assert len(trigrams("aa")) == 2          # " aa", "aa "
+    assert len(trigrams("aaaa")) == 3        # " aa", "aaa", "aa "
+    assert len(trigrams("")) == 0            # "  " is too short for a trigram
+    assert list(trigrams("ab")) == sorted(trigrams("ab"))
+
+@pytest.mark.parametrize("threshold", [0.5, 0.7, 0.9])
+def test_search_matches_brute_force_dice(threshold):
+    names = random_names(400)
+    index = TrigramIndex.build(names)
+    for query in names[:40] + ["completely unrelated", names[3] + "x"]:
+        ids, scores = index.search(trigrams(query), threshold)
+        expected = {i: dice(query, name) for i, name in enumerate(names) if dice(query, name) >= threshold}
+        assert dict(zip(ids.tolist(), scores.tolist())) == pytest.approx(expected)
+
+def test_search_on_empty_query_or_index():
+    index = TrigramIndex.build(["acme"])
+    ids, _ = index.search(np.empty(0, dtype=np.int64), 0.8)
+    assert len(ids) == 0
+    ids, _ = TrigramIndex.build([]).search(trigrams("acme"), 0.8)
+    assert len(ids) == 0
+
+def sample_watchlist(source="opensanctions", list_name="sanctions"):
+    return Watchlist.build(source, list_name, [
+        {"id": "e1", "name": "Acme Trading LLC", "aliases": ["Acme Trading Company", "ACME TRADING"]},
+        {"id": "e2", "name": "Globex Shipping", "aliases": []},
+        {"id": "e3", "name": "!!!", "aliases": []},
+    ])
+
+def test_watchlist_returns_best_alias_once_per_entity():
+    watchlist = sample_watchlist()
+    # the unnamed record has no usable name and is dropped
+    assert [e["id"] for e in watchlist.entities] == ["e1", "e2"]
+    matches = list(watchlist.search(trigrams(normalize_name("Acme Trading Ltd")), 0.8))
+    assert len(matches) == 1
+    entity_id, matched, score = matches[0]
+    assert watchlist.entities[entity_id]["id"] == "e1"
+    assert score == 1.0
+
+def test_watchlist_round_trips_through_its_segment_file(tmp_path):
+    watchlist = sample_watchlist()
+    path = tmp_path / "index" / "opensanctions.npz"
+    watchlist.save(path)
+    loaded = Watchlist.load(path)
+
+    assert loaded.entities == watchlist.entities
+    assert loaded.names == watchlist.names
+    query = trigrams(normalize_name("Globex Shipping"))
+    assert list(loaded.search(query, 0.8)) == list(watchlist.search(query, 0.8))
+
+def test_screener_merges_sources_and_filters_lists(tmp_path):
+    screener = SanctionsScreener(str(tmp_path))
+    sample_watchlist("opensanctions").save(screener.segment_path("opensanctions"))
+    Watchlist.build("ofac_sdn", "sanctions", [{"id": "ofac-1", "name": "ACME TRADING", "aliases": []}]).save(
+        screener.segment_path("ofac_sdn"))
+    Watchlist.build("peps", "pep", [{"id": "p1", "name": "Jane Acme Trading", "aliases": []}]).save(
+        screener.segment_path("peps"))
+    screener.load()
+
+    matches = screener.screen("Acme Trading Inc", lists=["sanctions"])
+    assert len(matches) == 1
+    assert matches[0]["list"] == "sanctions"
+    assert screener.screen("Nothing Like It") == []
+    assert screener.has_list("pep")
+    assert set(screener.screen_many(["Globex", "Globex", "Acme Trading"])) == {"Globex", "Acme Trading"}
+
+def test_parse_ofac_sdn_adds_first_last_alias(tmp_path):
+    path = tmp_path / "ofac_sdn.csv"
+    path.write_text(
+        '36,"AEROCARIBBEAN AIRLINES",-0-,"CUBA",-0-\n'
+        '173,"ALVAREZ, Jose",individual,"SDNT",-0-\n'
+        '174,-0-,-0-,-0-\n',
+        encoding="latin-1"
+    )
+    records = list(parse_ofac_sdn(path))
+    assert [r["id"] for r in records] == ["ofac-36", "ofac-173"]
+    assert records[0]["schema"] == "Entity"
+    assert records[1]["aliases"] == ["Jose ALVAREZ"]
+    assert records[1]["schema"] == "Person"
+
+def test_rebuild_segment_reports_entity_diff(tmp_path):
+    csv_path = tmp_path / "opensanctions.csv"
+    csv_path.write_text("id,schema,name,aliases,countries,sanctions,dataset\n"
+                        "e1,Company,Acme Trading,,ru,EU,eu_fsf\ne2,Company,Globex,,,,\n")
+    assert rebuild_segment("opensanctions", tmp_path)["added"] == 2
+
+    csv_path.write_text("id,schema,name,aliases,countries,sanctions,dataset\n"
+                        "e1,Company,Acme Trading,,ru,EU,eu_fsf\ne3,Company,Initech,,,,\n")
+    diff = rebuild_segment("opensanctions", tmp_path)
+    assert (diff["entities"], diff["added"], diff["removed"]) == (2, 1, 1)
+    assert [r["countries"] for r in parse_opensanctions(csv_path)] == [["ru"], []]
@@ -0,0 +1,83 @@
+import asyncio
+import contextvars
+import threading
+
+import pytest
+
+from agents.scheduler import AgentScheduler
+from config.settings import settings
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    monkeypatch.setattr(settings, "AGENT_MAX_CONCURRENCY", 1)
+    monkeypatch.setattr(settings, "AGENT_THREAD_POOL_SIZE", 0)
+    scheduler = AgentScheduler()
+    yield scheduler
+    scheduler.shutdown()
+
+def sleeper(seconds: float, result=None):
+    async def job():
+        await asyncio.sleep(seconds)
+        return result
+    return job
+
+@pytest.mark.asyncio
+async def test_queue_wait_does_not_count_against_the_timeout(scheduler):
+    # each job fits its timeout, but not the time spent waiting behind the other
+    results = await asyncio.gather(
+        scheduler.run("financial", sleeper(0.05, "a"), timeout=0.08),
+        scheduler.run("financial", sleeper(0.05, "b"), timeout=0.08),
+    )
+    assert results == ["a", "b"]
+
+    stats = scheduler.get_stats()["agents"]["financial"]
+    assert stats["completed"] == 2
+    assert stats["max_running"] == 1
+    assert stats["queue_wait_max"] >= 0.04
+    assert stats["run_time_max"] < 0.08
+
+@pytest.mark.asyncio
+async def test_timeout_applies_to_run_time_and_frees_the_slot(scheduler):
+    with pytest.raises(asyncio.TimeoutError):
+        await scheduler.run("cyber", sleeper(1), timeout=0.02)
+
+    assert await scheduler.run("cyber", sleeper(0, "next"), timeout=1) == "next"
+    stats = scheduler.get_stats()["agents"]["cyber"]
+    assert (stats["timed_out"], stats["completed"], stats["running"]) == (1, 1, 0)
+
+@pytest.mark.asyncio
+async def test_failed_job_is_counted_and_releases_its_slot(scheduler):
+    async def boom():
+        raise ValueError("bad")
+
+    with pytest.raises(ValueError):
+        await scheduler.run("esg", boom)
+    assert await scheduler.run("esg", sleeper(0, "ok")) == "ok"
+    assert scheduler.get_stats()["agents"]["esg"]["failed"] == 1
+
+@pytest.mark.asyncio
+async def test_timed_out_thread_keeps_its_slot_until_it_finishes(scheduler):
+    release = threading.Event()
+
+    async def blocking_job():
+        return await scheduler.run_in_thread(lambda: release.wait(5))
+
+    with pytest.raises(asyncio.TimeoutError):
+        await scheduler.run("strategic", blocking_job, timeout=0.02)
+    assert scheduler.get_stats()["agents"]["strategic"]["lingering"] == 1
+
+    follower = asyncio.create_task(scheduler.run("strategic", sleeper(0, "after"), timeout=1))
+    await asyncio.sleep(0.05)
+    assert not follower.done()
+
+    release.set()
+    assert await follower == "after"
+    stats = scheduler.get_stats()["agents"]["strategic"]
+    assert stats["lingering"] == 0
+    assert stats["queue_wait_max"] >= 0.04
+
+@pytest.mark.asyncio
+async def test_run_in_thread_preserves_contextvars(scheduler):
+    var = contextvars.ContextVar("var")
+    var.set("caller")
+    assert await scheduler.run_in_thread(var.get) == "caller"
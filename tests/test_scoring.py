@@ -0,0 +1,125 @@
+import numpy as np
+import pytest
+
+from scoring.engine import FEATURES, RiskScorer, confidence_level, format_scores, level_value, risk_level
+from tools import comprehensive_tools
+from tools.results import STRUCTURED_TOOLS, ToolResult
+
+def output(tool: str, source: str = "test_source", status: str = "ok", **metrics):
+    return ToolResult(tool, "Acme", status=status, source=source, metrics=metrics).to_dict()
+
+@pytest.fixture
+def scorer():
+    return RiskScorer(category_weights={}, feature_weights={})
+
+def test_level_value_maps_ratings_numbers_and_flags():
+    assert level_value("Low") == 2.0
+    assert level_value("unknown rating") is None
+    assert level_value(True) == 1.0
+    assert level_value(3) == 3.0
+    assert level_value(None) is None
+
+def test_risk_and_confidence_levels():
+    assert risk_level(np.nan) == "NO DATA"
+    assert risk_level(2.9) == "LOW"
+    assert risk_level(9.0) == "CRITICAL"
+    assert confidence_level(0.8) == "HIGH"
+    assert confidence_level(0.2) == "LOW"
+
+def test_extract_maps_metrics_onto_features(scorer):
+    row = scorer.extract({
+        "check_sanctions_ofac": output("check_sanctions_ofac", matches=1),
+        "get_stock_price": output("get_stock_price", price=95.0, previous_close=100.0),
+    })
+    names = [f.name for f in scorer.features]
+    assert row[names.index("sanctions_matches")] == 1
+    assert row[names.index("daily_move_pct")] == pytest.approx(5.0)
+    assert np.isnan(row[names.index("critical_cves")])
+
+def test_failed_and_placeholder_outputs_count_as_missing(scorer):
+    row = scorer.extract({
+        "check_sanctions_ofac": output("check_sanctions_ofac", status="unavailable", matches=3),
+        "check_aml_compliance": output("check_aml_compliance", source=None, compliant=True),
+    })
+    assert np.isnan(row).all()
+
+def test_placeholder_tools_do_not_raise_coverage(scorer):
+    measured = {"check_sanctions_ofac": output("check_sanctions_ofac", matches=0)}
+    placeholders = {
+        "check_aml_compliance": output("check_aml_compliance", source=None, compliant=True),
+        "get_esg_score": output("get_esg_score", source=None, environmental=72, social=78, governance=75),
+    }
+    assert scorer.score({**measured, **placeholders}) == scorer.score(measured)
+
+def test_category_score_is_weighted_mean_of_feature_risks(scorer):
+    # one sanctions match: 1/3 of the way to 10, weight 3; no PEP match: 0, weight 2
+    scores = scorer.score({
+        "check_sanctions_ofac": output("check_sanctions_ofac", matches=1),
+        "check_pep_status": output("check_pep_status", pep_match=0),
+    })
+    compliance = scores["categories"]["compliance"]
+    assert compliance["score"] == pytest.approx((10 / 3 * 3 + 0 * 2) / 5, abs=0.01)
+    low, high = compliance["ci_95"]
+    assert low <= compliance["score"] <= high
+    assert scores["categories"]["cyber"]["score"] is None
+    assert scores["overall"]["score"] == compliance["score"]
+
+def test_more_coverage_narrows_the_interval(scorer):
+    partial = scorer.score({"check_sanctions_ofac": output("check_sanctions_ofac", matches=0)})
+    fuller = scorer.score({
+        "check_sanctions_ofac": output("check_sanctions_ofac", matches=0),
+        "check_pep_status": output("check_pep_status", pep_match=0),
+        "get_regulatory_violations": output("get_regulatory_violations", active=0, historical=0),
+    })
+    width = lambda s: s["categories"]["compliance"]["ci_95"][1] - s["categories"]["compliance"]["ci_95"][0]
+    assert fuller["categories"]["compliance"]["coverage"] > partial["categories"]["compliance"]["coverage"]
+    assert width(fuller) < width(partial)
+
+def test_values_beyond_the_range_are_clipped(scorer):
+    scores = scorer.score({"check_sanctions_ofac": output("check_sanctions_ofac", matches=40)})
+    assert scores["features"] == [
+        {"name": "sanctions_matches", "category": "compliance", "tool": "check_sanctions_ofac", "risk": 10.0}
+    ]
+
+def test_score_matrix_scores_many_rows_at_once(scorer):
+    portfolio = [
+        {"check_sanctions_ofac": output("check_sanctions_ofac", matches=0)},
+        {"check_sanctions_ofac": output("check_sanctions_ofac", matches=3)},
+        {},
+    ]
+    matrix = scorer.score_matrix(scorer.extract_many(portfolio))
+    assert matrix.overall_score.shape == (3,)
+    assert matrix.overall_score[0] == 0.0
+    assert matrix.overall_score[1] == 10.0
+    assert np.isnan(matrix.overall_score[2])
+
+def test_weights_change_the_overall_score(scorer):
+    tool_outputs = {
+        "check_sanctions_ofac": output("check_sanctions_ofac", matches=3),
+        "check_cve_vulnerabilities": output("check_cve_vulnerabilities", critical=0, high=0),
+    }
+    base = scorer.score(tool_outputs)["overall"]["score"]
+    reweighted = scorer.with_weights(category_weights={"compliance": 3.0}).score(tool_outputs)["overall"]["score"]
+    assert reweighted > base
+
+def test_format_scores_reports_missing_categories(scorer):
+    lines = format_scores(scorer.score({}))
+    assert "OVERALL ENTERPRISE RISK SCORE: N/A (no data)" in lines
+    assert any("N/A (no data)" in line for line in lines if line.strip().startswith("ESG"))
+
+def test_every_feature_reads_a_known_category():
+    assert {f.category for f in FEATURES} <= set(RiskScorer().categories)
+
+@pytest.mark.asyncio
+async def test_news_sentiment_is_measured_article_tone(monkeypatch):
+    async def fetch(url, params=None, api_name="generic", **kwargs):
+        return {"status": "success", "data": {"tonechart": [{"bin": -4, "count": 3}, {"bin": 2, "count": 1}]}}
+
+    monkeypatch.setattr(comprehensive_tools.api_manager, "fetch", fetch)
+    result = await STRUCTURED_TOOLS["get_news_sentiment"]("Acme")
+    assert result.source == "gdelt"
+    assert result.metrics["articles"] == 4
+    assert result.metrics["tone"] == pytest.approx(-2.5)
+
+    risk = RiskScorer().score({"get_news_sentiment": result.to_dict()})["features"][0]["risk"]
+    assert risk == pytest.approx(6.88, abs=0.01)
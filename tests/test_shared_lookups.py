@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from tools.results import ToolResult
+from tools.shared_lookups import LookupScope, activate_scope, shared_lookup
+
+class Upstream:
+    """Answers with the queued outcomes in turn: a ToolResult status or an exception"""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    async def __call__(self, country: str) -> ToolResult:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        outcome = self.outcomes.pop(0) if self.outcomes else "ok"
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return ToolResult("get_gdp_growth", country, status=outcome)
+
+def lookup(upstream: Upstream):
+    @shared_lookup
+    async def get_gdp_growth(country: str) -> ToolResult:
+        return await upstream(country)
+    return get_gdp_growth
+
+async def in_scope(scope: LookupScope, coro_fn):
+    # like a batch: the scope is activated in a task and inherited by its children
+    async def run():
+        activate_scope(scope)
+        return await coro_fn()
+    return await asyncio.ensure_future(run())
+
+@pytest.mark.asyncio
+async def test_calls_outside_a_scope_pass_through():
+    upstream = Upstream()
+    get_gdp_growth = lookup(upstream)
+    await get_gdp_growth("US")
+    await get_gdp_growth("US")
+    assert upstream.calls == 2
+
+@pytest.mark.asyncio
+async def test_concurrent_and_later_calls_share_one_lookup():
+    upstream = Upstream()
+    get_gdp_growth = lookup(upstream)
+    scope = LookupScope()
+
+    async def batch():
+        results = await asyncio.gather(*(get_gdp_growth(c) for c in ["US", " us", "US", "DE"]))
+        results.append(await get_gdp_growth("us"))
+        return results
+
+    results = await in_scope(scope, batch)
+    assert upstream.calls == 2
+    assert all(r.ok for r in results)
+    assert scope.get_stats() == {"computed": 2, "reused": 3}
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("failure", [ConnectionError("blip"), "unavailable", "error"])
+async def test_failed_lookup_is_retried_by_the_next_call(failure):
+    upstream = Upstream(failure)
+    get_gdp_growth = lookup(upstream)
+    scope = LookupScope()
+
+    async def batch():
+        try:
+            first = await get_gdp_growth("US")
+        except ConnectionError:
+            first = None
+        return first, await get_gdp_growth("US"), await get_gdp_growth("US")
+
+    first, second, third = await in_scope(scope, batch)
+    assert first is None or not first.ok
+    assert second.ok and third.ok
+    assert upstream.calls == 2
+
+@pytest.mark.asyncio
+async def test_waiters_on_a_failed_lookup_share_the_failure():
+    upstream = Upstream(ConnectionError("blip"))
+    get_gdp_growth = lookup(upstream)
+
+    async def batch():
+        return await asyncio.gather(get_gdp_growth("US"), get_gdp_growth("US"), return_exceptions=True)
+
+    results = await in_scope(LookupScope(), batch)
+    assert all(isinstance(r, ConnectionError) for r in results)
+    assert upstream.calls == 1
+
+@pytest.mark.asyncio
+async def test_no_data_is_an_answer_and_stays_shared():
+    upstream = Upstream("no_data")
+    get_gdp_growth = lookup(upstream)
+
+    async def batch():
+        return await get_gdp_growth("XK"), await get_gdp_growth("XK")
+
+    first, second = await in_scope(LookupScope(), batch)
+    assert first.status == second.status == "no_data"
+    assert upstream.calls == 1
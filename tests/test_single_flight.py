@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+URL = "https://api.example.com/lookup"
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_fetches_share_one_upstream_call(api_manager, fake_http):
+    fake_http.delay = 0.05
+    results = await asyncio.gather(*(
+        api_manager.fetch(URL, params={"q": "acme"}, api_name="example") for _ in range(10)
+    ))
+
+    assert len(fake_http.calls) == 1
+    assert all(result == results[0] for result in results)
+    stats = api_manager.get_cache_stats()["apis"]["example"]
+    assert stats["coalesced"] == 9
+    assert stats["upstream_calls"] == 1
+    assert not api_manager._inflight
+
+@pytest.mark.asyncio
+async def test_different_params_are_not_coalesced(api_manager, fake_http):
+    fake_http.delay = 0.01
+    await asyncio.gather(
+        api_manager.fetch(URL, params={"q": "acme"}, api_name="example"),
+        api_manager.fetch(URL, params={"q": "beta"}, api_name="example"),
+    )
+    assert len(fake_http.calls) == 2
+
+@pytest.mark.asyncio
+async def test_later_fetch_is_served_from_cache(api_manager, fake_http):
+    first = await api_manager.fetch(URL, params={"q": "acme"}, api_name="example")
+    second = await api_manager.fetch(URL, params={"q": "acme"}, api_name="example")
+
+    assert len(fake_http.calls) == 1
+    assert first["cached"] is False
+    assert second["cached"] is True
+    assert second["data"] == first["data"]
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_shared_request(api_manager, fake_http):
+    fake_http.delay = 0.05
+    leader = asyncio.create_task(api_manager.fetch(URL, api_name="example"))
+    await asyncio.sleep(0.01)
+    follower = asyncio.create_task(api_manager.fetch(URL, api_name="example"))
+    await asyncio.sleep(0.01)
+    leader.cancel()
+
+    result = await follower
+    assert result["status"] == "success"
+    assert len(fake_http.calls) == 1
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_cached(api_manager, fake_http):
+    fake_http.status = 404
+    result = await api_manager.fetch(URL, api_name="example")
+    assert result["status"] == "failed"
+
+    fake_http.status = 200
+    result = await api_manager.fetch(URL, api_name="example")
+    assert result["status"] == "success"
+    assert len(fake_http.calls) == 2
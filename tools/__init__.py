@@ -1,4 +1,16 @@
-from .api_manager import api_manager
-from .comprehensive_tools import get_all_tools
+import importlib
 
-__all__ = ["api_manager", "get_all_tools"]
\ No newline at end of file
+# Resolved on first access so importing tools.cache or tools.results does
+# not load every tool, the datastores and pandas
+_EXPORTS = {
+    "api_manager": "tools.api_manager",
+    "get_all_tools": "tools.comprehensive_tools",
+    "ToolResult": "tools.results",
+}
+
+__all__ = ["api_manager", "get_all_tools", "ToolResult"]
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_EXPORTS[name]), name)
@@ -1,68 +1,136 @@
 import asyncio
-import aiohttp
+import contextvars
 import logging
 import hashlib
 import json
+import time
 from typing import Dict, Any, Optional
 from datetime import datetime
-import redis
 from config.settings import settings
+from telemetry import annotate, span
+from telemetry.metrics import API_REQUESTS, API_RETRIES, API_UPSTREAM_SECONDS
+from .cache import TwoTierCache
+from .circuit_breaker import UpstreamGuard
+from .rate_limiter import RateLimiter
+from .http_client import HTTPClient
 
 logger = logging.getLogger(__name__)
 
+def _is_timeout(e: Exception) -> bool:
+    # aiohttp raises asyncio.TimeoutError; httpx its own ReadTimeout/ConnectTimeout/...
+    return isinstance(e, asyncio.TimeoutError) or "Timeout" in type(e).__name__
+
 class APIManager:
-    """Centralized API request manager with caching and retry logic"""
+    """Centralized API request manager with caching and retry logic
+    
+    Each api_name gets a circuit breaker and an adaptive timeout. While an
+    API's circuit is open, fetch answers from cached data kept past its TTL
+    (stale-while-revalidate, refreshed by a background probe once the
+    cooldown allows one) and fails fast without it.
+    """
     
     def __init__(self):
-        try:
-            self.redis_client = redis.from_url(settings.REDIS_URL)
-        except:
-            logger.warning("Redis not available, caching disabled")
-            self.redis_client = None
-        
-        self.rate_limits = {}
-        self.session = None
+        self.cache = TwoTierCache()
+        self.rate_limiter = RateLimiter(redis_client=self.cache.l2)
+        self.http = HTTPClient()
+        self.guard = UpstreamGuard()
+        self._inflight: Dict[str, asyncio.Task] = {}
     
     async def init_session(self):
-        """Initialize aiohttp session"""
-        if not self.session:
-            self.session = aiohttp.ClientSession()
+        """Start the pooled HTTP client"""
+        await self.http.start()
     
     async def close_session(self):
-        """Close aiohttp session"""
-        if self.session:
-            await self.session.close()
+        """Close the HTTP pool and cache connections"""
+        await self.http.close()
+        await self.cache.close()
     
     def _get_cache_key(self, url: str, params: Dict = None) -> str:
         """Generate cache key"""
         key_data = f"{url}:{json.dumps(params or {}, sort_keys=True)}"
         return hashlib.md5(key_data.encode()).hexdigest()
     
-    def _get_from_cache(self, cache_key: str) -> Optional[Dict]:
-        """Get from cache"""
-        if not self.redis_client:
-            return None
-        
-        try:
-            cached = self.redis_client.get(cache_key)
-            if cached:
-                return json.loads(cached)
-        except Exception as e:
-            logger.warning(f"Cache retrieval error: {e}")
-        
+    async def _get_from_cache(self, cache_key: str, api_name: str = "generic") -> Optional[Dict]:
+        """Get from cache (L1 in-process, then L2 Redis)"""
+        cached = await self.cache.get(cache_key, api_name)
+        if cached:
+            return {**cached, "cached": True}
         return None
     
-    def _save_to_cache(self, cache_key: str, data: Dict, ttl: int = None):
+    async def _save_to_cache(self, cache_key: str, data: Dict, ttl: int = None, api_name: str = "generic"):
         """Save to cache"""
-        if not self.redis_client:
-            return
-        
         try:
-            ttl = ttl or settings.CACHE_TTL
-            self.redis_client.setex(cache_key, ttl, json.dumps(data))
+            await self.cache.set(cache_key, data, api_name, ttl)
         except Exception as e:
             logger.warning(f"Cache save error: {e}")
     
+    @staticmethod
+    def _parse_retry_after(value: Optional[str]) -> float:
+        """Seconds to wait from a Retry-After header, bounded by API_RETRY_AFTER_MAX"""
+        try:
+            delay = float(value)
+        except (TypeError, ValueError):
+            delay = 1.0
+        return min(max(delay, 0.0), settings.API_RETRY_AFTER_MAX)
+    
+    @staticmethod
+    def _upstream_url(url: str) -> str:
+        """url with its origin rewritten per API_UPSTREAM_OVERRIDES"""
+        for origin, base in settings.API_UPSTREAM_OVERRIDES.items():
+            if url.startswith(origin):
+                return base + url[len(origin):]
+        return url
+    
+    def get_rate_limit_stats(self) -> Dict[str, Any]:
+        """Throttling and concurrency counters per api_name"""
+        return self.rate_limiter.get_stats()
+    
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """HTTP connection pool utilization"""
+        return self.http.get_stats()
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Cache and request-coalescing counters per api_name"""
+        return self.cache.get_stats()
+    
+    def get_breaker_stats(self) -> Dict[str, Any]:
+        """Circuit state, failure counters and current timeout per api_name"""
+        return self.guard.get_stats()
+    
+    async def _get_stale(self, cache_key: str, api_name: str) -> Optional[Dict]:
+        """A cached response kept past its TTL, marked stale"""
+        stale = await self.cache.get_stale(cache_key, api_name)
+        if stale is None:
+            return None
+        data, age = stale
+        self.guard.breaker(api_name).stats.stale_served += 1
+        return {**data, "cached": True, "stale": True, "stale_seconds": round(age, 1)}
+    
+    @staticmethod
+    def _failed(url: str, error: str, **extra) -> Dict[str, Any]:
+        return {
+            "status": "failed",
+            "error": error,
+            "url": url,
+            "cached": False,
+            "timestamp": datetime.now().isoformat(),
+            **extra
+        }
+    
+    def _start_request(self, cache_key: str, *args, background: bool = False) -> asyncio.Task:
+        """Run _request as the single in-flight call for cache_key"""
+        # In the foreground the task inherits the api.fetch span as current, so
+        # _request annotates it; a background refresh outlives that span, so it
+        # is created from an empty context (create_task(context=) is 3.11+)
+        loop = asyncio.get_running_loop()
+        if background:
+            task = contextvars.Context().run(loop.create_task, self._request(*args))
+        else:
+            task = loop.create_task(self._request(*args))
+        self._inflight[cache_key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(cache_key, None))
+        return task
+    
     async def fetch(
         self,
         url: str,
@@ -78,78 +146,154 @@ class APIManager:
         
         cache_key = self._get_cache_key(url, params or json_data)
         
-        if use_cache:
-            cached_data = self._get_from_cache(cache_key)
-            if cached_data:
-                logger.info(f"Cache HIT: {api_name}")
-                return cached_data
-        
+        with span("api.fetch", {"api.name": api_name, "http.method": method.upper()}) as fetch_span:
+            if use_cache:
+                cached_data = await self._get_from_cache(cache_key, api_name)
+                if cached_data:
+                    logger.debug(f"Cache HIT: {api_name}")
+                    API_REQUESTS.labels(api_name, "hit").inc()
+                    fetch_span.set("api.cache", "hit")
+                    return cached_data
+            
+            request = (url, method, params, headers, json_data, api_name, cache_key, use_cache, cache_ttl)
+            breaker = self.guard.breaker(api_name)
+            inflight = self._inflight.get(cache_key)
+            
+            if not breaker.closed and use_cache:
+                stale = await self._get_stale(cache_key, api_name)
+                if stale is not None:
+                    if inflight is None and breaker.available():
+                        self._start_request(cache_key, *request, background=True)
+                    API_REQUESTS.labels(api_name, "stale").inc()
+                    fetch_span.set("api.cache", "stale")
+                    return stale
+            
+            if inflight is None and not breaker.available():
+                breaker.stats.rejected += 1
+                API_REQUESTS.labels(api_name, "rejected").inc()
+                fetch_span.set("api.cache", "rejected")
+                return self._failed(url, f"Circuit open for {api_name}", circuit_open=True)
+            
+            # Single-flight: concurrent identical requests share one upstream call
+            if inflight is not None:
+                self.cache.record_coalesced(api_name)
+                logger.debug(f"Coalesced in-flight request: {api_name}")
+                API_REQUESTS.labels(api_name, "coalesced").inc()
+                fetch_span.set("api.cache", "coalesced")
+                result = await asyncio.shield(inflight)
+            else:
+                API_REQUESTS.labels(api_name, "miss").inc()
+                fetch_span.set("api.cache", "miss")
+                result = await asyncio.shield(self._start_request(cache_key, *request))
+            
+            # Stale-if-error: the upstream is down or throttling (not "no such record"),
+            # so older data beats none
+            if result["status"] == "failed" and use_cache and result.get("status_code") not in range(400, 429):
+                stale = await self._get_stale(cache_key, api_name)
+                if stale is not None:
+                    fetch_span.set("api.cache", "stale")
+                    result = stale
+            fetch_span.set("api.status", result["status"])
+            return result
+    
+    async def _request(
+        self,
+        url: str,
+        method: str,
+        params: Optional[Dict],
+        headers: Optional[Dict],
+        json_data: Optional[Dict],
+        api_name: str,
+        cache_key: str,
+        use_cache: bool,
+        cache_ttl: Optional[int]
+    ) -> Dict[str, Any]:
+        """Issue the upstream request with retries, within the API's circuit breaker"""
         await self.init_session()
+        self.cache.record_upstream(api_name)
+        breaker = self.guard.breaker(api_name)
+        latency = self.guard.timeout(api_name)
+        started = time.perf_counter()
         
-        headers = headers or {}
-        headers.setdefault("User-Agent", "EnterpriseRiskAssessment/3.0")
+        success_codes = [200] if method.upper() == "GET" else [200, 201]
+        attempts, status_code = 0, None
         
         for attempt in range(settings.API_RETRY_ATTEMPTS):
+            claim = breaker.allow()
+            if not claim:
+                break
+            attempts += 1
+            retry_after = None
+            timeout = latency.timeout
+            if attempt:
+                API_RETRIES.labels(api_name).inc()
             try:
-                if method.upper() == "GET":
-                    async with self.session.get(
-                        url,
+                async with self.rate_limiter.limit(api_name):
+                    sent = time.perf_counter()
+                    response = await self.http.request(
+                        method.upper(),
+                        self._upstream_url(url),
                         params=params,
+                        json_data=json_data if method.upper() == "POST" else None,
                         headers=headers,
-                        timeout=aiohttp.ClientTimeout(total=settings.API_TIMEOUT)
-                    ) as response:
-                        if response.status == 200:
-                            data = await response.json()
-                            result = {
-                                "status": "success",
-                                "data": data,
-                                "cached": False,
-                                "timestamp": datetime.now().isoformat()
-                            }
-                            
-                            if use_cache:
-                                self._save_to_cache(cache_key, result, cache_ttl)
-                            
-                            return result
+                        timeout=timeout
+                    )
+            except asyncio.CancelledError:
+                breaker.release(claim)
+                raise
+            except Exception as e:
+                if _is_timeout(e):
+                    # censored at the timeout, so a slower upstream widens it again
+                    latency.observe(timeout)
+                    logger.warning(f"Timeout on {api_name} after {timeout:.1f}s (attempt {attempt + 1})")
+                else:
+                    logger.error(f"Error on {api_name}: {str(e)}")
+                breaker.record(False, claim)
+            else:
+                latency.observe(time.perf_counter() - sent)
+                status_code = response.status
+                breaker.record(response.status < 500, claim)
                 
-                elif method.upper() == "POST":
-                    async with self.session.post(
-                        url,
-                        json=json_data,
-                        params=params,
-                        headers=headers,
-                        timeout=aiohttp.ClientTimeout(total=settings.API_TIMEOUT)
-                    ) as response:
-                        if response.status in [200, 201]:
-                            data = await response.json()
-                            result = {
-                                "status": "success",
-                                "data": data,
-                                "cached": False,
-                                "timestamp": datetime.now().isoformat()
-                            }
-                            
-                            if use_cache:
-                                self._save_to_cache(cache_key, result, cache_ttl)
-                            
-                            return result
-            
-            except asyncio.TimeoutError:
-                logger.warning(f"Timeout on {api_name} (attempt {attempt + 1})")
-                if attempt < settings.API_RETRY_ATTEMPTS - 1:
-                    await asyncio.sleep(2 ** attempt)
+                if response.status in success_codes:
+                    try:
+                        result = {
+                            "status": "success",
+                            "data": response.json(),
+                            "cached": False,
+                            "timestamp": datetime.now().isoformat()
+                        }
+                    except ValueError as e:
+                        logger.error(f"Invalid JSON from {api_name}: {e}")
+                    else:
+                        if use_cache:
+                            await self._save_to_cache(cache_key, result, cache_ttl, api_name)
+                        
+                        API_UPSTREAM_SECONDS.labels(api_name, "success").observe(time.perf_counter() - started)
+                        annotate(api__retries=attempt, http__status_code=response.status)
+                        return result
+                
+                elif response.status == 429:
+                    retry_after = self._parse_retry_after(response.headers.get("Retry-After"))
+                    logger.warning(f"Rate limited by {api_name}, retry after {retry_after}s")
+                elif response.status < 500:
+                    logger.warning(f"HTTP {response.status} from {api_name}, not retrying")
+                    break
+                else:
+                    logger.warning(f"HTTP {response.status} from {api_name} (attempt {attempt + 1})")
             
-            except Exception as e:
-                logger.error(f"Error on {api_name}: {str(e)}")
-                if attempt < settings.API_RETRY_ATTEMPTS - 1:
-                    await asyncio.sleep(2 ** attempt)
+            # A tripped (or failed half-open) circuit ends the retries: no sleeping on a dead API
+            if not breaker.closed:
+                break
+            if attempt < settings.API_RETRY_ATTEMPTS - 1:
+                await asyncio.sleep(retry_after if retry_after is not None else 2 ** attempt)
         
-        return {
-            "status": "failed",
-            "error": f"Failed after {settings.API_RETRY_ATTEMPTS} attempts",
-            "url": url,
-            "cached": False,
-            "timestamp": datetime.now().isoformat()
-        }
+        if not attempts:
+            return self._failed(url, f"Circuit open for {api_name}", circuit_open=True)
+        API_UPSTREAM_SECONDS.labels(api_name, "failed").observe(time.perf_counter() - started)
+        annotate(api__retries=attempts - 1, http__status_code=status_code)
+        return self._failed(
+            url, f"Failed after {attempts} attempts",
+            status_code=status_code, circuit_open=not breaker.closed
+        )
 
 api_manager = APIManager()
\ No newline at end of file
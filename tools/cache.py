@@ -0,0 +1,226 @@
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, Optional, Tuple
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class CacheStats:
+    """Per-API cache counters"""
+    l1_hits: int = 0
+    l2_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    upstream_calls: int = 0
+    coalesced: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.l1_hits + self.l2_hits + self.misses
+        return (self.l1_hits + self.l2_hits) / lookups if lookups else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["hit_ratio"] = round(self.hit_ratio, 4)
+        return data
+
+class LRUCache:
+    """Bounded in-process LRU cache with per-entry TTL
+
+    Entries set with stale_ttl outlive their TTL by that long, for
+    get_stale() only.
+    """
+
+    def __init__(self, max_entries: int, default_ttl: int):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        # key -> (expires_at, stale_until, api_name, value)
+        self._entries: "OrderedDict[str, Tuple[float, float, str, Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, stale_until, _, value = entry
+        now = time.monotonic()
+        if expires_at < now:
+            if stale_until < now:
+                del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def get_stale(self, key: str) -> Optional[Tuple[Any, float]]:
+        """(value, seconds past its TTL) even if expired, within the stale window"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, stale_until, _, value = entry
+        now = time.monotonic()
+        if stale_until < now:
+            del self._entries[key]
+            return None
+        return value, max(0.0, now - expires_at)
+
+    def set(self, key: str, value: Any, api_name: str, ttl: Optional[int] = None,
+            stale_ttl: int = 0) -> Optional[str]:
+        """Store value; returns the api_name of an evicted entry, if any"""
+        ttl = min(ttl or self.default_ttl, self.default_ttl)
+        expires_at = time.monotonic() + ttl
+        self._entries[key] = (expires_at, expires_at + stale_ttl, api_name, value)
+        self._entries.move_to_end(key)
+
+        if len(self._entries) > self.max_entries:
+            _, (_, _, evicted_api, _) = self._entries.popitem(last=False)
+            return evicted_api
+        return None
+
+    def clear(self):
+        self._entries.clear()
+
+class TwoTierCache:
+    """In-process LRU (L1) in front of an async Redis client (L2)
+
+    Entries are kept API_STALE_TTL past their TTL so get_stale() can serve
+    them while an upstream is down. L2 stores {"expires_at", "value"}
+    envelopes and lets Redis expire them after TTL + API_STALE_TTL.
+    """
+
+    def __init__(self):
+        self.l1 = LRUCache(settings.L1_CACHE_MAX_ENTRIES, settings.L1_CACHE_TTL)
+        self.stats: Dict[str, CacheStats] = {}
+        self._l2_retry_at = 0.0
+
+        if aioredis is None:
+            logger.warning("redis.asyncio not available, L2 cache disabled")
+            self.l2 = None
+        else:
+            try:
+                self.l2 = aioredis.from_url(
+                    settings.REDIS_URL,
+                    socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                    socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT
+                )
+            except Exception as e:
+                logger.warning(f"Redis not available, L2 cache disabled: {e}")
+                self.l2 = None
+
+    def _stats(self, api_name: str) -> CacheStats:
+        if api_name not in self.stats:
+            self.stats[api_name] = CacheStats()
+        return self.stats[api_name]
+
+    def _l2_available(self) -> bool:
+        return self.l2 is not None and time.monotonic() >= self._l2_retry_at
+
+    def _l2_failed(self, e: Exception):
+        """Back off from L2 so an unreachable Redis doesn't cost a timeout per call"""
+        if time.monotonic() >= self._l2_retry_at:
+            logger.warning(f"L2 cache error, bypassing for {settings.REDIS_RETRY_BACKOFF}s: {e}")
+        self._l2_retry_at = time.monotonic() + settings.REDIS_RETRY_BACKOFF
+
+    async def get(self, key: str, api_name: str = "generic") -> Optional[Dict]:
+        stats = self._stats(api_name)
+
+        value = self.l1.get(key)
+        if value is not None:
+            stats.l1_hits += 1
+            return value
+
+        entry = await self._get_l2(key)
+        if entry is not None:
+            value, ttl_left = entry
+            if ttl_left > 0:
+                stats.l2_hits += 1
+                self._set_l1(key, value, api_name, int(ttl_left) or 1)
+                return value
+
+        stats.misses += 1
+        return None
+
+    async def get_stale(self, key: str, api_name: str = "generic") -> Optional[Tuple[Dict, float]]:
+        """(value, seconds past its TTL) for an entry kept in the stale window"""
+        stale = self.l1.get_stale(key)
+        if stale is not None:
+            return stale
+        entry = await self._get_l2(key)
+        if entry is not None:
+            value, ttl_left = entry
+            return value, max(0.0, -ttl_left)
+        return None
+
+    async def _get_l2(self, key: str) -> Optional[Tuple[Dict, float]]:
+        """(value, seconds of TTL left, negative once stale) from L2"""
+        if not self._l2_available():
+            return None
+        try:
+            cached = await self.l2.get(key)
+        except Exception as e:
+            self._l2_failed(e)
+            return None
+        if not cached:
+            return None
+        try:
+            entry = json.loads(cached)
+        except ValueError as e:
+            logger.warning(f"Ignoring unreadable L2 cache entry {key}: {e}")
+            return None
+        if not isinstance(entry, dict):
+            # a foreign value under our key: not something we wrote
+            return None
+        if set(entry) != {"expires_at", "value"}:
+            # written before envelopes: Redis expires it at its TTL
+            return entry, float(settings.L1_CACHE_TTL)
+        return entry["value"], entry["expires_at"] - time.time()
+
+    async def set(self, key: str, value: Dict, api_name: str = "generic", ttl: Optional[int] = None):
+        ttl = ttl or settings.CACHE_TTL
+        self._set_l1(key, value, api_name, ttl)
+
+        if self._l2_available():
+            try:
+                envelope = {"expires_at": time.time() + ttl, "value": value}
+                await self.l2.setex(key, ttl + settings.API_STALE_TTL, json.dumps(envelope))
+            except Exception as e:
+                self._l2_failed(e)
+
+    def _set_l1(self, key: str, value: Dict, api_name: str, ttl: Optional[int] = None):
+        evicted_api = self.l1.set(key, value, api_name, ttl, stale_ttl=settings.API_STALE_TTL)
+        if evicted_api is not None:
+            self._stats(evicted_api).evictions += 1
+
+    def record_upstream(self, api_name: str):
+        self._stats(api_name).upstream_calls += 1
+
+    def record_coalesced(self, api_name: str):
+        """Count a request that joined an in-flight call instead of going upstream"""
+        self._stats(api_name).coalesced += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "l1_entries": len(self.l1),
+            "l1_max_entries": self.l1.max_entries,
+            "l2_enabled": self.l2 is not None,
+            "upstream_calls_saved": sum(s.coalesced for s in self.stats.values()),
+            "apis": {name: s.to_dict() for name, s in self.stats.items()}
+        }
+
+    async def close(self):
+        if self.l2 is not None:
+            try:
+                await self.l2.aclose()
+            except Exception as e:
+                logger.warning(f"Error closing Redis client: {e}")
@@ -0,0 +1,172 @@
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, Optional
+
+from config.settings import settings
+from telemetry.metrics import API_CIRCUIT_OPENED
+
+logger = logging.getLogger(__name__)
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+# What allow() granted: an ordinary attempt, or the single half-open probe
+ATTEMPT, PROBE = "attempt", "probe"
+
+@dataclass
+class BreakerStats:
+    """Per-API circuit breaker counters"""
+    successes: int = 0
+    failures: int = 0
+    opened: int = 0
+    rejected: int = 0
+    stale_served: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+class CircuitBreaker:
+    """Closed -> open after API_BREAKER_FAILURES consecutive failed attempts
+
+    While open, attempts are rejected without touching the network. After
+    the cooldown one probe is let through (half-open): success closes the
+    circuit, failure re-opens it with the cooldown doubled, up to
+    API_BREAKER_COOLDOWN_MAX, so a long outage costs one probe per cooldown.
+    Responses below 500 (429 and 404 included) mean the upstream is up.
+
+    Only the probe moves the circuit out of half-open. Attempts sent while
+    it was still closed can finish later; they are counted but decide
+    nothing, so a straggler can neither close the circuit nor free the
+    probe for a second caller.
+    """
+
+    def __init__(self, api_name: str):
+        self.api_name = api_name
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.cooldown = settings.API_BREAKER_COOLDOWN
+        self.retry_at = 0.0
+        self.probing = False
+        self.stats = BreakerStats()
+
+    @property
+    def closed(self) -> bool:
+        return self.state == CLOSED
+
+    def available(self) -> bool:
+        """Whether allow() would let a request through, without claiming the probe"""
+        if self.state == CLOSED:
+            return True
+        return not self.probing and time.monotonic() >= self.retry_at
+
+    def allow(self) -> Optional[str]:
+        """Claim one attempt: ATTEMPT, PROBE, or None when rejected
+
+        The caller must hand the claim back to record() or release().
+        """
+        if self.state == CLOSED:
+            return ATTEMPT
+        if not self.available():
+            self.stats.rejected += 1
+            return None
+        self.state = HALF_OPEN
+        self.probing = True
+        return PROBE
+
+    def record(self, healthy: bool, claim: str = ATTEMPT):
+        if claim == PROBE:
+            self.probing = False
+        elif self.state != CLOSED:
+            # sent before the circuit opened: counted, but the probe decides
+            if healthy:
+                self.stats.successes += 1
+            else:
+                self.stats.failures += 1
+            return
+
+        if healthy:
+            self.stats.successes += 1
+            if self.state != CLOSED:
+                logger.info(f"Circuit for {self.api_name} closed")
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            self.cooldown = settings.API_BREAKER_COOLDOWN
+            return
+
+        self.stats.failures += 1
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN:
+            self.cooldown = min(self.cooldown * 2, settings.API_BREAKER_COOLDOWN_MAX)
+            self._open()
+        elif self.state == CLOSED and self.consecutive_failures >= settings.API_BREAKER_FAILURES:
+            self._open()
+
+    def release(self, claim: str = ATTEMPT):
+        """Give back a claimed attempt that never completed (cancelled)"""
+        if claim == PROBE:
+            self.probing = False
+
+    def _open(self):
+        self.state = OPEN
+        self.retry_at = time.monotonic() + self.cooldown
+        self.stats.opened += 1
+        API_CIRCUIT_OPENED.labels(self.api_name).inc()
+        logger.warning(f"Circuit for {self.api_name} open for {self.cooldown:g}s "
+                       f"after {self.consecutive_failures} consecutive failures")
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {"state": self.state, "consecutive_failures": self.consecutive_failures, **self.stats.to_dict()}
+        if self.state != CLOSED:
+            data["retry_in_seconds"] = round(max(0.0, self.retry_at - time.monotonic()), 1)
+        return data
+
+class AdaptiveTimeout:
+    """Request timeout from recent latencies instead of a flat API_TIMEOUT
+
+    API_TIMEOUT_MULTIPLIER x the API_TIMEOUT_PERCENTILE latency of the last
+    API_TIMEOUT_WINDOW attempts, clamped to [API_TIMEOUT_MIN, API_TIMEOUT].
+    A timed-out attempt counts as a sample at the timeout, so the timeout
+    widens again if the upstream gets slower rather than failing forever.
+    """
+
+    def __init__(self):
+        self.samples = deque(maxlen=settings.API_TIMEOUT_WINDOW)
+        self._timeout: Optional[float] = None
+
+    def observe(self, seconds: float):
+        self.samples.append(seconds)
+        self._timeout = None
+
+    @property
+    def timeout(self) -> float:
+        if self._timeout is None:
+            self._timeout = float(settings.API_TIMEOUT)
+            if len(self.samples) >= settings.API_TIMEOUT_MIN_SAMPLES:
+                ordered = sorted(self.samples)
+                latency = ordered[int(settings.API_TIMEOUT_PERCENTILE * (len(ordered) - 1))]
+                self._timeout = min(float(settings.API_TIMEOUT),
+                                    max(settings.API_TIMEOUT_MIN, latency * settings.API_TIMEOUT_MULTIPLIER))
+        return self._timeout
+
+class UpstreamGuard:
+    """Per-API circuit breakers and adaptive timeouts"""
+
+    def __init__(self):
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.timeouts: Dict[str, AdaptiveTimeout] = {}
+
+    def breaker(self, api_name: str) -> CircuitBreaker:
+        if api_name not in self.breakers:
+            self.breakers[api_name] = CircuitBreaker(api_name)
+        return self.breakers[api_name]
+
+    def timeout(self, api_name: str) -> AdaptiveTimeout:
+        if api_name not in self.timeouts:
+            self.timeouts[api_name] = AdaptiveTimeout()
+        return self.timeouts[api_name]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            name: {**breaker.to_dict(), "timeout_seconds": round(self.timeout(name).timeout, 3)}
+            for name, breaker in self.breakers.items()
+        }
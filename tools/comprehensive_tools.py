@@ -1,289 +1,571 @@
-from langchain.tools import tool
-from typing import Optional, List
+from langchain_core.tools import tool
+from typing import Dict, Any, Optional, List
+from config.settings import settings
+from datastores.edgar import (
+    COMPANY_FACTS_API, SUBMISSIONS_API, TICKERS_URL,
+    fact_rows, filing_rows, get_edgar_store, latest_financials
+)
+from datastores.gleif import get_lei_registry
+from datastores.macro import WGI_SOURCE, get_macro_store
+from datastores.sanctions import get_screener
+from scoring import risk_scorer, format_scores
 from .api_manager import api_manager
+from .results import ToolResult, STRUCTURED_TOOLS, invoke_structured, structured_tool
+from .shared_lookups import shared_lookup
+from .tool_inputs import resolve_tool_calls
+import asyncio
 import logging
+import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+# Tools return ToolResult records; @structured_tool renders them as compact
+# text for the LLM and keeps the typed form for invoke_structured().
+
 # CATEGORY 1: COMPANY IDENTITY VERIFICATION
 
 @tool
-async def search_opencorporates(company_name: str, jurisdiction: Optional[str] = None) -> str:
+@structured_tool
+async def search_opencorporates(company_name: str, jurisdiction: Optional[str] = None) -> ToolResult:
     """Search global company registry - OpenCorporates FREE API"""
     url = "https://api.opencorporates.com/v0.4/companies/search"
     params = {"q": company_name, "per_page": 5}
     if jurisdiction:
         params["jurisdiction_code"] = jurisdiction
-    
+
     result = await api_manager.fetch(url, params=params, api_name="opencorporates")
-    
+
     if result["status"] == "success":
         companies = result["data"].get("results", {}).get("companies", [])
         if companies:
-            summary = [f"✓ Found {len(companies)} companies:"]
-            for c in companies[:3]:
-                comp = c.get("company", {})
-                summary.append(f"  • {comp.get('name')} ({comp.get('jurisdiction_code')})")
-                summary.append(f"    Status: {comp.get('company_status')}")
-                summary.append(f"    Founded: {comp.get('incorporation_date', 'N/A')}")
-            return "\n".join(summary)
-        return "No companies found"
-    return f"Error: {result.get('error', 'Unknown')}"
-
-@tool
-async def get_lei_identifier(company_name: str) -> str:
-    """Get Legal Entity Identifier - GLEIF FREE API"""
+            return ToolResult(
+                "search_opencorporates", company_name, source="opencorporates",
+                metrics={"matches": len(companies)},
+                items=[
+                    {
+                        "name": c.get("company", {}).get("name"),
+                        "jurisdiction": c.get("company", {}).get("jurisdiction_code"),
+                        "status": c.get("company", {}).get("company_status"),
+                        "incorporated": c.get("company", {}).get("incorporation_date")
+                    }
+                    for c in companies[:3]
+                ]
+            )
+        return ToolResult("search_opencorporates", company_name, status="no_data", source="opencorporates")
+    return ToolResult("search_opencorporates", company_name, status="error",
+                      source="opencorporates", error=result.get("error", "Unknown"))
+
+@tool
+@structured_tool
+async def get_lei_identifier(company_name: str, country: Optional[str] = None) -> ToolResult:
+    """Get Legal Entity Identifier - local GLEIF golden copy, else GLEIF FREE API"""
+    registry = await get_lei_registry()
+    records = registry.resolve(company_name, country)
+    if records:
+        return ToolResult("get_lei_identifier", company_name, source="gleif_local",
+                          metrics={"records": len(records)},
+                          items=[
+                              {"lei": r["lei"], "name": r["name"], "country": r["country"],
+                               "status": r["entity_status"], "registration": r["registration_status"]}
+                              for r in records[:2]
+                          ])
+
     url = "https://api.gleif.org/api/v1/lei-records"
     params = {"filter[entity.legalName]": company_name, "page[size]": 5}
-    
+
     result = await api_manager.fetch(url, params=params, api_name="gleif")
-    
+
     if result["status"] == "success":
         records = result["data"].get("data", [])
         if records:
-            summary = [f"✓ LEI Records: {len(records)} found"]
-            for rec in records[:2]:
-                attrs = rec.get("attributes", {})
-                entity = attrs.get("entity", {})
-                summary.append(f"  • LEI: {attrs.get('lei')}")
-                summary.append(f"    Name: {entity.get('legalName', {}).get('name')}")
-            return "\n".join(summary)
-        return "No LEI records found"
-    return f"Error: {result.get('error', 'Unknown')}"
-
-@tool
-async def check_business_registry(company_name: str, country: str = "US") -> str:
+            return ToolResult(
+                "get_lei_identifier", company_name, source="gleif",
+                metrics={"records": len(records)},
+                items=[
+                    {
+                        "lei": rec.get("attributes", {}).get("lei"),
+                        "name": rec.get("attributes", {}).get("entity", {}).get("legalName", {}).get("name")
+                    }
+                    for rec in records[:2]
+                ]
+            )
+        return ToolResult("get_lei_identifier", company_name, status="no_data", source="gleif")
+    return ToolResult("get_lei_identifier", company_name, status="error",
+                      source="gleif", error=result.get("error", "Unknown"))
+
+@tool
+@structured_tool
+async def check_business_registry(company_name: str, country: str = "US") -> ToolResult:
     """Check business registry and incorporation status"""
-    summary = [f"Business Registry Check: {company_name}", f"Country: {country}",
-               "Status: Verified", "Legal Structure: Corporation"]
-    return "\n".join(summary)
+    return ToolResult("check_business_registry", company_name, metrics={
+        "country": country, "status": "verified", "legal_structure": "Corporation"
+    })
 
 # CATEGORY 2: FINANCIAL RISK
 
 @tool
-async def get_stock_price(ticker: str) -> str:
+@structured_tool
+async def get_stock_price(ticker: str) -> ToolResult:
     """Real-time stock price via Yahoo Finance - FREE"""
     url = f"https://query1.finance.yahoo.com/v8/finance/chart/{ticker}"
     params = {"interval": "1d", "range": "1mo"}
     result = await api_manager.fetch(url, params=params, api_name="yahoo_finance")
-    
+
     if result["status"] == "success":
         results = result["data"].get("chart", {}).get("result", [])
         if results:
             meta = results[0].get("meta", {})
-            summary = [f"Stock: {ticker}", f"  Price: ${meta.get('regularMarketPrice', 0):.2f}",
-                      f"  Previous: ${meta.get('previousClose', 0):.2f}",
-                      f"  Volume: {meta.get('regularMarketVolume', 0):,}"]
-            return "\n".join(summary)
-    return "Stock data unavailable"
-
-@tool
-async def get_sec_filings(ticker: str, cik: Optional[str] = None) -> str:
-    """SEC EDGAR filings - FREE API"""
-    if not cik:
-        return "CIK required"
-    cik_padded = cik.zfill(10)
-    url = f"https://data.sec.gov/submissions/CIK{cik_padded}.json"
-    result = await api_manager.fetch(url, api_name="sec_edgar")
-    
+            return ToolResult("get_stock_price", ticker, source="yahoo_finance", metrics={
+                "price": meta.get("regularMarketPrice", 0),
+                "previous_close": meta.get("previousClose", 0),
+                "volume": meta.get("regularMarketVolume", 0)
+            })
+    return ToolResult("get_stock_price", ticker, status="unavailable", source="yahoo_finance")
+
+# Filing types worth listing; NT 10-K/NT 10-Q are late-filing notices
+KEY_FORMS = {"10-K", "10-K/A", "10-Q", "8-K", "20-F", "40-F", "NT 10-K", "NT 10-Q"}
+SEC_HEADERS = {"User-Agent": settings.SEC_USER_AGENT}
+
+async def _resolve_cik(ticker: str) -> Optional[str]:
+    """CIK from the local ticker index, else from SEC's company_tickers.json"""
+    cik = (await get_edgar_store()).cik_for(ticker)
+    if cik:
+        return cik
+    result = await api_manager.fetch(TICKERS_URL, headers=SEC_HEADERS, api_name="sec_edgar", cache_ttl=86400)
     if result["status"] == "success":
-        data = result["data"]
-        summary = [f"SEC: {data.get('name')}", f"  CIK: {data.get('cik')}"]
-        return "\n".join(summary)
-    return "SEC data unavailable"
+        for entry in result["data"].values():
+            if entry["ticker"].upper() in (ticker.upper(), ticker.upper().replace(".", "-")):
+                return str(entry["cik_str"])
+    return None
+
+def _filings_result(ticker: str, cik: str, company: dict, filings: pd.DataFrame, source: str) -> ToolResult:
+    filed = pd.to_datetime(filings["filing_date"])
+    recent = filings[filed >= pd.Timestamp.now() - pd.Timedelta(days=365)]
+    forms = recent["form"].astype(str)
+
+    def latest(*types):
+        dates = filings.loc[filings["form"].astype(str).isin(types), "filing_date"]
+        return str(dates.iloc[0]) if len(dates) else None
+
+    key = filings[filings["form"].astype(str).isin(KEY_FORMS)].head(5)
+    return ToolResult("get_sec_filings", ticker, source=source, metrics={
+        "name": company.get("name"),
+        "cik": cik,
+        "industry": company.get("sic_description"),
+        "filings_12m": len(recent),
+        "current_reports_12m": int((forms == "8-K").sum()),
+        "late_filings_12m": int(forms.str.startswith("NT ").sum()),
+        "latest_annual": latest("10-K", "20-F", "40-F"),
+        "latest_quarterly": latest("10-Q"),
+    }, items=[
+        {"form": str(row.form), "filed": str(row.filing_date), "period": str(row.report_date or "") or None,
+         "accession": row.accession}
+        for row in key.itertuples()
+    ])
+
+@tool
+@structured_tool
+async def get_sec_filings(ticker: str, cik: Optional[str] = None) -> ToolResult:
+    """SEC EDGAR filings - local EDGAR store, else FREE API"""
+    cik = cik or await _resolve_cik(ticker)
+    if not cik:
+        return ToolResult("get_sec_filings", ticker, status="no_data", source="sec_edgar", error="No CIK for ticker")
 
-@tool
-async def get_financial_statements(ticker: str) -> str:
-    """Financial statements analysis"""
-    return f"Financial Statements: {ticker}\n  Revenue: $383.2B\n  Net Income: $96.9B"
+    store = await get_edgar_store()
+    filings = await asyncio.to_thread(store.filings, cik)
+    if len(filings):
+        company = await asyncio.to_thread(store.company, cik)
+        return _filings_result(ticker, cik, company or {}, filings, "edgar_local")
+
+    url = SUBMISSIONS_API.format(cik=int(cik))
+    result = await api_manager.fetch(url, headers=SEC_HEADERS, api_name="sec_edgar")
 
-@tool
-async def get_gdp_growth(country: str) -> str:
-    """GDP Growth - World Bank FREE API"""
-    url = f"https://api.worldbank.org/v2/country/{country}/indicator/NY.GDP.MKTP.KD.ZG"
-    params = {"format": "json", "per_page": 5}
-    result = await api_manager.fetch(url, params=params, api_name="worldbank")
-    
     if result["status"] == "success":
         data = result["data"]
-        if len(data) > 1 and data[1]:
-            summary = [f"GDP Growth: {country}"]
-            for rec in data[1][:2]:
-                summary.append(f"  {rec.get('date')}: {rec.get('value', 0):.2f}%")
-            return "\n".join(summary)
-    return "GDP data unavailable"
-
-@tool
-async def get_inflation_rate(country: str) -> str:
-    return f"Inflation: {country}\n  Current: 3.2%"
+        company = {"name": data.get("name"), "sic_description": data.get("sicDescription")}
+        filings = pd.DataFrame(filing_rows(data)).sort_values("filing_date", ascending=False, ignore_index=True)
+        return _filings_result(ticker, cik, company, filings, "sec_edgar")
+    return ToolResult("get_sec_filings", ticker, status="unavailable", source="sec_edgar")
 
 @tool
-async def get_unemployment_rate(country: str) -> str:
-    return f"Unemployment: {country}\n  Current: 4.1%"
+@structured_tool
+async def get_financial_statements(ticker: str) -> ToolResult:
+    """Latest annual financial statement figures from SEC XBRL company facts"""
+    cik = await _resolve_cik(ticker)
+    if not cik:
+        return ToolResult("get_financial_statements", ticker, status="no_data", source="sec_edgar",
+                          error="No CIK for ticker")
+
+    store = await get_edgar_store()
+    facts, source = await asyncio.to_thread(store.facts, cik), "edgar_local"
+    if facts.empty:
+        result = await api_manager.fetch(COMPANY_FACTS_API.format(cik=int(cik)), headers=SEC_HEADERS,
+                                         api_name="sec_edgar")
+        if result["status"] != "success":
+            return ToolResult("get_financial_statements", ticker, status="unavailable", source="sec_edgar")
+        facts, source = pd.DataFrame(fact_rows(result["data"])), "sec_edgar"
+
+    metrics = latest_financials(facts)
+    if not metrics:
+        return ToolResult("get_financial_statements", ticker, status="no_data", source=source)
+    return ToolResult("get_financial_statements", ticker, source=source, metrics=metrics)
+
+async def _world_bank_live(country: str, code: str, limit: int = 5) -> Optional[List[Dict[str, Any]]]:
+    """Recent non-null {year, value} observations from the World Bank API, newest first"""
+    url = f"https://api.worldbank.org/v2/country/{country}/indicator/{code}"
+    params = {"format": "json", "per_page": 10}
+    if code.endswith(".EST"):
+        params["source"] = WGI_SOURCE
+    result = await api_manager.fetch(url, params=params, api_name="worldbank")
+    if result["status"] != "success":
+        return None
+    data = result["data"]
+    records = data[1] if len(data) > 1 and data[1] else []
+    return [{"year": r.get("date"), "value": r["value"]} for r in records if r.get("value") is not None][:limit]
+
+def _as_of(source: str, when) -> str:
+    """World Bank series are annual; FRED dates are period starts"""
+    when = pd.Timestamp(when)
+    return str(when.year) if source == "worldbank" else when.date().isoformat()
+
+async def _macro_rate(tool_name: str, indicator: str, country: str) -> ToolResult:
+    """Latest value of a rate indicator: local macro store, else the World Bank API"""
+    store = await get_macro_store()
+    if store.has(indicator):
+        row = store.latest(indicator, [country]).iloc[0]
+        if pd.isna(row["value"]):
+            return ToolResult(tool_name, country, status="no_data", source="macro_local")
+        return ToolResult(tool_name, country, source=f"{row['source']}_local", metrics={
+            "current_pct": round(float(row["value"]), 2), "as_of": _as_of(row["source"], row["date"])
+        })
+
+    records = await _world_bank_live(country, settings.MACRO_WORLD_BANK_INDICATORS[indicator], limit=1)
+    if records is None:
+        return ToolResult(tool_name, country, status="unavailable", source="worldbank")
+    if not records:
+        return ToolResult(tool_name, country, status="no_data", source="worldbank")
+    return ToolResult(tool_name, country, source="worldbank", metrics={
+        "current_pct": round(records[0]["value"], 2), "as_of": records[0]["year"]
+    })
+
+@tool
+@structured_tool
+@shared_lookup
+async def get_gdp_growth(country: str) -> ToolResult:
+    """Real GDP growth - local macro store, else World Bank FREE API"""
+    store = await get_macro_store()
+    if store.has("gdp_growth"):
+        latest = store.latest("gdp_growth", [country]).iloc[0]
+        if pd.isna(latest["value"]):
+            return ToolResult("get_gdp_growth", country, status="no_data", source="macro_local")
+        # history from the series latest came from (FRED quarterly for the US), not the World Bank's
+        history = store.history("gdp_growth", country, source=latest["source"], limit=2)
+        items = [{"year": _as_of(latest["source"], d), "growth_pct": round(float(v), 2)}
+                 for d, v in zip(history["date"], history["value"])]
+        return ToolResult("get_gdp_growth", country, source=f"{latest['source']}_local", metrics={
+            "latest_pct": round(float(latest["value"]), 2), "as_of": _as_of(latest["source"], latest["date"])
+        }, items=items)
+
+    records = await _world_bank_live(country, settings.MACRO_WORLD_BANK_INDICATORS["gdp_growth"], limit=2)
+    if records is None:
+        return ToolResult("get_gdp_growth", country, status="unavailable", source="worldbank")
+    if not records:
+        return ToolResult("get_gdp_growth", country, status="no_data", source="worldbank")
+    items = [{"year": r["year"], "growth_pct": round(r["value"], 2)} for r in records]
+    return ToolResult("get_gdp_growth", country, source="worldbank",
+                      metrics={"latest_pct": items[0]["growth_pct"], "as_of": items[0]["year"]}, items=items)
+
+@tool
+@structured_tool
+@shared_lookup
+async def get_inflation_rate(country: str) -> ToolResult:
+    """Current consumer price inflation for a country"""
+    return await _macro_rate("get_inflation_rate", "inflation", country)
+
+@tool
+@structured_tool
+@shared_lookup
+async def get_unemployment_rate(country: str) -> ToolResult:
+    """Current unemployment rate for a country"""
+    return await _macro_rate("get_unemployment_rate", "unemployment", country)
 
 # CATEGORY 3: COMPLIANCE & SANCTIONS
 
 @tool
-async def check_sanctions_ofac(entity_name: str) -> str:
+@structured_tool
+async def check_sanctions_ofac(entity_name: str) -> ToolResult:
     """Check OFAC sanctions list"""
+    screener = await get_screener()
+    if screener.has_list("sanctions"):
+        return _watchlist_result("check_sanctions_ofac", entity_name, screener.screen(entity_name, ["sanctions"]))
+    if not settings.SANCTIONS_LIVE_FALLBACK:
+        return ToolResult("check_sanctions_ofac", entity_name, status="unavailable", source="local_watchlist",
+                          error="Sanctions lists not synced")
+
     url = "https://api.opensanctions.org/search/default"
     params = {"q": entity_name, "limit": 10}
     result = await api_manager.fetch(url, params=params, api_name="opensanctions")
-    
+
     if result["status"] == "success":
         results = result["data"].get("results", [])
-        if results:
-            summary = [f"⚠️ SANCTIONS: {len(results)} matches"]
-            for match in results[:2]:
-                summary.append(f"  • {match.get('caption')}")
-            return "\n".join(summary)
-        return "✓ No sanctions matches"
-    return "Sanctions check failed"
-
-@tool
-async def check_pep_status(entity_name: str) -> str:
-    return f"PEP Check: {entity_name}\n  Status: Not Found"
-
-@tool
-async def check_export_controls(product: str, destination: str) -> str:
-    return f"Export Control\n  Product: {product}\n  Status: Clear"
-
-@tool
-async def check_aml_compliance(entity_name: str) -> str:
-    return f"AML: {entity_name}\n  Status: Compliant"
-
-@tool
-async def get_regulatory_violations(company_name: str, jurisdiction: str = "US") -> str:
-    return f"Violations: {company_name}\n  Active: 0\n  Historical: 2"
+        return ToolResult("check_sanctions_ofac", entity_name, source="opensanctions",
+                          metrics={"matches": len(results)},
+                          items=[{"caption": match.get("caption")} for match in results[:2]])
+    return ToolResult("check_sanctions_ofac", entity_name, status="error", source="opensanctions",
+                      error="Sanctions check failed")
+
+@tool
+@structured_tool
+async def check_pep_status(entity_name: str) -> ToolResult:
+    """Check Politically Exposed Persons status"""
+    screener = await get_screener()
+    if not screener.has_list("pep"):
+        return ToolResult("check_pep_status", entity_name, status="unavailable", source="local_watchlist",
+                          error="PEP list not synced")
+    matches = screener.screen(entity_name, ["pep"])
+    result = _watchlist_result("check_pep_status", entity_name, matches)
+    result.metrics["pep_match"] = bool(matches)
+    return result
+
+def _watchlist_result(tool_name: str, entity_name: str, matches: List[dict]) -> ToolResult:
+    return ToolResult(tool_name, entity_name, source="local_watchlist",
+                      metrics={"matches": len(matches), "top_score": matches[0]["score"] if matches else 0.0},
+                      items=[
+                          {"caption": m["name"], "score": m["score"], "schema": m.get("schema"),
+                           "program": m.get("program"), "dataset": m.get("dataset")}
+                          for m in matches[:2]
+                      ])
+
+@tool
+@structured_tool
+async def check_export_controls(product: str, destination: str) -> ToolResult:
+    """Check export control restrictions for a product and destination"""
+    return ToolResult("check_export_controls", product, metrics={"destination": destination, "status": "clear"})
+
+@tool
+@structured_tool
+async def check_aml_compliance(entity_name: str) -> ToolResult:
+    """Check anti-money-laundering compliance status"""
+    return ToolResult("check_aml_compliance", entity_name, metrics={"compliant": True})
+
+@tool
+@structured_tool
+async def get_regulatory_violations(company_name: str, jurisdiction: str = "US") -> ToolResult:
+    """Regulatory violations and enforcement actions"""
+    return ToolResult("get_regulatory_violations", company_name, metrics={
+        "jurisdiction": jurisdiction, "active": 0, "historical": 2
+    })
 
 # CATEGORY 4: REPUTATION & SENTIMENT
 
 @tool
-async def get_news_sentiment(company_name: str, days: int = 7) -> str:
-    """News sentiment - GDELT FREE API"""
+@structured_tool
+async def get_news_sentiment(company_name: str, days: int = 7) -> ToolResult:
+    """News sentiment - GDELT FREE API (average article tone, negative is hostile)"""
     url = "https://api.gdeltproject.org/api/v2/doc/doc"
-    params = {"query": company_name, "mode": "artlist", "timespan": f"{days}d", "maxrecords": 100, "format": "json"}
+    params = {"query": company_name, "mode": "tonechart", "timespan": f"{days}d", "format": "json"}
     result = await api_manager.fetch(url, params=params, api_name="gdelt")
-    
+
     if result["status"] == "success":
-        articles = result["data"].get("articles", [])
+        bins = result["data"].get("tonechart", [])
+        articles = sum(b.get("count", 0) for b in bins)
         if articles:
-            return f"News: {company_name}\n  Articles: {len(articles)}\n  Sentiment: Positive"
-    return "News unavailable"
+            tone = sum(b["bin"] * b.get("count", 0) for b in bins) / articles
+            return ToolResult("get_news_sentiment", company_name, source="gdelt", metrics={
+                "days": days, "articles": articles, "tone": round(tone, 2)
+            })
+        return ToolResult("get_news_sentiment", company_name, status="no_data", source="gdelt")
+    return ToolResult("get_news_sentiment", company_name, status="unavailable", source="gdelt")
 
 @tool
-async def get_customer_reviews(company_name: str) -> str:
-    return f"Reviews: {company_name}\n  Trustpilot: 4.2/5\n  Google: 4.5/5"
+@structured_tool
+async def get_customer_reviews(company_name: str) -> ToolResult:
+    """Aggregate customer review ratings (out of 5)"""
+    return ToolResult("get_customer_reviews", company_name, metrics={"trustpilot": 4.2, "google": 4.5})
 
 @tool
-async def get_social_media_sentiment(company_name: str) -> str:
-    return f"Social Media: {company_name}\n  Sentiment: 68% positive"
+@structured_tool
+async def get_social_media_sentiment(company_name: str) -> ToolResult:
+    """Social media sentiment"""
+    return ToolResult("get_social_media_sentiment", company_name, metrics={"positive_pct": 68})
 
 @tool
-async def get_brand_reputation_score(company_name: str) -> str:
-    return f"Brand Score: {company_name}\n  Score: 78/100"
+@structured_tool
+async def get_brand_reputation_score(company_name: str) -> ToolResult:
+    """Brand reputation score (out of 100)"""
+    return ToolResult("get_brand_reputation_score", company_name, metrics={"score": 78})
 
 @tool
-async def get_employee_satisfaction(company_name: str) -> str:
-    return f"Employee: {company_name}\n  Glassdoor: 4.1/5"
+@structured_tool
+async def get_employee_satisfaction(company_name: str) -> ToolResult:
+    """Employee satisfaction rating (out of 5)"""
+    return ToolResult("get_employee_satisfaction", company_name, metrics={"glassdoor": 4.1})
 
 # CATEGORY 5: OPERATIONAL & SUPPLY CHAIN
 
 @tool
-async def check_supplier_health(supplier_name: str) -> str:
-    return f"Supplier: {supplier_name}\n  Credit: A+\n  Risk: Low"
+@structured_tool
+async def check_supplier_health(supplier_name: str) -> ToolResult:
+    """Supplier credit rating and risk level"""
+    return ToolResult("check_supplier_health", supplier_name, metrics={"credit": "A+", "risk": "low"})
 
 @tool
-async def get_supply_chain_risk(company_name: str) -> str:
-    return f"Supply Chain: {company_name}\n  Risk: Moderate\n  Diversification: Adequate"
+@structured_tool
+async def get_supply_chain_risk(company_name: str) -> ToolResult:
+    """Supply chain disruption risk"""
+    return ToolResult("get_supply_chain_risk", company_name, metrics={
+        "risk": "moderate", "diversification": "adequate"
+    })
 
 @tool
-async def get_logistics_status(company_name: str) -> str:
-    return f"Logistics: {company_name}\n  Delays: Minimal\n  On-time: 96%"
+@structured_tool
+async def get_logistics_status(company_name: str) -> ToolResult:
+    """Logistics and shipping performance"""
+    return ToolResult("get_logistics_status", company_name, metrics={"delays": "minimal", "on_time_pct": 96})
 
 @tool
-async def get_raw_material_availability(materials: List[str]) -> str:
-    summary = ["Materials:"]
-    for mat in materials[:3]:
-        summary.append(f"  • {mat}: Available")
-    return "\n".join(summary)
+@structured_tool
+async def get_raw_material_availability(materials: List[str]) -> ToolResult:
+    """Raw material availability"""
+    return ToolResult("get_raw_material_availability", ", ".join(materials[:3]),
+                      items=[{"material": mat, "availability": "available"} for mat in materials[:3]])
 
 @tool
-async def get_business_continuity_status(company_name: str) -> str:
-    return f"BCM: {company_name}\n  Status: Implemented\n  RTO: 4h"
+@structured_tool
+async def get_business_continuity_status(company_name: str) -> ToolResult:
+    """Business continuity plan status and recovery time objective"""
+    return ToolResult("get_business_continuity_status", company_name, metrics={
+        "status": "implemented", "rto_hours": 4
+    })
 
 # CATEGORY 6: CYBERSECURITY
 
 @tool
-async def check_data_breaches(domain: str) -> str:
-    return f"Breaches: {domain}\n  Status: No known breaches"
+@structured_tool
+async def check_data_breaches(domain: str) -> ToolResult:
+    """Known data breaches for a domain"""
+    return ToolResult("check_data_breaches", domain, metrics={"known_breaches": 0})
 
 @tool
-async def check_cve_vulnerabilities(domain: str) -> str:
-    return f"CVE: {domain}\n  Critical: 0\n  High: 1 (patched)"
+@structured_tool
+async def check_cve_vulnerabilities(domain: str) -> ToolResult:
+    """Open CVE vulnerabilities for a domain"""
+    return ToolResult("check_cve_vulnerabilities", domain, metrics={"critical": 0, "high": 1, "high_patched": 1})
 
 @tool
-async def check_domain_reputation(domain: str) -> str:
-    return f"Domain: {domain}\n  VirusTotal: 0/91 (Clean)"
+@structured_tool
+async def check_domain_reputation(domain: str) -> ToolResult:
+    """Domain reputation (malware and phishing detections)"""
+    return ToolResult("check_domain_reputation", domain, metrics={
+        "detections": 0, "engines": 91
+    })
 
 @tool
-async def check_ransomware_risk(company_name: str) -> str:
-    return f"Ransomware: {company_name}\n  Risk: Low"
+@structured_tool
+async def check_ransomware_risk(company_name: str) -> ToolResult:
+    """Ransomware threat level"""
+    return ToolResult("check_ransomware_risk", company_name, metrics={"risk": "low"})
 
 # CATEGORY 7: STRATEGIC & COMPETITIVE
 
 @tool
-async def get_competitive_landscape(company_name: str, industry: str) -> str:
-    return f"Competitive: {company_name}\n  Industry: {industry}\n  Market Share: 18%"
+@structured_tool
+async def get_competitive_landscape(company_name: str, industry: str) -> ToolResult:
+    """Competitive position within an industry"""
+    return ToolResult("get_competitive_landscape", company_name, metrics={
+        "industry": industry, "market_share_pct": 18
+    })
 
 @tool
-async def get_ma_activity(industry: str, years: int = 3) -> str:
-    return f"M&A: {industry}\n  Deals: 45\n  Value: $23.5B"
+@structured_tool
+@shared_lookup
+async def get_ma_activity(industry: str, years: int = 3) -> ToolResult:
+    """M&A activity in an industry"""
+    return ToolResult("get_ma_activity", industry, metrics={
+        "years": years, "deals": 45, "value_usd": 23_500_000_000
+    })
 
 @tool
-async def get_patent_trends(company_name: str) -> str:
-    return f"Patents: {company_name}\n  Filed: 2,341\n  Granted: 1,856"
+@structured_tool
+async def get_patent_trends(company_name: str) -> ToolResult:
+    """Patent filing and grant trends"""
+    return ToolResult("get_patent_trends", company_name, metrics={"filed": 2341, "granted": 1856})
 
 # CATEGORY 8: ESG & SUSTAINABILITY
 
 @tool
-async def get_carbon_footprint(company_name: str) -> str:
-    return f"Carbon: {company_name}\n  Total: 237,000 tCO2e\n  Target: 2050"
+@structured_tool
+async def get_carbon_footprint(company_name: str) -> ToolResult:
+    """Carbon emissions and net-zero target"""
+    return ToolResult("get_carbon_footprint", company_name, metrics={
+        "total_tco2e": 237_000, "net_zero_target": 2050
+    })
 
 @tool
-async def get_esg_score(company_name: str) -> str:
-    return f"ESG: {company_name}\n  E: 72/100\n  S: 78/100\n  G: 75/100"
+@structured_tool
+async def get_esg_score(company_name: str) -> ToolResult:
+    """ESG pillar scores (out of 100)"""
+    return ToolResult("get_esg_score", company_name, metrics={
+        "environmental": 72, "social": 78, "governance": 75
+    })
 
 @tool
-async def get_water_stress_risk(locations: List[str]) -> str:
-    summary = ["Water Risk:"]
-    for loc in locations[:3]:
-        summary.append(f"  • {loc}: Moderate")
-    return "\n".join(summary)
+@structured_tool
+async def get_water_stress_risk(locations: List[str]) -> ToolResult:
+    """Water stress risk by location"""
+    return ToolResult("get_water_stress_risk", ", ".join(locations[:3]),
+                      items=[{"location": loc, "risk": "moderate"} for loc in locations[:3]])
 
 @tool
-async def get_diversity_metrics(company_name: str) -> str:
-    return f"Diversity: {company_name}\n  Female Workforce: 42%\n  Pay Equity: +3%"
+@structured_tool
+async def get_diversity_metrics(company_name: str) -> ToolResult:
+    """Workforce diversity and pay equity"""
+    return ToolResult("get_diversity_metrics", company_name, metrics={
+        "female_workforce_pct": 42, "pay_equity_pct": 3
+    })
 
 # CATEGORY 9: GEOPOLITICAL
 
 @tool
-async def get_geopolitical_risk(regions: List[str]) -> str:
-    summary = ["Geopolitical:"]
-    for region in regions[:3]:
-        summary.append(f"  • {region}: Moderate (5/10)")
-    return "\n".join(summary)
-
-@tool
-async def get_climate_disaster_risk(locations: List[str]) -> str:
-    summary = ["Climate Risk:"]
-    for loc in locations[:3]:
-        summary.append(f"  • {loc}: Moderate")
-    return "\n".join(summary)
-
-@tool
-async def get_governance_indicators(country: str) -> str:
-    return f"Governance: {country}\n  Corruption Control: 0.5/2.5\n  Rule of Law: 0.8/2.5"
+@structured_tool
+async def get_geopolitical_risk(regions: List[str]) -> ToolResult:
+    """Geopolitical risk by region (score out of 10)"""
+    return ToolResult("get_geopolitical_risk", ", ".join(regions[:3]),
+                      items=[{"region": region, "risk": "moderate", "score": 5} for region in regions[:3]])
+
+@tool
+@structured_tool
+async def get_climate_disaster_risk(locations: List[str]) -> ToolResult:
+    """Climate disaster exposure by location"""
+    return ToolResult("get_climate_disaster_risk", ", ".join(locations[:3]),
+                      items=[{"location": loc, "risk": "moderate"} for loc in locations[:3]])
+
+GOVERNANCE_INDICATORS = ["corruption_control", "rule_of_law", "government_effectiveness",
+                         "political_stability", "regulatory_quality", "voice_accountability"]
+
+@tool
+@structured_tool
+@shared_lookup
+async def get_governance_indicators(country: str) -> ToolResult:
+    """World Governance Indicators for a country (scale -2.5 to 2.5)"""
+    store = await get_macro_store()
+    synced = [name for name in GOVERNANCE_INDICATORS if store.has(name)]
+    if synced:
+        latest = store.snapshot([country], synced).iloc[0].dropna()
+        if latest.empty:
+            return ToolResult("get_governance_indicators", country, status="no_data", source="worldbank_wgi_local")
+        return ToolResult("get_governance_indicators", country, source="worldbank_wgi_local",
+                          metrics={name: round(float(value), 2) for name, value in latest.items()})
+
+    codes = [settings.MACRO_WORLD_BANK_INDICATORS[name] for name in ("corruption_control", "rule_of_law")]
+    results = await asyncio.gather(*(_world_bank_live(country, code, limit=1) for code in codes))
+    if all(records is None for records in results):
+        return ToolResult("get_governance_indicators", country, status="unavailable", source="worldbank_wgi")
+    metrics = {name: round(records[0]["value"], 2)
+               for name, records in zip(("corruption_control", "rule_of_law"), results) if records}
+    if not metrics:
+        return ToolResult("get_governance_indicators", country, status="no_data", source="worldbank_wgi")
+    return ToolResult("get_governance_indicators", country, source="worldbank_wgi", metrics=metrics)
 
 # MASTER ASSESSMENT
 
@@ -296,6 +578,23 @@ async def run_complete_assessment(
     sectors: Optional[List[str]] = None
 ) -> str:
     """Complete enterprise risk assessment"""
+    company_info = {
+        "name": company_name,
+        "ticker": ticker,
+        "country": country,
+        "domain": domain,
+        "sectors": sectors or ["Technology"]
+    }
+    tools = {t.name: t for t in ALL_TOOLS if t.name in STRUCTURED_TOOLS}
+    calls = resolve_tool_calls(tools.values(), company_info)
+    outputs = await asyncio.gather(
+        *(invoke_structured(tools[name], arguments) for name, arguments in calls.items()),
+        return_exceptions=True
+    )
+    scores = risk_scorer.score({
+        name: output.to_dict() for name, output in zip(calls, outputs) if isinstance(output, ToolResult)
+    })
+
     report = [
         "="*80,
         "COMPREHENSIVE RISK ASSESSMENT",
@@ -303,15 +602,7 @@ async def run_complete_assessment(
         f"Company: {company_name}",
         f"Ticker: {ticker or 'Private'}",
         "",
-        "RISK SCORES:",
-        "  • Financial: 6.5/10 (MODERATE)",
-        "  • Compliance: 4.2/10 (LOW)",
-        "  • Reputation: 5.1/10 (MODERATE)",
-        "  • Operational: 6.8/10 (MODERATE-HIGH)",
-        "  • Cybersecurity: 6.2/10 (MODERATE)",
-        "",
-        "OVERALL: 5.5/10 (MODERATE)",
-        "CONFIDENCE: HIGH (87%)",
+        *format_scores(scores),
         "="*80
     ]
     return "\n".join(report)
@@ -336,4 +627,4 @@ ALL_TOOLS = [
 ]
 
 def get_all_tools():
-    return ALL_TOOLS
\ No newline at end of file
+    return ALL_TOOLS
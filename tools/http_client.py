@@ -0,0 +1,195 @@
+import asyncio
+import json
+import logging
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, Optional
+
+import aiohttp
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "EnterpriseRiskAssessment/3.0"
+
+@dataclass
+class HTTPResponse:
+    """Backend-neutral response with the body already read"""
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+@dataclass
+class PoolStats:
+    """Connection pool counters"""
+    requests: int = 0
+    in_flight: int = 0
+    max_in_flight: int = 0
+    connections_created: int = 0
+    connections_reused: int = 0
+    dns_cache_hits: int = 0
+    dns_cache_misses: int = 0
+
+class HTTPClient:
+    """Pooled HTTP client whose lifecycle follows application startup/shutdown"""
+
+    def __init__(self):
+        self.backend = settings.HTTP_CLIENT_BACKEND
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.httpx_client = None
+        self.stats = PoolStats()
+
+    @property
+    def started(self) -> bool:
+        return self.session is not None or self.httpx_client is not None
+
+    async def start(self):
+        """Create the pooled client (idempotent)"""
+        if self.started:
+            return
+        if self.backend == "httpx":
+            self._start_httpx()
+        else:
+            self._start_aiohttp()
+
+    def _start_aiohttp(self):
+        connector = aiohttp.TCPConnector(
+            limit=settings.HTTP_POOL_LIMIT,
+            limit_per_host=settings.HTTP_POOL_LIMIT_PER_HOST,
+            ttl_dns_cache=settings.HTTP_DNS_CACHE_TTL,
+            use_dns_cache=True,
+            keepalive_timeout=settings.HTTP_KEEPALIVE_TIMEOUT,
+        )
+        trace = aiohttp.TraceConfig()
+        trace.on_connection_create_end.append(self._on_connection_created)
+        trace.on_connection_reuseconn.append(self._on_connection_reused)
+        trace.on_dns_cache_hit.append(self._on_dns_cache_hit)
+        trace.on_dns_cache_miss.append(self._on_dns_cache_miss)
+
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            headers={"User-Agent": USER_AGENT},
+            trace_configs=[trace],
+        )
+        logger.info(
+            f"HTTP pool started (aiohttp, limit={settings.HTTP_POOL_LIMIT}, "
+            f"per_host={settings.HTTP_POOL_LIMIT_PER_HOST})"
+        )
+
+    def _start_httpx(self):
+        if httpx is None:
+            logger.warning("httpx not installed, falling back to aiohttp")
+            self.backend = "aiohttp"
+            return self._start_aiohttp()
+
+        http2 = settings.HTTP2_ENABLED
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("h2 package not installed, HTTP/2 disabled")
+                http2 = False
+
+        # httpx has no per-host limit; HTTP_POOL_LIMIT_PER_HOST caps the
+        # idle keep-alive connections across the whole pool instead
+        self.httpx_client = httpx.AsyncClient(
+            http2=http2,
+            headers={"User-Agent": USER_AGENT},
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_POOL_LIMIT,
+                max_keepalive_connections=settings.HTTP_POOL_LIMIT_PER_HOST,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_TIMEOUT,
+            ),
+        )
+        logger.info(
+            f"HTTP pool started (httpx, http2={http2}, limit={settings.HTTP_POOL_LIMIT}, "
+            f"max_keepalive={settings.HTTP_POOL_LIMIT_PER_HOST})"
+        )
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+        if self.httpx_client is not None:
+            await self.httpx_client.aclose()
+            self.httpx_client = None
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict] = None,
+        json_data: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        timeout: float = None
+    ) -> HTTPResponse:
+        await self.start()
+        timeout = timeout or settings.API_TIMEOUT
+
+        self.stats.requests += 1
+        self.stats.in_flight += 1
+        self.stats.max_in_flight = max(self.stats.max_in_flight, self.stats.in_flight)
+        try:
+            if self.httpx_client is not None:
+                response = await self.httpx_client.request(
+                    method, url, params=params, json=json_data, headers=headers, timeout=timeout
+                )
+                return HTTPResponse(response.status_code, dict(response.headers), response.content)
+
+            async with self.session.request(
+                method,
+                url,
+                params=params,
+                json=json_data,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=timeout)
+            ) as response:
+                body = await response.read()
+                return HTTPResponse(response.status, dict(response.headers), body)
+        except Exception as e:
+            if httpx is not None and isinstance(e, httpx.TimeoutException):
+                raise asyncio.TimeoutError(str(e)) from e
+            raise
+        finally:
+            self.stats.in_flight -= 1
+
+    async def _on_connection_created(self, session, ctx, params):
+        self.stats.connections_created += 1
+
+    async def _on_connection_reused(self, session, ctx, params):
+        self.stats.connections_reused += 1
+
+    async def _on_dns_cache_hit(self, session, ctx, params):
+        self.stats.dns_cache_hits += 1
+
+    async def _on_dns_cache_miss(self, session, ctx, params):
+        self.stats.dns_cache_misses += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool utilization for the health endpoint"""
+        limit = settings.HTTP_POOL_LIMIT
+        stats = asdict(self.stats)
+        stats.update({
+            "backend": self.backend,
+            "started": self.started,
+            "limit": limit,
+            # a limit of 0 means unlimited to aiohttp
+            "utilization": round(self.stats.in_flight / limit, 3) if limit else None,
+        })
+
+        if self.httpx_client is not None:
+            stats["max_keepalive_connections"] = settings.HTTP_POOL_LIMIT_PER_HOST
+        else:
+            stats["limit_per_host"] = settings.HTTP_POOL_LIMIT_PER_HOST
+
+        opened = self.stats.connections_created + self.stats.connections_reused
+        stats["reuse_ratio"] = round(self.stats.connections_reused / opened, 3) if opened else 0.0
+        return stats
@@ -0,0 +1,145 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, asdict
+from typing import Dict, Any
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Reservation-style token bucket: every caller takes a token immediately (the
+# balance may go negative) and is told how long to wait for it. Reservations
+# are handed out in arrival order, so queued callers are served fairly.
+_REDIS_RESERVE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + (now - ts) * rate) - 1
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+if tokens >= 0 then
+    return '0'
+end
+return tostring(-tokens / rate)
+"""
+
+class TokenBucket:
+    """In-process token bucket; rate is in requests per second"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    async def reserve(self) -> float:
+        """Take a token and return the seconds to wait before using it"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate) - 1
+        self.updated = now
+        return max(0.0, -self.tokens / self.rate)
+
+    def refund(self):
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+class RedisTokenBucket(TokenBucket):
+    """Token bucket shared across worker processes through Redis"""
+
+    def __init__(self, redis_client, key: str, rate: float, capacity: float):
+        super().__init__(rate, capacity)
+        self.redis = redis_client
+        self.key = key
+
+    async def reserve(self) -> float:
+        try:
+            wait = await self.redis.eval(_REDIS_RESERVE_SCRIPT, 1, self.key, self.rate, self.capacity)
+            return float(wait)
+        except Exception as e:
+            logger.warning(f"Shared rate limiter unavailable for {self.key}, using local bucket: {e}")
+            return await super().reserve()
+
+    def refund(self):
+        # Shared reservations are not returned; the bucket refills on its own
+        pass
+
+@dataclass
+class LimiterStats:
+    """Per-API throttling counters"""
+    requests: int = 0
+    throttled: int = 0
+    wait_seconds: float = 0.0
+    in_flight: int = 0
+    max_in_flight: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["wait_seconds"] = round(self.wait_seconds, 3)
+        return data
+
+class RateLimiter:
+    """Per-API token buckets plus max-concurrency semaphores"""
+
+    def __init__(self, redis_client=None):
+        self.redis_client = redis_client if settings.API_RATE_LIMIT_BACKEND == "redis" else None
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.stats: Dict[str, LimiterStats] = {}
+
+    def _bucket(self, api_name: str) -> TokenBucket:
+        if api_name not in self.buckets:
+            per_minute = settings.API_RATE_LIMITS.get(api_name, settings.API_RATE_LIMIT)
+            rate = per_minute / 60.0
+            capacity = max(1.0, min(float(settings.API_RATE_BURST), per_minute))
+            if self.redis_client is not None:
+                self.buckets[api_name] = RedisTokenBucket(
+                    self.redis_client, f"ratelimit:{api_name}", rate, capacity
+                )
+            else:
+                self.buckets[api_name] = TokenBucket(rate, capacity)
+        return self.buckets[api_name]
+
+    def _semaphore(self, api_name: str) -> asyncio.Semaphore:
+        if api_name not in self.semaphores:
+            limit = settings.API_CONCURRENCY_LIMITS.get(api_name, settings.API_MAX_CONCURRENCY)
+            self.semaphores[api_name] = asyncio.Semaphore(limit)
+        return self.semaphores[api_name]
+
+    def _stats(self, api_name: str) -> LimiterStats:
+        if api_name not in self.stats:
+            self.stats[api_name] = LimiterStats()
+        return self.stats[api_name]
+
+    @asynccontextmanager
+    async def limit(self, api_name: str):
+        """Wait for a concurrency slot and a rate token, queuing instead of failing"""
+        stats = self._stats(api_name)
+        started = time.monotonic()
+
+        async with self._semaphore(api_name):
+            bucket = self._bucket(api_name)
+            wait = await bucket.reserve()
+            if wait > 0:
+                stats.throttled += 1
+                try:
+                    await asyncio.sleep(wait)
+                except asyncio.CancelledError:
+                    bucket.refund()
+                    raise
+
+            stats.requests += 1
+            stats.wait_seconds += time.monotonic() - started
+            stats.in_flight += 1
+            stats.max_in_flight = max(stats.max_in_flight, stats.in_flight)
+            try:
+                yield
+            finally:
+                stats.in_flight -= 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {name: s.to_dict() for name, s in self.stats.items()}
@@ -0,0 +1,77 @@
+import functools
+import sys
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Any, List, Optional, Callable, Awaitable
+
+# slots keeps per-result memory small; dataclass(slots=) needs Python 3.10
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_SLOTS)
+class ToolResult:
+    """Typed tool output
+
+    metrics holds scalar facts (numbers, flags, ratings) and items holds
+    repeated records (matches, filings, locations). render() is the
+    compact text handed to the LLM.
+    """
+    tool: str
+    subject: str
+    status: str = "ok"  # ok | no_data | unavailable | error
+    metrics: Dict[str, Any] = field(default_factory=dict)
+    items: List[Dict[str, Any]] = field(default_factory=list)
+    source: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "ok"
+
+    def render(self) -> str:
+        head = f"{self.tool}({self.subject})"
+        if self.source:
+            head += f" [{self.source}]"
+        if not self.ok:
+            return f"{head}: {self.status}" + (f" - {self.error}" if self.error else "")
+
+        lines = [f"{head}: {_render_fields(self.metrics)}" if self.metrics else head]
+        lines.extend(f"  - {_render_fields(item)}" for item in self.items)
+        return "\n".join(lines)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+def _render_value(value: Any) -> str:
+    if isinstance(value, float):
+        return f"{value:.4f}".rstrip("0").rstrip(".")
+    if isinstance(value, (list, tuple)):
+        return "/".join(_render_value(v) for v in value)
+    return str(value)
+
+def _render_fields(fields: Dict[str, Any]) -> str:
+    return ", ".join(f"{key}={_render_value(value)}" for key, value in fields.items() if value is not None)
+
+# Tool name -> coroutine returning a ToolResult
+STRUCTURED_TOOLS: Dict[str, Callable[..., Awaitable[ToolResult]]] = {}
+
+def structured_tool(func):
+    """Register a ToolResult-returning coroutine and expose it as text
+
+    Apply under @tool: the LangChain tool (and so the LLM) sees render(),
+    while invoke_structured() gets the ToolResult itself.
+    """
+    STRUCTURED_TOOLS[func.__name__] = func
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs) -> str:
+        return (await func(*args, **kwargs)).render()
+
+    wrapper.__annotations__ = {**func.__annotations__, "return": str}
+    return wrapper
+
+async def invoke_structured(tool, arguments: Dict[str, Any]) -> ToolResult:
+    """Call a tool for its ToolResult; plain-text tools are wrapped as-is"""
+    func = STRUCTURED_TOOLS.get(tool.name)
+    if func is not None:
+        return await func(**arguments)
+    output = await tool.ainvoke(arguments)
+    return ToolResult(tool=tool.name, subject=", ".join(map(str, arguments.values())), metrics={"text": output})
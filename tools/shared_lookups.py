@@ -0,0 +1,74 @@
+import asyncio
+import contextvars
+import functools
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, Tuple
+
+from .results import ToolResult
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class LookupScope:
+    """Memo of lookups shared by every assessment in one batch"""
+    results: Dict[Tuple, asyncio.Task] = field(default_factory=dict)
+    computed: int = 0
+    reused: int = 0
+
+    def get_stats(self) -> Dict[str, int]:
+        return {"computed": self.computed, "reused": self.reused}
+
+_current_scope: contextvars.ContextVar[Optional[LookupScope]] = contextvars.ContextVar(
+    "shared_lookup_scope", default=None
+)
+
+def activate_scope(scope: LookupScope):
+    """Share lookups with scope for the current task and tasks it spawns"""
+    _current_scope.set(scope)
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return value.strip().upper()
+    if isinstance(value, (list, tuple)):
+        return tuple(_normalize(v) for v in value)
+    return value
+
+def _forget_failure(scope: LookupScope, key: Tuple, task: asyncio.Task):
+    """Drop a failed lookup so one transient error doesn't stick for the whole batch"""
+    if task.cancelled() or task.exception() is not None:
+        failed = True
+    else:
+        result = task.result()
+        failed = isinstance(result, ToolResult) and result.status in ("error", "unavailable")
+    if failed and scope.results.get(key) is task:
+        del scope.results[key]
+
+def shared_lookup(func):
+    """Compute an entity-independent lookup once per batch
+
+    Inside an active LookupScope, calls with the same (normalized) arguments
+    share one result, e.g. get_gdp_growth("US") runs once however many US
+    companies are in the batch. Outside a scope the call passes through.
+    Failures (an exception, or an error/unavailable ToolResult) are only
+    shared with the calls already waiting on them; the next call tries
+    again. no_data is an answer and stays shared.
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        scope = _current_scope.get()
+        if scope is None:
+            return await func(*args, **kwargs)
+
+        key = (func.__name__, _normalize(args), tuple(sorted((k, _normalize(v)) for k, v in kwargs.items())))
+        task = scope.results.get(key)
+        if task is None:
+            scope.computed += 1
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            scope.results[key] = task
+            task.add_done_callback(functools.partial(_forget_failure, scope, key))
+        else:
+            scope.reused += 1
+        return await asyncio.shield(task)
+
+    return wrapper
@@ -0,0 +1,71 @@
+import logging
+from typing import Dict, Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+def _first_sector(facts: Dict[str, Any]) -> Optional[str]:
+    sectors = facts.get("sectors") or []
+    return sectors[0] if sectors else None
+
+def _places(key: str) -> Callable[[Dict[str, Any]], Any]:
+    def source(facts: Dict[str, Any]):
+        if facts.get(key):
+            return facts[key]
+        return [facts["country"]] if facts.get("country") else None
+    return source
+
+# Tool parameter name -> how to derive it from known company facts.
+# Parameters not listed here (supplier_name, materials, product, ...)
+# need the LLM to choose a value.
+ARGUMENT_SOURCES: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "company_name": lambda facts: facts.get("name"),
+    "entity_name": lambda facts: facts.get("name"),
+    "ticker": lambda facts: facts.get("ticker"),
+    "cik": lambda facts: facts.get("cik"),
+    "domain": lambda facts: facts.get("domain"),
+    "country": lambda facts: facts.get("country"),
+    "jurisdiction": lambda facts: facts.get("country"),
+    "industry": _first_sector,
+    "locations": _places("locations"),
+    "regions": _places("jurisdictions"),
+}
+
+def tool_parameters(tool) -> Dict[str, bool]:
+    """Parameter name -> required, for a LangChain tool"""
+    schema = tool.get_input_schema()
+    return {name: field.is_required() for name, field in schema.model_fields.items()}
+
+def resolve_tool_input(
+    tool,
+    company_info: Dict[str, Any],
+    context: Optional[Dict[str, Any]] = None
+) -> Optional[Dict[str, Any]]:
+    """Arguments for tool derived from company data
+
+    Returns None when a required argument can't be derived, i.e. the call
+    is not predictable without the LLM.
+    """
+    facts = {**(context or {}), **company_info}
+    arguments = {}
+    for name, required in tool_parameters(tool).items():
+        source = ARGUMENT_SOURCES.get(name)
+        value = source(facts) if source else None
+        if value is None:
+            if required:
+                return None
+            continue
+        arguments[name] = value
+    return arguments
+
+def resolve_tool_calls(
+    tools,
+    company_info: Dict[str, Any],
+    context: Optional[Dict[str, Any]] = None
+) -> Dict[str, Dict[str, Any]]:
+    """Tool name -> arguments for every tool in tools that is predictable"""
+    calls = {}
+    for tool in tools:
+        arguments = resolve_tool_input(tool, company_info, context)
+        if arguments is not None:
+            calls[tool.name] = arguments
+    return calls